@@ -0,0 +1,128 @@
+"""
+Local-model warm keeping benchmark for GitTalker
+Runs LLMClient against a stub Ollama server that takes --load-latency seconds
+to load a model and unloads it after --keep-alive idle time, and measures the
+first question's latency in four situations:
+
+    cold        no preload, the first question loads the model
+    preloaded   LLMClient.warm_up() ran at startup
+    idle        idle past keep_alive with no keepalive pings
+    kept_warm   idle for as long, with LLMClient.keep_warm() running
+
+    python -m benchmarks.llm_warmup --load-latency 3 --keep-alive 2s
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from .stubs import Injection, StubOllama
+
+SCENARIOS = ("cold", "preloaded", "idle", "kept_warm")
+QUESTION = [{"role": "user", "content": "How do I deploy GitTalker?"}]
+
+
+async def _first_question(
+    scenario: str,
+    stub: StubOllama,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    from src.llm_client import LLMClient
+
+    stub.unload_all()
+    loads_before = stub.counters.get("loads", 0)
+    client = LLMClient()
+    keepalive = None
+    if scenario != "cold":
+        await client.warm_up()
+    if scenario == "kept_warm":
+        keepalive = asyncio.create_task(
+            client.keep_warm(args.keepalive_interval)
+        )
+    if scenario in ("idle", "kept_warm"):
+        await asyncio.sleep(args.idle)
+
+    try:
+        start = time.perf_counter()
+        await client.generate_response(QUESTION, provider="ollama")
+        latency = time.perf_counter() - start
+    finally:
+        if keepalive is not None:
+            keepalive.cancel()
+
+    status = await client.model_status()
+    return {
+        "scenario": scenario,
+        "first_question_ms": latency * 1000,
+        "model_loads": stub.counters.get("loads", 0) - loads_before,
+        "model_state": status.get("ollama")
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    stub = StubOllama(
+        Injection(args.generate_latency),
+        load_latency=args.load_latency
+    )
+    await stub.start()
+    os.environ.update({
+        "OLLAMA_BASE_URL": stub.url,
+        "OLLAMA_MODEL": "stub-coder:33b",
+        "OLLAMA_KEEP_ALIVE": args.keep_alive,
+        "PRIMARY_LLM_PROVIDER": "ollama",
+        "ENABLE_LLM_FALLBACK": "false"
+    })
+    os.environ.setdefault("TRACE_EXPORTER", "none")
+
+    try:
+        results = [
+            await _first_question(scenario, stub, args)
+            for scenario in args.scenarios.split(",")
+        ]
+    finally:
+        await stub.stop()
+
+    return {
+        "benchmark": "llm_warmup",
+        "results": results,
+        "settings": {
+            "load_latency": args.load_latency,
+            "generate_latency": args.generate_latency,
+            "keep_alive": args.keep_alive,
+            "idle": args.idle,
+            "keepalive_interval": args.keepalive_interval
+        }
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.llm_warmup",
+        description="Measure local-model preload and keepalive"
+    )
+    parser.add_argument("--load-latency", type=float, default=3.0)
+    parser.add_argument("--generate-latency", type=float, default=0.2)
+    parser.add_argument("--keep-alive", default="2s",
+                        help="OLLAMA_KEEP_ALIVE sent by the client")
+    parser.add_argument("--idle", type=float, default=4.0,
+                        help="Seconds without questions before asking")
+    parser.add_argument("--keepalive-interval", type=float, default=1.0)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+End-to-end load test for GitTalker
+Starts local stand-ins for GitHub, Slack Socket Mode and an OpenAI-compatible
+LLM, boots the real service against them, then pushes app_mention events at
+a fixed rate and measures ack and reply latency:
+
+    python -m benchmarks.loadtest --rate 10 --duration 30
+    python -m benchmarks.loadtest --llm-latency 2 --llm-error-rate 0.05
+    python -m benchmarks.loadtest --embedder remote  # stub /v1/embeddings
+
+Events are sent open-loop on a fixed schedule, so a slow bot shows up as
+latency rather than as a lower offered rate. Service settings such as
+SLACK_WORKER_CONCURRENCY are read from the environment as usual.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .stubs import STUB_ANSWER, Injection, StubGitHub, StubLLM, StubSlack
+
+FIXTURE = Path(__file__).parent / "fixtures" / "docs_corpus.json"
+
+# Outcomes that mean the bot failed the user (scope fallbacks don't count)
+ERROR_OUTCOMES = ("timed_out", "error", "busy", "technical_limits")
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+def _point_service_at(stubs: Dict[str, Any], embedder: str) -> None:
+    """Environment for src.config, set before the service is imported"""
+    os.environ.update({
+        "GITHUB_API_URL": stubs["github"].url,
+        "GITHUB_REPO": "loadtest/gittalker",
+        "GITHUB_DOCS_PATH": "gittalker/",
+        "GITHUB_TOKEN": "stub-token",
+        "SLACK_API_URL": stubs["slack"].api_url,
+        "SLACK_BOT_TOKEN": "xoxb-stub",
+        "SLACK_APP_TOKEN": "xapp-stub",
+        "OPENAI_BASE_URL": f"{stubs['llm'].url}/v1",
+        "OPENAI_API_KEY": "stub-key",
+        "PRIMARY_LLM_PROVIDER": "openai",
+        "INDEX_MODE": "local",
+        "EMBEDDING_BACKEND": embedder
+    })
+    os.environ.setdefault("TRACE_EXPORTER", "none")
+    # The hashing stub's similarities aren't calibrated like a real model's
+    os.environ.setdefault("RETRIEVAL_MIN_SCORE", "0")
+
+
+def _classify(text: str, service) -> str:
+    """Name a reply: answered, rate_limited, a fallback key, or error"""
+    agent = service.gittalker_agent
+    if STUB_ANSWER in text:
+        return "answered"
+    if text == agent.rate_limited_response():
+        return "rate_limited"
+    for fallback, fallback_text in agent.config["fallbacks"].items():
+        if fallback_text in text:
+            return fallback
+    return "error"
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with open(args.fixture, encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    stubs = {
+        "github": StubGitHub(
+            fixture["docs"],
+            Injection(args.github_latency, error_rate=args.github_error_rate)
+        ),
+        "slack": StubSlack(
+            Injection(args.slack_latency, error_rate=args.slack_error_rate),
+            rate_limit_rate=args.slack_429_rate
+        ),
+        "llm": StubLLM(Injection(
+            args.llm_latency, args.llm_jitter, args.llm_error_rate, seed=1
+        ))
+    }
+    for stub in stubs.values():
+        await stub.start()
+    _point_service_at(stubs, args.embedder)
+
+    from src import main as service
+    cache_dir = tempfile.mkdtemp(prefix="gittalker-loadtest-")
+    from src.docs_store import DocsStore
+    docs_store = DocsStore(str(Path(cache_dir) / "docs_cache.sqlite3"))
+    for fetcher in service.github_fetchers.values():
+        fetcher.store = docs_store
+
+    slack = stubs["slack"]
+    try:
+        await service.initialize_service()
+        if not service.readiness.is_ready:
+            raise RuntimeError(
+                f"Service not ready: {service.readiness.snapshot()}"
+            )
+        await asyncio.wait_for(slack.connected.wait(), timeout=10)
+
+        rng = random.Random(args.seed)
+        questions = [item["question"] for item in fixture["questions"]]
+        total = int(args.rate * args.duration)
+        start = time.perf_counter()
+        for i in range(total):
+            delay = start + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await slack.send_event({
+                "type": "app_mention",
+                "channel": f"C{rng.randrange(args.channels):05d}",
+                "user": f"U{rng.randrange(args.users):05d}",
+                "text": f"<@UBOT> {rng.choice(questions)}",
+                "ts": f"{1700000000 + i}.{i:06d}"
+            })
+        send_seconds = time.perf_counter() - start
+
+        deadline = time.perf_counter() + args.reply_timeout
+        while (len(slack.replies) < total
+               and time.perf_counter() < deadline):
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - start
+    finally:
+        await service.dispatcher.stop()
+        await service.slack_bot.stop()
+        for stub in stubs.values():
+            await stub.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    ack_ms = [
+        (slack.acked[e] - sent) * 1000
+        for e, sent in slack.sent.items() if e in slack.acked
+    ]
+    reply_ms = []
+    outcomes: Dict[str, int] = {}
+    for envelope_id, reply in slack.replies.items():
+        reply_ms.append((reply["at"] - slack.sent[envelope_id]) * 1000)
+        outcome = _classify(reply["text"], service)
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    outcomes["timed_out"] = total - len(slack.replies)
+    failed = sum(outcomes.get(outcome, 0) for outcome in ERROR_OUTCOMES)
+
+    return {
+        "benchmark": "loadtest",
+        "offered_rate": args.rate,
+        "achieved_send_rate": total / send_seconds if send_seconds else 0.0,
+        "events": total,
+        "acked": len(ack_ms),
+        "replied": len(slack.replies),
+        "outcomes": outcomes,
+        "error_rate": failed / total if total else 0.0,
+        "throughput_per_second": (
+            outcomes.get("answered", 0) / elapsed if elapsed else 0.0
+        ),
+        "ack_latency": _percentiles(ack_ms),
+        "end_to_end_latency": _percentiles(reply_ms),
+        "llm_usage": service.usage_ledger.snapshot()["provider"],
+        "stubs": {name: stub.counters for name, stub in stubs.items()},
+        "settings": {
+            "duration": args.duration,
+            "channels": args.channels,
+            "users": args.users,
+            "embedder": args.embedder,
+            "llm_latency": args.llm_latency,
+            "llm_error_rate": args.llm_error_rate,
+            "slack_429_rate": args.slack_429_rate,
+            "worker_concurrency": service.dispatcher.concurrency
+        }
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.loadtest",
+        description="Drive GitTalker end to end against local stubs"
+    )
+    parser.add_argument("--rate", type=float, default=5.0,
+                        help="Events per second")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--reply-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--embedder", default="hashing",
+        help="EMBEDDING_BACKEND; remote embeds through the stub LLM server"
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--llm-jitter", type=float, default=0.3)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--github-latency", type=float, default=0.02)
+    parser.add_argument("--github-error-rate", type=float, default=0.0)
+    parser.add_argument("--slack-latency", type=float, default=0.05)
+    parser.add_argument("--slack-error-rate", type=float, default=0.0)
+    parser.add_argument("--slack-429-rate", type=float, default=0.0)
+    parser.add_argument("--fixture", default=str(FIXTURE))
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Retrieval benchmarks for GitTalker
+Index throughput, search latency percentiles, memory footprint and recall@k
+against labelled questions, at several corpus sizes:
+
+    python -m benchmarks.retrieval                  # offline stub embedder
+    python -m benchmarks.retrieval --embedder sentence-transformers
+    python -m benchmarks.retrieval --output new.json --baseline old.json
+
+The fixture docs are padded with deterministic synthetic paragraphs to reach
+each size, so the labelled questions are answered among distractors.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+FIXTURE = Path(__file__).parent / "fixtures" / "docs_corpus.json"
+
+# Metric -> direction that counts as a regression
+REGRESSION_CHECKS = {
+    "index_chunks_per_second": "lower",
+    "search_p50_ms": "higher",
+    "search_p95_ms": "higher",
+    "index_memory_mb": "higher"
+}
+RECALL_TOLERANCE = 0.02
+
+
+def synthetic_docs(chunks: int, seed: int = 7) -> List[Dict[str, str]]:
+    """Deterministic filler docs with roughly `chunks` paragraphs"""
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ret", "sun", "dra", "vex", "pol", "tin",
+                 "zor", "qui", "bel", "nar", "fos", "gle", "hym"]
+    vocabulary = [
+        "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        for _ in range(3000)
+    ]
+
+    docs = []
+    paragraphs_per_doc = 10
+    for start in range(0, chunks, paragraphs_per_doc):
+        doc_index = start // paragraphs_per_doc
+        count = min(paragraphs_per_doc, chunks - start)
+        paragraphs = [
+            " ".join(rng.choices(vocabulary, k=rng.randint(12, 80)))
+            for _ in range(count)
+        ]
+        path = f"synthetic/section-{doc_index // 100}/doc-{doc_index}.md"
+        docs.append({
+            "path": path,
+            "url": f"https://example.invalid/{path}",
+            "content": "\n\n".join(paragraphs)
+        })
+    return docs
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def run_size(
+    size: int,
+    embedder,
+    fixture: Dict[str, Any],
+    k: int,
+    repeats: int,
+    workers: int,
+    batch_size: int
+) -> Dict[str, Any]:
+    """Index `size` chunks and measure search latency and recall"""
+    from src.rag_engine import SimpleRAG
+
+    rag = SimpleRAG(
+        model_name=embedder.model_name, max_chunks=size, embedder=embedder
+    )
+    # Fixture docs go first so truncation to max_chunks never drops them
+    fixture_chunks, _ = rag.chunk_documents(fixture["docs"])
+    docs = fixture["docs"] + synthetic_docs(max(0, size - len(fixture_chunks)))
+    stats = rag.index_documents(docs, workers=workers, batch_size=batch_size)
+    rag.warm_up()
+
+    latencies = []
+    hits = 0
+    reciprocal_ranks = []
+    for _ in range(repeats):
+        for item in fixture["questions"]:
+            start = time.perf_counter()
+            results = rag.search(item["question"], top_k=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            sources = [r["metadata"]["source_path"] for r in results]
+            if item["source_path"] in sources:
+                hits += 1
+                reciprocal_ranks.append(
+                    1 / (sources.index(item["source_path"]) + 1)
+                )
+            else:
+                reciprocal_ranks.append(0.0)
+
+    embedding_bytes = (
+        rag.embeddings.nbytes if rag.embeddings is not None else 0
+    )
+    text_bytes = sum(len(chunk.encode("utf-8")) for chunk in rag.chunks)
+    embed_seconds = stats["embed_seconds"]
+    return {
+        "chunks": stats["chunks"],
+        "index_seconds": stats["chunk_seconds"] + embed_seconds,
+        "index_chunks_per_second": (
+            stats["chunks"] / embed_seconds if embed_seconds else 0.0
+        ),
+        "search_p50_ms": float(np.percentile(latencies, 50)),
+        "search_p95_ms": float(np.percentile(latencies, 95)),
+        "search_p99_ms": float(np.percentile(latencies, 99)),
+        "index_memory_mb": (embedding_bytes + text_bytes) / 1e6,
+        "peak_rss_mb": _peak_rss_mb(),
+        f"recall_at_{k}": hits / len(latencies) if latencies else 0.0,
+        "mrr": float(np.mean(reciprocal_ranks)) if reciprocal_ranks else 0.0
+    }
+
+
+def find_regressions(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float
+) -> List[str]:
+    """Compare against a previous report; relative tolerance for timings"""
+    if report["embedder"] != baseline.get("embedder"):
+        return [
+            f"baseline used embedder {baseline.get('embedder')}, "
+            f"not {report['embedder']}"
+        ]
+
+    previous = {r["chunks"]: r for r in baseline.get("results", [])}
+    recall_key = f"recall_at_{report['k']}"
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(result["chunks"])
+        if old is None:
+            continue
+        for metric, direction in REGRESSION_CHECKS.items():
+            before, after = old.get(metric), result[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            worse = change if direction == "higher" else -change
+            if worse > tolerance:
+                regressions.append(
+                    f"{result['chunks']} chunks: {metric} "
+                    f"{before:.3f} -> {after:.3f} ({change:+.0%})"
+                )
+        if old.get(recall_key, 0) - result[recall_key] > RECALL_TOLERANCE:
+            regressions.append(
+                f"{result['chunks']} chunks: {recall_key} "
+                f"{old[recall_key]:.3f} -> {result[recall_key]:.3f}"
+            )
+    return regressions
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.retrieval",
+        description="Benchmark GitTalker indexing and retrieval"
+    )
+    parser.add_argument(
+        "--embedder", default="hashing",
+        help="hashing (offline stub), sentence-transformers or onnx"
+    )
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--fixture", default=str(FIXTURE))
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Previous report to compare with")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2,
+        help="Allowed relative slowdown before failing (default: 0.2)"
+    )
+    args = parser.parse_args(argv)
+
+    # Benchmarks shouldn't fill the trace log with thousands of searches
+    os.environ.setdefault("TRACE_EXPORTER", "none")
+    from src.embeddings import create_embedding_backend
+
+    with open(args.fixture, encoding="utf-8") as f:
+        fixture = json.load(f)
+    embedder = create_embedding_backend(
+        args.model, backend=args.embedder, quantize=args.quantize
+    )
+
+    report: Dict[str, Any] = {
+        "benchmark": "retrieval",
+        "revision": _git_revision(),
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "embedder": args.embedder + (" int8" if args.quantize else ""),
+        "model_name": embedder.model_name,
+        "k": args.k,
+        "results": []
+    }
+    for size in [int(size) for size in args.sizes.split(",")]:
+        result = run_size(
+            size, embedder, fixture, args.k, args.repeats,
+            args.workers, args.batch_size
+        )
+        report["results"].append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
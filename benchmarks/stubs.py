@@ -0,0 +1,444 @@
+"""
+Local stand-ins for GitHub, Slack, an OpenAI-compatible LLM and Ollama
+Each is a small aiohttp app with configurable latency and error injection,
+used by the benchmark harnesses so no real service is ever called
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from aiohttp import WSMsgType, web
+
+STUB_ANSWER = "Stub answer from the load-test LLM."
+
+
+def _embed(texts: List[str]) -> List[List[float]]:
+    """Deterministic stub embeddings (the offline hashing embedder's)"""
+    # Imported late so src.config reads the environment the harness set
+    from src.embeddings import HashingEmbeddingBackend
+    return HashingEmbeddingBackend().encode(texts).tolist()
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_keep_alive(value: Any) -> Optional[float]:
+    """Ollama keep_alive in seconds ("5m", "1h30m", 300); None is forever"""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    elif str(value).lstrip("-").replace(".", "", 1).isdigit():
+        seconds = float(value)
+    else:
+        text = str(value).strip()
+        sign = -1.0 if text.startswith("-") else 1.0
+        seconds = sign * sum(
+            float(amount) * _DURATION_UNITS[unit]
+            for amount, unit in _DURATION_PART.findall(text)
+        )
+    return None if seconds < 0 else seconds
+
+
+class Injection:
+    """Latency (mean plus uniform jitter) and a random error rate"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    async def delay(self) -> None:
+        wait = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def should_fail(self) -> bool:
+        return self._random.random() < self.error_rate
+
+
+def _blob_sha(doc: Dict[str, str]) -> str:
+    """Git's blob id, so unchanged files keep their sha across requests"""
+    content = doc["content"].encode()
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class StubServer:
+    """Run an aiohttp app on a free localhost port"""
+
+    def __init__(self):
+        self.app = web.Application()
+        self.counters: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def count(self, name: str) -> None:
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    async def start(self, host: str = "127.0.0.1") -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class StubGitHub(StubServer):
+    """Git trees and contents endpoints serving a fixed set of docs"""
+
+    def __init__(self, docs: List[Dict[str, str]], injection: Injection):
+        super().__init__()
+        self.docs = {doc["path"]: doc for doc in docs}
+        self.injection = injection
+        self.app.router.add_get(
+            "/repos/{owner}/{repo}/git/trees/{ref}", self.tree
+        )
+        self.app.router.add_get(
+            "/repos/{owner}/{repo}/contents/{path:.+}", self.contents
+        )
+
+    async def _maybe_fail(self) -> Optional[web.Response]:
+        await self.injection.delay()
+        if self.injection.should_fail():
+            self.count("errors")
+            return web.json_response({"message": "injected"}, status=502)
+        return None
+
+    async def tree(self, request: web.Request) -> web.Response:
+        self.count("tree")
+        failure = await self._maybe_fail()
+        if failure is not None:
+            return failure
+        return web.json_response({
+            "tree": [
+                {"path": path, "type": "blob", "sha": _blob_sha(doc)}
+                for path, doc in self.docs.items()
+            ]
+        })
+
+    async def contents(self, request: web.Request) -> web.Response:
+        self.count("contents")
+        failure = await self._maybe_fail()
+        if failure is not None:
+            return failure
+        doc = self.docs.get(request.match_info["path"])
+        if doc is None:
+            return web.json_response({"message": "Not Found"}, status=404)
+        return web.json_response({
+            "content": base64.b64encode(doc["content"].encode()).decode(),
+            "html_url": doc["url"]
+        })
+
+
+class StubLLM(StubServer):
+    """OpenAI-compatible /v1/models, /v1/chat/completions, /v1/embeddings"""
+
+    def __init__(self, injection: Injection):
+        super().__init__()
+        self.injection = injection
+        self.app.router.add_get("/v1/models", self.models)
+        self.app.router.add_post("/v1/chat/completions", self.completions)
+        self.app.router.add_post("/v1/embeddings", self.embeddings)
+
+    async def models(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "object": "list", "data": [{"id": "stub", "object": "model"}]
+        })
+
+    async def completions(self, request: web.Request) -> web.Response:
+        self.count("requests")
+        body = await request.json()
+        await self.injection.delay()
+        if self.injection.should_fail():
+            self.count("errors")
+            return web.json_response(
+                {"error": {"message": "injected", "type": "server_error"}},
+                status=500
+            )
+
+        prompt_tokens = sum(
+            len(str(message.get("content", "")).split())
+            for message in body.get("messages", [])
+        )
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": STUB_ANSWER},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(STUB_ANSWER.split()),
+                "total_tokens": prompt_tokens + len(STUB_ANSWER.split())
+            }
+        })
+
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        # Not subject to the injected generation latency and errors
+        self.count("embedding_requests")
+        body = await request.json()
+        texts = body.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        self.counters["embedded_texts"] = (
+            self.counters.get("embedded_texts", 0) + len(texts)
+        )
+        return web.json_response({
+            "object": "list",
+            "model": body.get("model", "stub"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": vector}
+                for i, vector in enumerate(_embed(texts))
+            ],
+            "usage": {"prompt_tokens": sum(
+                len(text.split()) for text in texts
+            )}
+        })
+
+
+class StubSlack(StubServer):
+    """Socket Mode websocket plus the Web API methods the bot calls
+
+    Events pushed with send_event() are timed from send to ack and from
+    send to the bot's reply (matched by channel and thread_ts).
+    """
+
+    def __init__(self, injection: Injection, rate_limit_rate: float = 0.0):
+        super().__init__()
+        self.injection = injection
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(0)
+        self._socket: Optional[web.WebSocketResponse] = None
+        self.connected = asyncio.Event()
+        self.sent: Dict[str, float] = {}  # envelope_id -> send time
+        self.acked: Dict[str, float] = {}
+        self.events: Dict[str, str] = {}  # "channel:ts" -> envelope_id
+        self.replies: Dict[str, Dict[str, Any]] = {}  # envelope_id -> reply
+        self.app.router.add_post(
+            "/api/apps.connections.open", self.connections_open
+        )
+        self.app.router.add_post("/api/chat.postMessage", self.post_message)
+        self.app.router.add_post("/api/chat.update", self.post_message)
+        self.app.router.add_get("/link", self.socket)
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/api/"
+
+    async def connections_open(self, request: web.Request) -> web.Response:
+        ws_url = self.url.replace("http://", "ws://") + "/link"
+        return web.json_response({"ok": True, "url": ws_url})
+
+    async def socket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._socket = ws
+        await ws.send_str(json.dumps({"type": "hello", "num_connections": 1}))
+        self.connected.set()
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            envelope_id = json.loads(message.data).get("envelope_id")
+            if envelope_id in self.sent and envelope_id not in self.acked:
+                self.acked[envelope_id] = time.perf_counter()
+        return ws
+
+    async def send_event(self, event: Dict[str, Any]) -> str:
+        """Deliver one events_api envelope over the socket"""
+        envelope_id = uuid.uuid4().hex
+        self.events[f"{event['channel']}:{event['ts']}"] = envelope_id
+        self.sent[envelope_id] = time.perf_counter()
+        await self._socket.send_str(json.dumps({
+            "envelope_id": envelope_id,
+            "type": "events_api",
+            "accepts_response_payload": False,
+            "payload": {
+                "event_id": f"Ev{envelope_id[:10]}",
+                "type": "event_callback",
+                "event": event
+            }
+        }))
+        return envelope_id
+
+    async def post_message(self, request: web.Request) -> web.Response:
+        self.count("web_api_calls")
+        if request.content_type == "application/json":
+            body = await request.json()
+        else:
+            body = dict(await request.post())
+        await self.injection.delay()
+
+        if self._random.random() < self.rate_limit_rate:
+            self.count("rate_limited")
+            return web.json_response(
+                {"ok": False, "error": "ratelimited"},
+                status=429,
+                headers={"Retry-After": "1"}
+            )
+        if self.injection.should_fail():
+            self.count("errors")
+            return web.json_response({"ok": False, "error": "internal_error"})
+
+        key = f"{body.get('channel')}:{body.get('thread_ts')}"
+        envelope_id = self.events.get(key)
+        if envelope_id is not None and envelope_id not in self.replies:
+            self.replies[envelope_id] = {
+                "at": time.perf_counter(), "text": body.get("text", "")
+            }
+        return web.json_response({
+            "ok": True,
+            "channel": body.get("channel"),
+            "ts": f"{time.time():.6f}"
+        })
+
+
+class StubOllama(StubServer):
+    """Ollama chat/generate/ps/tags with model load latency and expiry
+
+    A model takes `load_latency` seconds to load when it isn't resident and
+    is unloaded once its keep_alive (from the request, else the server
+    default) passes without a request, as the real server does.
+    """
+
+    def __init__(
+        self,
+        injection: Injection,
+        load_latency: float = 2.0,
+        default_keep_alive: str = "5m"
+    ):
+        super().__init__()
+        self.injection = injection
+        self.load_latency = load_latency
+        self.default_keep_alive = default_keep_alive
+        self._expires: Dict[str, Optional[float]] = {}  # None: never
+        self._load_lock = asyncio.Lock()
+        self.app.router.add_post("/api/chat", self.chat)
+        self.app.router.add_post("/api/generate", self.generate)
+        self.app.router.add_get("/api/ps", self.ps)
+        self.app.router.add_get("/api/tags", self.tags)
+        self.app.router.add_post("/api/embed", self.embed)
+
+    def is_loaded(self, model: str) -> bool:
+        if model not in self._expires:
+            return False
+        expires = self._expires[model]
+        return expires is None or expires > time.monotonic()
+
+    def unload_all(self) -> None:
+        self._expires.clear()
+
+    async def _use_model(self, body: Dict[str, Any]) -> int:
+        """Load the model if needed; returns the load time in nanoseconds"""
+        model = body.get("model", "stub")
+        load_ns = 0
+        # Concurrent requests for a cold model wait for the same load
+        async with self._load_lock:
+            if not self.is_loaded(model):
+                self.count("loads")
+                start = time.perf_counter_ns()
+                await asyncio.sleep(self.load_latency)
+                load_ns = time.perf_counter_ns() - start
+        keep_alive = parse_keep_alive(
+            body.get("keep_alive", self.default_keep_alive)
+        )
+        self._expires[model] = (
+            None if keep_alive is None else time.monotonic() + keep_alive
+        )
+        return load_ns
+
+    async def chat(self, request: web.Request) -> web.Response:
+        self.count("requests")
+        body = await request.json()
+        load_ns = await self._use_model(body)
+        await self.injection.delay()
+        if self.injection.should_fail():
+            self.count("errors")
+            return web.json_response({"error": "injected"}, status=500)
+
+        prompt_tokens = sum(
+            len(str(message.get("content", "")).split())
+            for message in body.get("messages", [])
+        )
+        return web.json_response({
+            "model": body.get("model", "stub"),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": STUB_ANSWER},
+            "done": True,
+            "load_duration": load_ns,
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": len(STUB_ANSWER.split())
+        })
+
+    async def generate(self, request: web.Request) -> web.Response:
+        # Only the prompt-less form Ollama documents for loading a model
+        self.count("generate")
+        body = await request.json()
+        load_ns = await self._use_model(body)
+        return web.json_response({
+            "model": body.get("model", "stub"),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": "",
+            "done": True,
+            "done_reason": "load",
+            "load_duration": load_ns
+        })
+
+    async def ps(self, request: web.Request) -> web.Response:
+        now = time.monotonic()
+        models = []
+        for model, expires in self._expires.items():
+            if not self.is_loaded(model):
+                continue
+            remaining = (
+                timedelta(days=3650) if expires is None
+                else timedelta(seconds=expires - now)
+            )
+            models.append({
+                "name": model,
+                "model": model,
+                "expires_at": (
+                    datetime.now(timezone.utc) + remaining
+                ).isoformat()
+            })
+        return web.json_response({"models": models})
+
+    async def embed(self, request: web.Request) -> web.Response:
+        self.count("embed")
+        body = await request.json()
+        load_ns = await self._use_model(body)
+        texts = body.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        return web.json_response({
+            "model": body.get("model", "stub"),
+            "embeddings": _embed(texts),
+            "load_duration": load_ns,
+            "prompt_eval_count": sum(len(text.split()) for text in texts)
+        })
+
+    async def tags(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "models": [{"name": model} for model in self._expires]
+        })
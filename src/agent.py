@@ -1,138 +1,161 @@
-from openai import OpenAI
-from typing import List, Dict
-import re
-import html
+from typing import Dict, List, Optional
 import logging
-from .config import OPENAI_API_KEY, TEMPERATURE, AGENT_CONFIG
+from .config import AGENT_CONFIG
+from .metrics import FALLBACK_RESPONSES, RATE_LIMIT_REJECTIONS
+from .tracing import current_span, tracer
+from .rate_limiter import create_rate_limiter
+from .sanitizer import QueryVerdict, clean_context, inspect_query
+from .llm_client import LLMClient
 
 logger = logging.getLogger(__name__)
 
 
 class GitTalkerAgent:
-    def __init__(self):
+    def __init__(self, llm_client: Optional[LLMClient] = None):
         """Initialize GitTalker agent with enhanced security."""
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        # Provider and model are picked per request by the client's router
+        self.llm_client = llm_client or LLMClient()
         self.config = AGENT_CONFIG
         self.name = self.config["name"]
-        self.query_count = {}  # Simple rate limiting
+        self.rate_limiter = create_rate_limiter()
+        # Built once so every request starts with byte-identical tokens
+        self.system_prompt = self._build_enhanced_system_prompt()
         
     def _sanitize_input(self, text: str) -> str:
         """Sanitize user input to prevent injection attacks."""
-        if not text or not isinstance(text, str):
-            return ""
-            
-        # Remove potentially dangerous characters
-        text = html.escape(text)
-        
-        # Remove script tags and javascript
-        text = re.sub(r'<script.*?</script>', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'javascript:', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'eval\s*\(', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'exec\s*\(', '', text, flags=re.IGNORECASE)
-        
-        # Limit length to prevent DoS
-        if len(text) > 2000:
-            text = text[:2000]
-            
-        return text.strip()
-        
-    def _check_rate_limit(self, user_id: str = "default") -> bool:
-        """Simple rate limiting - max 10 queries per minute."""
-        import time
-        current_time = time.time()
+        return inspect_query(text).text
         
-        if user_id not in self.query_count:
-            self.query_count[user_id] = []
-            
-        # Remove queries older than 1 minute
-        self.query_count[user_id] = [
-            t for t in self.query_count[user_id]
-            if current_time - t < 60
-        ]
-        
-        # Check if under limit
-        if len(self.query_count[user_id]) >= 10:
-            return False
-            
-        # Add current query
-        self.query_count[user_id].append(current_time)
-        return True
+    async def check_rate_limit(
+        self, user_id: str, channel: Optional[str] = None
+    ) -> bool:
+        """Rate limit per Slack user per channel (MAX_REQUESTS_PER_MINUTE)."""
+        allowed = await self.rate_limiter.allow(f"{channel or '-'}:{user_id}")
+        if not allowed:
+            RATE_LIMIT_REJECTIONS.inc()
+        return allowed
+    
+    def rate_limited_response(self) -> str:
+        """Response used when a user is over their rate limit."""
+        return (
+            "Whoa there! You're asking questions faster than I can think! "
+            "Take a breather and try again in a minute. 🔥"
+        )
         
-    async def generate_response(self, query: str, context: str) -> str:
-        """Generate response with security and scope enforcement."""
-        # Sanitize input
-        query = self._sanitize_input(query)
-        context = self._sanitize_input(context)
+    async def generate_response(
+        self,
+        query: str,
+        context: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        retrieval_score: Optional[float] = None,
+        tier: Optional[str] = None
+    ) -> str:
+        """Generate response with security and scope enforcement.
         
-        # Rate limiting check
-        if not self._check_rate_limit():
-            return (
-                "Whoa there! You're asking questions faster than I can think! "
-                "Take a breather and try again in a minute. 🔥"
+        retrieval_score (the best chunk's) lets the router send easy,
+        well-covered questions to a fast local model; tier overrides it.
+        """
+        with tracer.start_span("agent.generate_response"):
+            return await self._generate_response(
+                query, context, history, retrieval_score, tier
             )
         
+    async def _generate_response(
+        self,
+        query: str,
+        context: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        retrieval_score: Optional[float] = None,
+        tier: Optional[str] = None
+    ) -> str:
+        """Run the guarded generation pipeline for one query."""
+        # Sanitize input (retrieved docs are trusted, only bounded)
+        verdict = inspect_query(query)
+        query = verdict.text
+        context = clean_context(context)
+        
         # Check for out-of-scope queries
-        if self._is_out_of_scope(query, context):
+        if self._is_out_of_scope(verdict, context):
             return self._get_fallback_response("out_of_scope")
             
         # Check if we have relevant context
         if not context.strip():
             return self._get_fallback_response("no_docs_found")
             
-        system_prompt = self._build_enhanced_system_prompt(context)
-        
+        tier = tier or self.llm_client.router.classify(
+            query, retrieval_score, len(history or [])
+        )
+        span = current_span()
+        if span is not None:
+            span.set_attribute("tier", tier)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Using faster, better model
-                temperature=TEMPERATURE,
-                max_tokens=800,  # More generous token limit
-                timeout=30,  # 30 second timeout
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": self._enhance_user_query(query)
-                    }
-                ]
+            result = await self.llm_client.generate_response(
+                self._build_messages(query, context, history), tier=tier
             )
-            
-            return self._post_process_response(
-                response.choices[0].message.content
-            )
-            
         except Exception:
-            logger.error("OpenAI API error occurred")
+            logger.error("LLM generation failed on every provider")
             return self._get_fallback_response("technical_limits")
+            
+        return self._post_process_response(result["content"])
     
-    def _build_enhanced_system_prompt(self, context: str) -> str:
-        """Build comprehensive system prompt with personality and context."""
+    def _build_enhanced_system_prompt(self) -> str:
+        """Build the static system prompt with personality and scope."""
         base_prompt = self.config["system_prompt"]
         
         return f"""{base_prompt}
 
-DOCUMENTATION CONTEXT FROM GITTALKER/ DIRECTORY:
-{context}
+Answer from the documentation context included with each question.
 
 Remember: Be enthusiastic and helpful while staying strictly within the repository documentation scope!"""
     
-    def _is_out_of_scope(self, query: str, context: str) -> bool:
+    def _build_messages(
+        self,
+        query: str,
+        context: str,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """Lay out the prompt from most to least stable.
+        
+        The persona never changes and thread history only grows, so both
+        form a prefix providers can cache; per-request context goes last.
+        The persona is the only system message: a summary of folded turns
+        rides in the first user turn (see conversation.Thread.messages).
+        """
+        return [
+            {"role": "system", "content": self.system_prompt},
+            *self._history_messages(history),
+            {
+                "role": "user",
+                "content": self._enhance_user_query(query, context)
+            }
+        ]
+    
+    def _history_messages(
+        self, history: Optional[List[Dict[str, str]]]
+    ) -> List[Dict[str, str]]:
+        """Earlier turns of the thread, with user text sanitized."""
+        messages = []
+        for message in history or []:
+            content = message["content"]
+            if message["role"] == "user":
+                content = self._sanitize_input(content)
+            messages.append({"role": message["role"], "content": content})
+        return messages
+    
+    def _is_out_of_scope(self, verdict: QueryVerdict, context: str) -> bool:
         """Check if query is outside our knowledge scope."""
         # If no relevant context found, it's likely out of scope
         if not context or len(context.strip()) < 50:
             return True
             
         # Keywords that suggest out-of-scope queries
-        out_of_scope_indicators = [
-            "personal", "weather", "news", "politics", "general programming",
-            "unrelated", "off-topic", "what is", "who is", "when did",
-            "wikipedia", "google", "search", "find me", "tell me about life"
-        ]
-        
-        query_lower = query.lower()
-        return any(indicator in query_lower for indicator in out_of_scope_indicators)
+        return verdict.out_of_scope_keyword is not None
     
     def _get_fallback_response(self, fallback_type: str) -> str:
         """Get appropriate fallback response with urban flair."""
+        FALLBACK_RESPONSES.labels(fallback_type).inc()
+        span = current_span()
+        if span is not None:
+            span.set_attribute("fallback", fallback_type)
         fallbacks = self.config.get("fallbacks", {})
         base_response = fallbacks.get(
             fallback_type,
@@ -152,9 +175,31 @@ Remember: Be enthusiastic and helpful while staying strictly within the reposito
             
         return starter + base_response
     
-    def _enhance_user_query(self, query: str) -> str:
-        """Add context hints to user query with urban energy."""
-        return f"""User question about our repo/build: {query}
+    def busy_response(self) -> str:
+        """Response used when the bot is shedding load."""
+        return self._get_fallback_response("busy")
+    
+    def budget_response(self) -> str:
+        """Response used when the LLM budget is spent."""
+        return self._get_fallback_response("budget_exhausted")
+    
+    def no_docs_response(self) -> str:
+        """Response used when retrieval found nothing relevant enough."""
+        return self._get_fallback_response("no_docs_found")
+    
+    def is_fallback_response(self, response: str) -> bool:
+        """Whether a response is one of the canned fallbacks."""
+        return any(
+            fallback in response
+            for fallback in self.config.get("fallbacks", {}).values()
+        )
+    
+    def _enhance_user_query(self, query: str, context: str) -> str:
+        """Add docs context and hints to user query with urban energy."""
+        return f"""DOCUMENTATION CONTEXT FROM GITTALKER/ DIRECTORY:
+{context}
+
+User question about our repo/build: {query}
 
 Please respond with that urban energy while referencing specific docs
 when possible. Keep it 100! 💯"""
@@ -177,17 +222,7 @@ when possible. Keep it 100! 💯"""
     
     def is_valid_query(self, query: str) -> bool:
         """Enhanced validation for incoming queries."""
-        if not query or len(query.strip()) < 3:
-            return False
-            
-        # Check for malicious patterns
-        dangerous_patterns = ["<script", "javascript:", "eval(", "exec("]
-        query_lower = query.lower()
-        
-        if any(pattern in query_lower for pattern in dangerous_patterns):
-            return False
-            
-        return True
+        return inspect_query(query).is_valid
     
     def get_personality_info(self) -> dict:
         """Get agent personality information for debugging/monitoring."""
@@ -120,9 +120,19 @@ RESPONSE STYLE:
             "You gotta holler at Mike - he's got the full picture! 📚"
         ),
         
+        "busy": (
+            "I'm juggling a ton of questions right now, fam. Give me a "
+            "minute and hit me again! ⏳"
+        ),
+        
         "technical_limits": (
             "Yo, that's getting into some next-level territory beyond what "
             "I can help with. Mike's your guy for that one! 🔧"
+        ),
+        
+        "budget_exhausted": (
+            "I've burned through my question budget for now, fam. Try me "
+            "again later or holler at Mike! 💸"
         )
     }
 }
@@ -165,12 +175,169 @@ VLLM_TRUST_REMOTE_CODE = (
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
 MAX_CONTEXT_LENGTH = int(os.getenv("MAX_CONTEXT_LENGTH", "4000"))
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2000"))
+# Mark the static system prompt (and thread history) as cacheable for
+# providers that need explicit breakpoints (Anthropic cache_control)
+LLM_PROMPT_CACHING = (
+    os.getenv("LLM_PROMPT_CACHING", "true").lower() == "true"
+)
+
+# Local models (Ollama/vLLM) in the provider chain that are primary or have
+# their base URL set are loaded in the background at startup and pinged after LLM_KEEPALIVE_INTERVAL idle seconds (0 disables the pings) so
+# questions don't pay a cold model load; keep it well below OLLAMA_KEEP_ALIVE
+LLM_PRELOAD = os.getenv("LLM_PRELOAD", "true").lower() == "true"
+LLM_KEEPALIVE_INTERVAL = int(os.getenv("LLM_KEEPALIVE_INTERVAL", "120"))
+
+# Route short questions with a confident retrieval (best chunk scoring at
+# least LLM_ROUTER_MIN_SCORE, at most LLM_ROUTER_SIMPLE_MAX_WORDS words) to
+# local providers and the rest to hosted ones. Providers whose recent p95
+# exceeds LLM_LATENCY_SLO seconds or whose error rate exceeds
+# LLM_ROUTER_MAX_ERROR_RATE (over their last LLM_ROUTER_WINDOW calls) are
+# tried last. Disabled, every request starts at PRIMARY_LLM_PROVIDER.
+LLM_ROUTING = os.getenv("LLM_ROUTING", "true").lower() == "true"
+LLM_LATENCY_SLO = float(os.getenv("LLM_LATENCY_SLO", "10"))
+LLM_ROUTER_MIN_SCORE = float(os.getenv("LLM_ROUTER_MIN_SCORE", "0.5"))
+LLM_ROUTER_SIMPLE_MAX_WORDS = int(
+    os.getenv("LLM_ROUTER_SIMPLE_MAX_WORDS", "25")
+)
+LLM_ROUTER_MAX_ERROR_RATE = float(
+    os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.3")
+)
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "50"))
+
+# Usage ledger (GET /usage): estimated cost from per-model prices, extended
+# or overridden by LLM_PRICES as JSON {"model": [prompt, cached, completion]}
+# in USD per million tokens. Budgets are USD per rolling USAGE_BUDGET_WINDOW
+# seconds, overall and per Slack channel (0 disables). Past
+# USAGE_BUDGET_SOFT_LIMIT of a budget, answers use USAGE_DEGRADED_TOP_K
+# chunks on the cheapest (local-first) route; past the budget, only
+# precomputed FAQ answers are served.
+LLM_PRICES = os.getenv("LLM_PRICES")
+USAGE_DAILY_BUDGET = float(os.getenv("USAGE_DAILY_BUDGET", "0"))
+USAGE_CHANNEL_DAILY_BUDGET = float(
+    os.getenv("USAGE_CHANNEL_DAILY_BUDGET", "0")
+)
+USAGE_BUDGET_WINDOW = float(os.getenv("USAGE_BUDGET_WINDOW", "86400"))
+USAGE_BUDGET_SOFT_LIMIT = float(os.getenv("USAGE_BUDGET_SOFT_LIMIT", "0.8"))
+USAGE_DEGRADED_TOP_K = int(os.getenv("USAGE_DEGRADED_TOP_K", "1"))
 
 # Rate Limiting and Retry Configuration
 MAX_REQUESTS_PER_MINUTE = int(os.getenv("MAX_REQUESTS_PER_MINUTE", "60"))
+# Per user per channel; burst defaults to the full per-minute allowance
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "0")) or None
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
 
+# Slack Event Dispatch Configuration
+SLACK_WORKER_CONCURRENCY = int(os.getenv("SLACK_WORKER_CONCURRENCY", "4"))
+SLACK_QUEUE_MAX_DEPTH = int(os.getenv("SLACK_QUEUE_MAX_DEPTH", "100"))
+SLACK_QUEUE_MAX_PER_CHANNEL = int(
+    os.getenv("SLACK_QUEUE_MAX_PER_CHANNEL", "10")
+)
+SLACK_MAX_CONNECTIONS = int(os.getenv("SLACK_MAX_CONNECTIONS", "20"))
+# chat.postMessage allows roughly one message per second per channel
+SLACK_CHANNEL_POST_INTERVAL = float(
+    os.getenv("SLACK_CHANNEL_POST_INTERVAL", "1.0")
+)
+SLACK_EVENT_DEDUPE_WINDOW = int(os.getenv("SLACK_EVENT_DEDUPE_WINDOW", "300"))
+# Shed events get at most one "busy" reply per channel in this many seconds
+SLACK_BUSY_REPLY_INTERVAL = int(os.getenv("SLACK_BUSY_REPLY_INTERVAL", "60"))
+
+# Conversation Memory Configuration
+# Threads kept in memory (LRU), token budget of history per thread (older
+# turns are summarised), and seconds of inactivity before a thread is dropped
+CONVERSATION_MAX_THREADS = int(os.getenv("CONVERSATION_MAX_THREADS", "1000"))
+CONVERSATION_TOKEN_BUDGET = int(
+    os.getenv("CONVERSATION_TOKEN_BUDGET", "1500")
+)
+CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", "3600"))
+
+# Readiness Configuration
+LLM_HEALTH_CHECK_TTL = int(os.getenv("LLM_HEALTH_CHECK_TTL", "60"))
+
+# Tracing Configuration
+# TRACE_EXPORTER: jsonl (local file), otlp (OTLP/HTTP JSON collector) or none
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "logs/traces.jsonl")
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", "52428800"))
+TRACE_OTLP_ENDPOINT = os.getenv(
+    "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+)
+
+# Embedding Configuration
+# Worker processes for index builds (1 = in-process) and encode batch size;
+# tune the batch size with `python -m src.indexer tune-batch`
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+# "sentence-transformers" (PyTorch fp32) or "onnx" (ONNX Runtime, exported
+# to EMBEDDING_MODEL_DIR on first use; EMBEDDING_QUANTIZE=true for int8);
+# "hashing" is a model-free stub embedder for offline benchmarks; "remote"
+# calls a shared embedding server (see EMBEDDING_REMOTE_* below)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+EMBEDDING_QUANTIZE = (
+    os.getenv("EMBEDDING_QUANTIZE", "false").lower() == "true"
+)
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", "models")
+# Remote embeddings: the /embeddings (openai, vllm) or /api/embed (ollama)
+# endpoint at that provider's base URL, serving EMBEDDING_REMOTE_MODEL
+# (defaults to the local model's name). Texts go in batches of
+# EMBEDDING_REMOTE_BATCH_SIZE over pooled connections; when the server
+# fails, the local model answers instead (if EMBEDDING_REMOTE_FALLBACK) and
+# the server is retried after EMBEDDING_REMOTE_RETRY_AFTER seconds. The
+# fallback is only correct if the server runs that same model.
+EMBEDDING_REMOTE_PROVIDER = os.getenv("EMBEDDING_REMOTE_PROVIDER", "openai")
+EMBEDDING_REMOTE_MODEL = os.getenv("EMBEDDING_REMOTE_MODEL")
+EMBEDDING_REMOTE_BATCH_SIZE = int(
+    os.getenv("EMBEDDING_REMOTE_BATCH_SIZE", "64")
+)
+EMBEDDING_REMOTE_MAX_CONNECTIONS = int(
+    os.getenv("EMBEDDING_REMOTE_MAX_CONNECTIONS", "8")
+)
+EMBEDDING_REMOTE_TIMEOUT = float(os.getenv("EMBEDDING_REMOTE_TIMEOUT", "30"))
+EMBEDDING_REMOTE_FALLBACK = (
+    os.getenv("EMBEDDING_REMOTE_FALLBACK", "true").lower() == "true"
+)
+EMBEDDING_REMOTE_RETRY_AFTER = float(
+    os.getenv("EMBEDDING_REMOTE_RETRY_AFTER", "30")
+)
+
+# Shared Index Configuration
+# INDEX_MODE: local (build in-process), publish (build, then publish to
+# INDEX_DIR for replicas) or replica (serve the latest published index)
+INDEX_MODE = os.getenv("INDEX_MODE", "local").lower()
+INDEX_DIR = os.getenv("INDEX_DIR", "index")
+INDEX_KEEP_GENERATIONS = int(os.getenv("INDEX_KEEP_GENERATIONS", "3"))
+INDEX_RELOAD_INTERVAL = int(os.getenv("INDEX_RELOAD_INTERVAL", "30"))
+# Questions whose best chunk scores below this get the no_docs_found reply
+# without an LLM call (cosine similarity; 0 disables the gate)
+RETRIEVAL_MIN_SCORE = float(os.getenv("RETRIEVAL_MIN_SCORE", "0.2"))
+
+# Precomputed answers for curated (FAQ_FILE, JSON list of question/answer)
+# and frequently asked questions, served when a question is at least
+# FAQ_MIN_SIMILARITY alike; refreshed every FAQ_REFRESH_INTERVAL seconds
+FAQ_FILE = os.getenv("FAQ_FILE")
+FAQ_MIN_SIMILARITY = float(os.getenv("FAQ_MIN_SIMILARITY", "0.92"))
+FAQ_MAX_ENTRIES = int(os.getenv("FAQ_MAX_ENTRIES", "200"))
+FAQ_MIN_ASKS = int(os.getenv("FAQ_MIN_ASKS", "3"))
+FAQ_REFRESH_INTERVAL = int(os.getenv("FAQ_REFRESH_INTERVAL", "600"))
+
+# Shards searched per query when the channel has no source mapping, picked
+# by similarity to each shard's centroid (0 searches every shard)
+SEARCH_MAX_SHARDS = int(os.getenv("SEARCH_MAX_SHARDS", "4"))
+
+# Chunks put in the prompt: up to SEARCH_TOP_K, picked by maximal marginal
+# relevance from the SEARCH_FETCH_K best (lambda 1 ranks by score alone,
+# lower values favour chunks unlike those already picked), and none
+# scoring below SEARCH_MIN_RELATIVE_SCORE times the best (0 disables)
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "3"))
+SEARCH_FETCH_K = int(os.getenv("SEARCH_FETCH_K", "20"))
+SEARCH_MMR_LAMBDA = float(os.getenv("SEARCH_MMR_LAMBDA", "0.7"))
+SEARCH_MIN_RELATIVE_SCORE = float(
+    os.getenv("SEARCH_MIN_RELATIVE_SCORE", "0.75")
+)
+
 # Fallback Configuration
 ENABLE_LLM_FALLBACK = (
     os.getenv("ENABLE_LLM_FALLBACK", "true").lower() == "true"
@@ -199,14 +366,23 @@ LLM_CONFIGS = {
         "base_url": OLLAMA_BASE_URL,
         "model": OLLAMA_MODEL,
         "keep_alive": OLLAMA_KEEP_ALIVE,
-        "enabled": True  # Always enabled if URL is accessible
+        "enabled": True,  # Always enabled if URL is accessible
+        # Set up on purpose (not just listed in FALLBACK_ORDER): preloaded
+        "configured": (
+            PRIMARY_LLM_PROVIDER == "ollama"
+            or bool(os.getenv("OLLAMA_BASE_URL"))
+        )
     },
     "vllm": {
         "base_url": VLLM_BASE_URL,
         "model": VLLM_MODEL,
         "api_key": VLLM_API_KEY,
         "trust_remote_code": VLLM_TRUST_REMOTE_CODE,
-        "enabled": bool(VLLM_BASE_URL)
+        "enabled": bool(VLLM_BASE_URL),
+        "configured": (
+            PRIMARY_LLM_PROVIDER == "vllm"
+            or bool(os.getenv("VLLM_BASE_URL"))
+        )
     }
 }
 
@@ -214,7 +390,13 @@ LLM_CONFIGS = {
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_REPO = os.getenv("GITHUB_REPO")
 GITHUB_DOCS_PATH = os.getenv("GITHUB_DOCS_PATH", "docs/")
+GITHUB_DOCS_REF = os.getenv("GITHUB_DOCS_REF", "main")
+# JSON list of sources (repo, ref, paths, channels), one index shard each;
+# unset means the single GITHUB_REPO source above
+DOC_SOURCES_FILE = os.getenv("DOC_SOURCES_FILE")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
 
 # Slack Configuration
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
+SLACK_API_URL = os.getenv("SLACK_API_URL", "https://slack.com/api/")
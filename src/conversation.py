@@ -0,0 +1,165 @@
+"""
+Conversation memory for GitTalker
+Bounded per-thread history so follow-up questions keep their context: an LRU
+of threads, a token budget per thread with older turns folded into a short
+summary, and follow-up rewriting for retrieval
+"""
+
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .metrics import CONVERSATION_THREADS
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_WORD = re.compile(r"\w+")
+_FOLLOW_UP_START = re.compile(
+    r"^\s*(and|also|but|or|so|then|what about|how about|same|ok|okay)\b",
+    re.IGNORECASE
+)
+_REFERENCE = re.compile(
+    r"\b(it|its|that|this|those|these|them|they|there|one|ones)\b",
+    re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def _first_sentence(text: str, max_chars: int = 160) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    return sentence[:max_chars]
+
+
+class Thread:
+    """Recent turns of one Slack thread plus a summary of older ones"""
+
+    def __init__(self):
+        self.turns: Deque[Tuple[str, str]] = deque()  # (question, answer)
+        self.summary = ""
+        self.topic: Optional[str] = None  # Last self-contained question
+        self.tokens = 0
+        self.last_active = time.monotonic()
+
+    def add(self, question: str, answer: str, token_budget: int) -> None:
+        self.turns.append((question, answer))
+        self.tokens += estimate_tokens(question) + estimate_tokens(answer)
+        self.last_active = time.monotonic()
+
+        # Fold the oldest turns into the summary until back under budget,
+        # always keeping the latest turn verbatim
+        while self.tokens > token_budget and len(self.turns) > 1:
+            old_question, old_answer = self.turns.popleft()
+            self.tokens -= (
+                estimate_tokens(old_question) + estimate_tokens(old_answer)
+            )
+            note = (
+                f"Q: {_first_sentence(old_question)} "
+                f"A: {_first_sentence(old_answer)}"
+            )
+            self.summary = f"{self.summary}\n{note}".strip()
+
+        # Cap the summary at about a quarter of the budget (in characters
+        # that's the budget itself); the oldest notes go first
+        if len(self.summary) > token_budget:
+            self.summary = self.summary[-token_budget:].split("\n", 1)[-1]
+
+    def messages(self) -> List[Dict[str, str]]:
+        """History as chat messages, oldest first
+
+        The summary of folded turns opens the first user turn rather than
+        being a system message of its own: a system message mid-history is
+        hoisted out of order by Anthropic and splits the cacheable prefix
+        after the persona for the others.
+        """
+        messages = []
+        for question, answer in self.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        if self.summary and messages:
+            messages[0]["content"] = (
+                f"Earlier in this thread:\n{self.summary}\n\n"
+                f"{messages[0]['content']}"
+            )
+        return messages
+
+
+class ConversationStore:
+    """LRU of recent threads with idle expiry and a per-thread token budget"""
+
+    def __init__(
+        self,
+        max_threads: int = 1000,
+        token_budget: int = 1500,
+        ttl_seconds: float = 3600
+    ):
+        self.max_threads = max_threads
+        self.token_budget = token_budget
+        self.ttl_seconds = ttl_seconds
+        self._threads: "OrderedDict[str, Thread]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Thread]:
+        """The thread's state, or None if unknown or expired"""
+        self._expire(time.monotonic())
+        return self._threads.get(key)
+
+    def history(self, key: str) -> List[Dict[str, str]]:
+        """Chat messages for a thread (empty for a new conversation)"""
+        thread = self.get(key)
+        return thread.messages() if thread is not None else []
+
+    def add_turn(
+        self,
+        key: str,
+        question: str,
+        answer: str,
+        topic: Optional[str] = None
+    ) -> None:
+        """Record a question and the answer given in a thread"""
+        thread = self.get(key)
+        if thread is None:
+            thread = self._threads[key] = Thread()
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+        thread.add(question, answer, self.token_budget)
+        thread.topic = topic or question
+        self._threads.move_to_end(key)
+        CONVERSATION_THREADS.set(len(self._threads))
+
+    def _expire(self, now: float) -> None:
+        # Ordered by last turn, so idle threads are at the front
+        while self._threads:
+            key, thread = next(iter(self._threads.items()))
+            if now - thread.last_active < self.ttl_seconds:
+                break
+            del self._threads[key]
+        CONVERSATION_THREADS.set(len(self._threads))
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+
+def is_follow_up(query: str) -> bool:
+    """Whether a question leans on earlier ones ("and for Docker?")"""
+    words = _WORD.findall(query)
+    return (
+        len(words) <= 4
+        or _FOLLOW_UP_START.search(query) is not None
+        or (len(words) <= 12 and _REFERENCE.search(query) is not None)
+    )
+
+
+def rewrite_query(query: str, topic: Optional[str]) -> Tuple[str, str]:
+    """Make a follow-up self-contained for retrieval
+
+    Returns the query to search with and the thread's topic afterwards:
+    "and for Docker?" after "How do I deploy?" searches for both, without
+    an extra LLM round-trip, and keeps "How do I deploy?" as the topic so
+    chains of follow-ups don't grow the search query.
+    """
+    if topic and is_follow_up(query):
+        return f"{topic} {query}", topic
+    return query, query
@@ -0,0 +1,87 @@
+"""
+Duplicate suppression for GitTalker
+Drops redelivered Slack events and coalesces identical in-flight questions
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form used to spot the same question asked twice"""
+    query = _NON_WORD.sub(" ", query.lower())
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class RecentKeys:
+    """Remembers keys for a time window with a hard cap on entries"""
+
+    def __init__(self, window_seconds: float = 300, max_keys: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    def seen(self, key: str) -> bool:
+        """Record a key; True if it was already seen within the window"""
+        now = time.monotonic()
+        self._expire(now)
+        if key in self._seen:
+            return True
+        self._seen[key] = now
+        if len(self._seen) > self.max_keys:
+            self._seen.popitem(last=False)
+        return False
+
+    def _expire(self, now: float) -> None:
+        # Entries are in insertion order, so expired ones are at the front
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.window_seconds:
+                break
+            del self._seen[key]
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class SingleFlight:
+    """Share one execution between concurrent callers with the same key"""
+
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+
+    def is_inflight(self, key: str) -> bool:
+        """Whether a call for this key is currently running"""
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn, or wait for the already-running call for this key"""
+        future = self._inflight.get(key)
+        if future is not None:
+            # Shield so one waiter cancelling doesn't cancel the others
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved when nobody waits
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,104 @@
+"""
+Bounded event dispatcher for GitTalker
+Runs Slack work on a fixed pool of asyncio workers with per-channel queues,
+round-robin fairness between channels and load shedding when saturated
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Tuple
+
+from .metrics import DISPATCH_QUEUE_DEPTH, DISPATCH_SHED, STAGE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class EventDispatcher:
+    """Fixed-size worker pool fed by per-channel FIFO queues"""
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_queue_depth: int = 100,
+        max_per_channel: int = 10
+    ):
+        self.concurrency = concurrency
+        self.max_queue_depth = max_queue_depth
+        self.max_per_channel = max_per_channel
+        self._queues: Dict[str, Deque[Tuple[Job, float]]] = {}
+        self._rotation: Deque[str] = deque()  # Channels with pending work
+        self._pending = 0
+        self._available = asyncio.Semaphore(0)
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a worker"""
+        return self._pending
+
+    def start(self) -> None:
+        """Spawn the worker tasks on the running event loop"""
+        if self._workers:
+            return
+        # Bind the semaphore to the loop the workers run on
+        self._available = asyncio.Semaphore(self._pending)
+        for i in range(self.concurrency):
+            self._workers.append(
+                asyncio.create_task(self._worker(), name=f"dispatcher-{i}")
+            )
+
+    async def stop(self) -> None:
+        """Cancel workers; queued jobs are dropped"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, channel: str, job: Job) -> bool:
+        """Queue a job for a channel; False means it was shed"""
+        channel_queue = self._queues.get(channel)
+        channel_depth = len(channel_queue) if channel_queue else 0
+        if (self._pending >= self.max_queue_depth
+                or channel_depth >= self.max_per_channel):
+            DISPATCH_SHED.inc()
+            return False
+
+        if channel_queue is None:
+            channel_queue = self._queues[channel] = deque()
+            self._rotation.append(channel)
+        channel_queue.append((job, time.perf_counter()))
+        self._pending += 1
+        DISPATCH_QUEUE_DEPTH.set(self._pending)
+        self._available.release()
+        return True
+
+    def _next_job(self) -> Tuple[Job, float]:
+        """Take the oldest job from the channel whose turn it is"""
+        channel = self._rotation.popleft()
+        channel_queue = self._queues[channel]
+        job = channel_queue.popleft()
+        if channel_queue:
+            self._rotation.append(channel)  # Back of the line
+        else:
+            del self._queues[channel]
+        self._pending -= 1
+        DISPATCH_QUEUE_DEPTH.set(self._pending)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            await self._available.acquire()
+            job, queued_at = self._next_job()
+            STAGE_LATENCY.labels("queue_wait").observe(
+                time.perf_counter() - queued_at
+            )
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Dispatched job failed: %s", e)
@@ -0,0 +1,157 @@
+"""
+On-disk documentation cache for GitTalker
+SQLite with one row per file (path, blob sha, url, content, fetched_at) so a
+refresh only rewrites the files that changed, readers stream rows instead of
+parsing one large JSON document, and a crash mid-write rolls back cleanly
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    source TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha TEXT,
+    url TEXT NOT NULL,
+    repo TEXT,
+    content TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (source, path)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS etags (
+    source TEXT PRIMARY KEY,
+    etag TEXT NOT NULL
+);
+"""
+
+
+class DocsStore:
+    """Per-file documentation rows for every source, in one SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._created = False
+
+    def _open(self) -> sqlite3.Connection:
+        # A connection per operation keeps the store usable from any thread
+        if not self._created:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._created:
+            # WAL: readers never block the writer and a torn write is
+            # discarded on the next open
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._created = True
+        # Still crash-safe under WAL; only skips an fsync per commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = self._open()
+        try:
+            with conn:  # Commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def synced_at(self, source: str) -> Optional[float]:
+        """When a source last finished a full refresh"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT synced_at FROM sources WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, source: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sources (source, synced_at) "
+                "VALUES (?, ?)",
+                (source, time.time())
+            )
+
+    def etag(self, source: str) -> Optional[str]:
+        """ETag of the repository tree the stored files were synced from"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag FROM etags WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_etag(self, source: str, etag: Optional[str]) -> None:
+        with self._connect() as conn:
+            if etag:
+                conn.execute(
+                    "INSERT OR REPLACE INTO etags (source, etag) "
+                    "VALUES (?, ?)",
+                    (source, etag)
+                )
+            else:
+                conn.execute(
+                    "DELETE FROM etags WHERE source = ?", (source,)
+                )
+
+    def shas(self, source: str) -> Dict[str, Optional[str]]:
+        """path -> blob sha of every stored file of a source"""
+        with self._connect() as conn:
+            return dict(conn.execute(
+                "SELECT path, sha FROM docs WHERE source = ?", (source,)
+            ))
+
+    def upsert(
+        self,
+        source: str,
+        doc: Dict[str, str],
+        sha: Optional[str] = None
+    ) -> None:
+        """Insert or replace one file, atomically"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO docs "
+                "(source, path, sha, url, repo, content, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (source, doc["path"], sha, doc["url"], doc.get("repo"),
+                 doc["content"], time.time())
+            )
+
+    def delete(self, source: str, paths) -> int:
+        """Drop files that are gone from the repository"""
+        with self._connect() as conn:
+            cursor = conn.executemany(
+                "DELETE FROM docs WHERE source = ? AND path = ?",
+                [(source, path) for path in paths]
+            )
+            return cursor.rowcount
+
+    def count(self, source: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM docs WHERE source = ?", (source,)
+            ).fetchone()[0]
+
+    def iter_docs(self, source: str) -> Iterator[Dict[str, str]]:
+        """Stream a source's files without loading them all at once"""
+        conn = self._open()
+        try:
+            rows = conn.execute(
+                "SELECT path, url, repo, content, fetched_at FROM docs "
+                "WHERE source = ? ORDER BY path",
+                (source,)
+            )
+            for path, url, repo, content, fetched_at in rows:
+                yield {
+                    "path": path, "url": url, "repo": repo,
+                    "content": content, "fetched_at": fetched_at
+                }
+        finally:
+            conn.close()
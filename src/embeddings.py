@@ -0,0 +1,434 @@
+"""
+Embedding backends for GitTalker
+SentenceTransformer (PyTorch fp32) or the same model exported to ONNX
+Runtime, optionally int8 dynamic-quantised, or a shared embedding server,
+behind one encode() interface
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from .config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL_DIR,
+    EMBEDDING_QUANTIZE,
+    EMBEDDING_REMOTE_BATCH_SIZE,
+    EMBEDDING_REMOTE_FALLBACK,
+    EMBEDDING_REMOTE_MAX_CONNECTIONS,
+    EMBEDDING_REMOTE_MODEL,
+    EMBEDDING_REMOTE_PROVIDER,
+    EMBEDDING_REMOTE_RETRY_AFTER,
+    EMBEDDING_REMOTE_TIMEOUT,
+    LLM_CONFIGS
+)
+from .metrics import EMBEDDING_REMOTE_FAILURES
+
+logger = logging.getLogger(__name__)
+
+
+class SentenceTransformerBackend:
+    """Reference fp32 model running on PyTorch"""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    @property
+    def dimensions(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        embeddings = self.model.encode(
+            list(texts), batch_size=batch_size, show_progress_bar=False
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class OnnxEmbeddingBackend:
+    """Mean-pooled transformer encoder on ONNX Runtime"""
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        model_dir: str = "models",
+        quantize: bool = False,
+        threads: int = 0
+    ):
+        try:
+            import onnxruntime
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_BACKEND=onnx requires the 'onnxruntime' and "
+                "'transformers' packages"
+            ) from e
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.path = Path(model_dir) / model_name.replace("/", "__")
+        model_file = self.path / (
+            "model.int8.onnx" if quantize else "model.onnx"
+        )
+        if not model_file.exists():
+            export_onnx_model(model_name, self.path, quantize=quantize)
+
+        with open(self.path / "embedding_config.json", encoding="utf-8") as f:
+            config = json.load(f)
+        self.max_seq_length = config["max_seq_length"]
+        self._dimensions = config["dimensions"]
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.path))
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            str(model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    @property
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        output = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        # Batch similar lengths together so padding stays small
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(order), batch_size):
+            positions = order[start:start + batch_size]
+            output[positions] = self._encode_batch(
+                [texts[i] for i in positions]
+            )
+        return output
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        inputs = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np"
+        )
+        feed = {
+            name: value.astype(np.int64)
+            for name, value in inputs.items() if name in self._input_names
+        }
+        hidden = self.session.run(None, feed)[0]
+
+        # Same pooling as all-MiniLM-L6-v2: masked mean, then L2 normalise
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(
+            mask.sum(axis=1), 1e-9, None
+        )
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+
+class HashingEmbeddingBackend:
+    """Deterministic bag-of-words hashing embedder for offline benchmarks
+
+    No model download and stable across runs and machines; retrieval quality
+    is keyword-level, so use it to measure the pipeline, not the model.
+    """
+
+    name = "hashing"
+    _TOKEN = re.compile(r"[a-z0-9_]+")
+
+    def __init__(self, model_name: str = "hashing", dimensions: int = 384):
+        self.model_name = model_name
+        self._dimensions = dimensions
+
+    @property
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        output = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in self._TOKEN.findall(text.lower()):
+                digest = zlib.crc32(token.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                output[row, digest % self.dimensions] += sign
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return output / np.clip(norms, 1e-12, None)
+
+
+class RemoteEmbeddingBackend:
+    """Embeddings from an OpenAI-compatible or Ollama embedding endpoint
+
+    Serving replicas then need no model in memory. Texts are sent in
+    batches, several at once over a pooled connection; if the server
+    fails, the local model (which must be the one the server runs)
+    answers until the server is retried.
+    """
+
+    name = "remote"
+
+    def __init__(
+        self,
+        model_name: str,
+        provider: str = "openai",
+        remote_model: Optional[str] = None,
+        batch_size: int = 64,
+        max_connections: int = 8,
+        timeout: float = 30.0,
+        fallback: bool = True,
+        retry_after: float = 30.0
+    ):
+        if provider not in ("openai", "vllm", "ollama"):
+            raise ValueError(
+                f"No embedding endpoint for provider: {provider}"
+            )
+        config = LLM_CONFIGS[provider]
+        self.provider = provider
+        self.local_model_name = model_name
+        self.model_name = remote_model or model_name
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        self.fallback = fallback
+        self.retry_after = retry_after
+        base_url = config["base_url"].rstrip("/")
+        if provider == "ollama":
+            self.url = f"{base_url}/api/embed"
+        elif provider == "vllm":
+            self.url = f"{base_url}/v1/embeddings"
+        else:
+            self.url = f"{base_url}/embeddings"  # base_url ends in /v1
+        headers = {}
+        if config.get("api_key"):
+            headers["Authorization"] = f"Bearer {config['api_key']}"
+        # httpx.Client is thread-safe; executor threads share its pool
+        self.client = httpx.Client(
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        self._dimensions: Optional[int] = None
+        self._local = None
+        self._local_lock = threading.Lock()
+        self._down_until = 0.0
+
+    @property
+    def dimensions(self) -> int:
+        if self._dimensions is None:
+            self._dimensions = int(self.encode(["dimensions"]).shape[1])
+        return self._dimensions
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        # batch_size tunes local models; requests use self.batch_size
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self._dimensions or 0), dtype=np.float32)
+        if time.monotonic() >= self._down_until or not self.fallback:
+            try:
+                return self._encode_remote(texts)
+            except (httpx.HTTPError, KeyError, ValueError) as e:
+                EMBEDDING_REMOTE_FAILURES.labels(self.provider).inc()
+                if not self.fallback:
+                    raise
+                logger.warning(
+                    "Embedding server %s failed, using the local model "
+                    "for %.0fs: %s", self.url, self.retry_after, e
+                )
+                self._down_until = time.monotonic() + self.retry_after
+        return self._local_model().encode(texts, batch_size=batch_size)
+
+    def _encode_remote(self, texts: List[str]) -> np.ndarray:
+        batches = [
+            texts[start:start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        if len(batches) == 1:
+            vectors = [self._request(batches[0])]
+        else:
+            workers = min(self.max_connections, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                vectors = list(pool.map(self._request, batches))
+        output = np.asarray(np.vstack(vectors), dtype=np.float32)
+        self._dimensions = output.shape[1]
+        return output
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        response = self.client.post(
+            self.url, json={"model": self.model_name, "input": texts}
+        )
+        response.raise_for_status()
+        result = response.json()
+        if self.provider == "ollama":
+            vectors = result["embeddings"]
+        else:
+            # OpenAI-compatible servers may return items out of order
+            data = sorted(result["data"], key=lambda item: item["index"])
+            vectors = [item["embedding"] for item in data]
+        if len(vectors) != len(texts):
+            raise ValueError(
+                f"Asked for {len(texts)} embeddings, got {len(vectors)}"
+            )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _local_model(self):
+        # Loaded on first failure only, so healthy replicas stay small
+        with self._local_lock:
+            if self._local is None:
+                logger.info(
+                    "Loading local embedding model %s", self.local_model_name
+                )
+                self._local = SentenceTransformerBackend(
+                    self.local_model_name
+                )
+            return self._local
+
+
+def export_onnx_model(
+    model_name: str, path: Path, quantize: bool = False
+) -> None:
+    """Export a SentenceTransformer's encoder to ONNX (one-off, needs torch)"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    path.mkdir(parents=True, exist_ok=True)
+    model_file = path / "model.onnx"
+    if not model_file.exists():
+        logger.info("Exporting %s to ONNX under %s", model_name, path)
+        st_model = SentenceTransformer(model_name, device="cpu")
+        encoder = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+
+        class _LastHiddenState(torch.nn.Module):
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, input_ids, attention_mask, token_type_ids):
+                return self.model(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    token_type_ids=token_type_ids
+                )[0]
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        names = ["input_ids", "attention_mask", "token_type_ids"]
+        axes = {name: {0: "batch", 1: "sequence"} for name in names}
+        axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        with torch.no_grad():
+            torch.onnx.export(
+                _LastHiddenState(encoder),
+                tuple(sample[name] for name in names),
+                str(model_file),
+                input_names=names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=axes,
+                opset_version=14
+            )
+
+        tokenizer.save_pretrained(str(path))
+        with open(path / "embedding_config.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "model_name": model_name,
+                "max_seq_length": st_model.max_seq_length,
+                "dimensions": st_model.get_sentence_embedding_dimension()
+            }, f, indent=2)
+
+    if quantize and not (path / "model.int8.onnx").exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logger.info("Quantising %s to int8", model_file)
+        quantize_dynamic(
+            str(model_file),
+            str(path / "model.int8.onnx"),
+            weight_type=QuantType.QInt8
+        )
+
+
+def create_embedding_backend(
+    model_name: str,
+    backend: Optional[str] = None,
+    quantize: Optional[bool] = None,
+    threads: int = 0
+):
+    """Build the embedding backend selected by config (or the arguments)"""
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "onnx":
+        return OnnxEmbeddingBackend(
+            model_name,
+            model_dir=EMBEDDING_MODEL_DIR,
+            quantize=EMBEDDING_QUANTIZE if quantize is None else quantize,
+            threads=threads
+        )
+    if backend == "hashing":
+        return HashingEmbeddingBackend(model_name)
+    if backend == "remote":
+        return RemoteEmbeddingBackend(
+            model_name,
+            provider=EMBEDDING_REMOTE_PROVIDER,
+            remote_model=EMBEDDING_REMOTE_MODEL,
+            batch_size=EMBEDDING_REMOTE_BATCH_SIZE,
+            max_connections=EMBEDDING_REMOTE_MAX_CONNECTIONS,
+            timeout=EMBEDDING_REMOTE_TIMEOUT,
+            fallback=EMBEDDING_REMOTE_FALLBACK,
+            retry_after=EMBEDDING_REMOTE_RETRY_AFTER
+        )
+    if backend != "sentence-transformers":
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    return SentenceTransformerBackend(model_name)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+def _top_k(embeddings: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = _normalize(queries) @ _normalize(embeddings).T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def compare_backends(
+    reference,
+    candidate,
+    chunks: Sequence[str],
+    queries: Sequence[str],
+    k: int = 3
+) -> Dict[str, float]:
+    """Recall@k of a candidate backend's search against the reference's
+
+    Both sides index and query with their own embeddings; recall is the
+    share of the reference top-k chunks the candidate also retrieves.
+    """
+    stats: Dict[str, float] = {"chunks": len(chunks), "queries": len(queries)}
+    top = {}
+    for label, backend in (("reference", reference), ("candidate", candidate)):
+        embeddings = backend.encode(chunks)
+        backend.encode(queries[:1])  # Warm up before timing queries
+        start = time.perf_counter()
+        query_embeddings = np.vstack([backend.encode([q]) for q in queries])
+        stats[f"{label}_query_ms"] = (
+            (time.perf_counter() - start) * 1000 / max(1, len(queries))
+        )
+        top[label] = _top_k(embeddings, query_embeddings, k)
+
+    overlaps = [
+        len(set(ref) & set(cand)) / len(ref)
+        for ref, cand in zip(top["reference"], top["candidate"])
+    ]
+    stats[f"recall_at_{k}"] = float(np.mean(overlaps)) if overlaps else 0.0
+    return stats
@@ -0,0 +1,203 @@
+"""
+Precomputed answers for GitTalker's most frequent questions
+Curated questions (FAQ_FILE) and the ones users ask most are answered ahead
+of time by a background job into a small embedding index. A new question
+close enough to one of them is answered from the index, skipping retrieval
+and the LLM.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .dedupe import normalize_query
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# (question, channel) -> answer, or None when no confident answer exists
+Answerer = Callable[[str, Optional[str]], Awaitable[Optional[str]]]
+
+# Scope of curated entries: they are served in every channel
+CURATED_SCOPE = "*"
+
+
+class FaqEntry:
+    """One precomputed question and answer"""
+
+    def __init__(
+        self,
+        question: str,
+        answer: str,
+        scope: str = "",
+        curated: bool = False
+    ):
+        self.question = question
+        self.answer = answer
+        # Shards the answer was drawn from ("" routed, CURATED_SCOPE any)
+        self.scope = scope
+        self.curated = curated
+        self.created_at = time.time()
+
+
+class FaqIndex:
+    """Question-similarity index over precomputed answers, per shard scope"""
+
+    def __init__(
+        self,
+        embedder,
+        min_similarity: float = 0.92,
+        max_entries: int = 200,
+        min_asks: int = 3
+    ):
+        self.embedder = embedder
+        self.min_similarity = min_similarity
+        self.max_entries = max_entries
+        self.min_asks = min_asks
+        self.docs_version: Optional[int] = None
+        # (scope, normalized question) -> count, latest wording and channel
+        self._asks: Counter = Counter()
+        self._asked: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        self._curated: List[Dict[str, str]] = []
+        self._unanswerable: Set[Tuple[str, str]] = set()
+        # scope -> (unit question embeddings, entries); swapped whole
+        self._index: Dict[str, Tuple[np.ndarray, List[FaqEntry]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(entries) for _, entries in self._index.values())
+
+    def load_curated(self, path: str) -> None:
+        """Read [{"question": ..., "answer": optional}] from a JSON file"""
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        self._curated = [
+            entry for entry in entries if entry.get("question")
+        ]
+        logger.info("Loaded %d curated FAQ questions", len(self._curated))
+
+    def record(
+        self, question: str, scope: str = "", channel: Optional[str] = None
+    ) -> None:
+        """Count one asked question towards the frequent set"""
+        key = (scope, normalize_query(question))
+        self._asks[key] += 1
+        self._asked[key] = (question, channel)
+        # Forget the long tail so the counter stays bounded
+        if len(self._asks) > self.max_entries * 50:
+            keep = dict(self._asks.most_common(self.max_entries * 10))
+            self._asks = Counter(keep)
+            self._asked = {key: self._asked[key] for key in keep}
+
+    def candidates(self) -> List[Tuple[str, str, Optional[str], str]]:
+        """(scope, question, channel, curated answer) to precompute"""
+        candidates = [
+            (CURATED_SCOPE, entry["question"], None, entry.get("answer", ""))
+            for entry in self._curated
+        ]
+        # Curated questions are served in every scope already
+        curated = {
+            normalize_query(question) for _, question, _, _ in candidates
+        }
+        for key, count in self._asks.most_common():
+            if len(candidates) >= self.max_entries or count < self.min_asks:
+                break
+            if key[1] in curated:
+                continue
+            question, channel = self._asked[key]
+            candidates.append((key[0], question, channel, ""))
+        return candidates[:self.max_entries]
+
+    def match(
+        self, query_embedding: np.ndarray, scope: str = ""
+    ) -> Optional[FaqEntry]:
+        """The stored answer for a near-identical question, if any
+
+        Looks at the scope's own entries and the curated ones.
+        """
+        indexes = [
+            self._index[key] for key in {scope, CURATED_SCOPE}
+            if key in self._index
+        ]
+        if not indexes:
+            record_cache("faq", hit=False)
+            return None
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        best_entry, best_similarity = None, -np.inf
+        for embeddings, entries in indexes:
+            similarities = embeddings @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] > best_similarity:
+                best_entry = entries[best]
+                best_similarity = similarities[best]
+        hit = best_similarity >= self.min_similarity
+        record_cache("faq", hit=hit)
+        return best_entry if hit else None
+
+    async def refresh(self, answer: Answerer, docs_version: int) -> int:
+        """Answer new candidates, or all of them once the docs changed
+
+        Returns the number of new answers added.
+        """
+        if docs_version != self.docs_version:
+            # Answers drawn from the old docs stop being served right away
+            previous: Dict[Tuple[str, str], FaqEntry] = {}
+            self._index = {}
+            self._unanswerable = set()
+        else:
+            previous = {
+                (entry.scope, normalize_query(entry.question)): entry
+                for _, entries in self._index.values() for entry in entries
+            }
+
+        entries = []
+        generated = 0
+        for scope, question, channel, curated_answer in self.candidates():
+            key = (scope, normalize_query(question))
+            if curated_answer:
+                entries.append(
+                    FaqEntry(question, curated_answer, scope, curated=True)
+                )
+                continue
+            if key in previous:
+                entries.append(previous[key])
+                continue
+            if key in self._unanswerable:
+                continue
+            text = await answer(question, channel)
+            if text is None:
+                self._unanswerable.add(key)
+                continue
+            entries.append(FaqEntry(question, text, scope))
+            generated += 1
+
+        # Embedding the questions may be a call to an embedding server
+        loop = asyncio.get_running_loop()
+        self._index = await loop.run_in_executor(None, self._build, entries)
+        self.docs_version = docs_version
+        return generated
+
+    def _build(
+        self, entries: List[FaqEntry]
+    ) -> Dict[str, Tuple[np.ndarray, List[FaqEntry]]]:
+        if not entries:
+            return {}
+        embeddings = np.asarray(
+            self.embedder.encode([entry.question for entry in entries]),
+            dtype=np.float32
+        )
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        by_scope: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            by_scope.setdefault(entry.scope, []).append(i)
+        return {
+            scope: (embeddings[rows], [entries[i] for i in rows])
+            for scope, rows in by_scope.items()
+        }
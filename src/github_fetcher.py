@@ -1,68 +1,78 @@
 import httpx
-import os
-import json
+import logging
 import time
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 from pathlib import Path
-from .config import GITHUB_TOKEN, GITHUB_REPO, GITHUB_DOCS_PATH
+from .config import (
+    GITHUB_API_URL,
+    GITHUB_TOKEN
+)
+from .docs_store import DocsStore
+from .metrics import STAGE_LATENCY, record_cache
+from .sources import DocSource, load_sources
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOCS_STORE = "docs/.docs_cache.sqlite3"
 
 
 class GitHubDocsFetcher:
-    def __init__(self, cache_ttl: int = 3600):  # 1 hour cache
+    def __init__(
+        self,
+        source: Optional[DocSource] = None,
+        cache_ttl: int = 3600,  # 1 hour cache
+        store: Optional[DocsStore] = None
+    ):
+        self.source = source or load_sources()[0]
         self.token = GITHUB_TOKEN
-        self.repo = GITHUB_REPO
-        self.docs_path = GITHUB_DOCS_PATH
-        self.base_url = "https://api.github.com"
+        self.repo = self.source.repo
+        self.ref = self.source.ref
+        self.base_url = GITHUB_API_URL.rstrip("/")
         self.cache_ttl = cache_ttl
-        self.cache_file = Path("docs/.docs_cache.json")
-        self._ensure_cache_dir()
-        
-    def _ensure_cache_dir(self):
-        """Ensure cache directory exists."""
-        self.cache_file.parent.mkdir(exist_ok=True)
+        self.store = store or DocsStore(DEFAULT_DOCS_STORE)
         
     def _is_cache_valid(self) -> bool:
-        """Check if cache is still valid."""
-        if not self.cache_file.exists():
-            return False
-            
-        cache_age = time.time() - self.cache_file.stat().st_mtime
-        return cache_age < self.cache_ttl
+        """Check if the source was refreshed within the cache TTL."""
+        synced_at = self.store.synced_at(self.source.name)
+        return (
+            synced_at is not None
+            and time.time() - synced_at < self.cache_ttl
+        )
         
-    def _load_cache(self) -> List[Dict[str, str]]:
-        """Load docs from cache."""
-        try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
-            
-    def _save_cache(self, docs: List[Dict[str, str]]) -> None:
-        """Save docs to cache."""
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(docs, f, ensure_ascii=False, indent=2)
-        except IOError:
-            pass  # Continue without caching if file operations fail
-        
-    async def fetch_docs(self) -> List[Dict[str, str]]:
-        """Fetch all documentation files from the GitHub repository."""
-        # Check cache first
+    async def sync(self) -> Dict[str, int]:
+        """Bring the cached files up to date, fetching only changed ones."""
         if self._is_cache_valid():
-            cached_docs = self._load_cache()
-            if cached_docs:
-                return cached_docs
-                
-        # Fetch fresh data
-        docs = await self._fetch_docs_from_github()
+            record_cache("docs", hit=True)
+            return {"fetched": 0, "removed": 0, "unchanged": 0}
+        record_cache("docs", hit=False)
         
-        # Cache the results
-        self._save_cache(docs)
+        with STAGE_LATENCY.labels("fetch_docs").time():
+            try:
+                stats = await self._sync_from_github()
+            except httpx.HTTPError as e:
+                # A stale copy beats no answers while GitHub is unreachable
+                if not self.store.count(self.source.name):
+                    raise
+                logger.warning(
+                    "Refreshing %s failed, serving cached docs: %s",
+                    self.source.name, e
+                )
+                return {"fetched": 0, "removed": 0, "unchanged": 0}
         
-        return docs
+        self.store.mark_synced(self.source.name)
+        return stats
         
-    async def _fetch_docs_from_github(self) -> List[Dict[str, str]]:
-        """Fetch docs from GitHub API."""
+    def iter_docs(self) -> Iterator[Dict[str, str]]:
+        """Stream the cached files of this source into the chunker."""
+        return self.store.iter_docs(self.source.name)
+        
+    async def fetch_docs(self) -> List[Dict[str, str]]:
+        """Fetch all documentation files from the GitHub repository."""
+        await self.sync()
+        return list(self.iter_docs())
+        
+    async def _sync_from_github(self) -> Dict[str, int]:
+        """Fetch new and changed files by blob sha; drop deleted ones."""
         if not self.token or not self.repo:
             raise ValueError("GitHub token and repo must be configured")
             
@@ -71,37 +81,53 @@ class GitHubDocsFetcher:
             "Accept": "application/vnd.github.v3+json"
         }
         
-        docs = []
+        stored = self.store.shas(self.source.name)
+        stats = {"fetched": 0, "removed": 0, "unchanged": 0}
         timeout = httpx.Timeout(30.0)  # 30 second timeout
         
+        # Revalidate the tree: a 304 means no file changed, and GitHub
+        # doesn't count it against the rate limit
+        etag = self.store.etag(self.source.name) if stored else None
+        tree_headers = {**headers, "If-None-Match": etag} if etag else headers
+        failed = 0
+        
         async with httpx.AsyncClient(timeout=timeout) as client:
             # Get repository tree
-            tree_url = f"{self.base_url}/repos/{self.repo}/git/trees/main"
+            tree_url = (
+                f"{self.base_url}/repos/{self.repo}/git/trees/{self.ref}"
+            )
             response = await client.get(
                 f"{tree_url}?recursive=1",
-                headers=headers
+                headers=tree_headers
             )
+            if response.status_code == 304:
+                stats["unchanged"] = len(stored)
+                return stats
             response.raise_for_status()
             
             tree = response.json()
             
-            # Find documentation files - restrict to gittalker/ directory only
+            # Find documentation files under the source's path prefixes
             allowed_extensions = (
                 ".md", ".txt", ".rst", ".py", ".json", ".yaml", ".yml"
             )
             doc_files = [
                 item for item in tree["tree"]
-                if item["path"].startswith("gittalker/")
+                if self.source.matches(item["path"])
                 and item["type"] == "blob"
                 and item["path"].endswith(allowed_extensions)
             ]
             
-            # Fetch content for each file
+            # Fetch content only for files whose blob changed
             for file_info in doc_files:
+                sha = file_info.get("sha")
+                if sha and stored.get(file_info["path"]) == sha:
+                    stats["unchanged"] += 1
+                    continue
                 try:
                     content_url = (
                         f"{self.base_url}/repos/{self.repo}/contents/"
-                        f"{file_info['path']}"
+                        f"{file_info['path']}?ref={self.ref}"
                     )
                     content_response = await client.get(
                         content_url,
@@ -117,17 +143,34 @@ class GitHubDocsFetcher:
                         file_data["content"]
                     ).decode("utf-8")
                     
-                    docs.append({
+                    # Each file commits on its own, so an interrupted
+                    # refresh resumes where it stopped
+                    self.store.upsert(self.source.name, {
                         "path": file_info["path"],
                         "content": content,
-                        "url": file_data["html_url"]
-                    })
+                        "url": file_data["html_url"],
+                        "repo": self.repo
+                    }, sha=sha)
+                    stats["fetched"] += 1
                     
                 except (httpx.HTTPError, KeyError, ValueError) as e:
-                    print(f"Error fetching {file_info['path']}: {e}")
+                    logger.warning(
+                        "Error fetching %s: %s", file_info["path"], e
+                    )
+                    failed += 1
                     continue
         
-        return docs
+        current = {item["path"] for item in doc_files}
+        removed = [path for path in stored if path not in current]
+        if removed:
+            stats["removed"] = self.store.delete(self.source.name, removed)
+        # Only a complete sync may be revalidated next time; after a failed
+        # file the tree must be walked again
+        self.store.set_etag(
+            self.source.name,
+            None if failed else response.headers.get("ETag")
+        )
+        return stats
     
     def save_docs_locally(self, docs: List[Dict[str, str]]) -> None:
         """Save documentation files locally for caching."""
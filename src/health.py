@@ -0,0 +1,86 @@
+"""
+Service health tracking for GitTalker
+Separates liveness (the process is up) from readiness (able to answer)
+"""
+
+import time
+from typing import Dict, Any, Optional
+
+
+class ReadinessState:
+    """Tracks startup progress so probes reflect what the bot can do"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.docs_fetched = False
+        self.docs_count = 0
+        self.index_built = False
+        self.chunk_count = 0
+        self.model_warmed = False
+        self.warmup_seconds: Optional[float] = None
+        self.llm_provider: Optional[str] = None
+        self.llm_reachable = False
+        self.llm_checked_at: Optional[float] = None
+        self.slack_connected = False
+        self.initialization_failed = False
+        self.error: Optional[str] = None
+
+    def mark_docs_fetched(self, count: int) -> None:
+        """Record that documentation was fetched"""
+        self.docs_fetched = True
+        self.docs_count = count
+
+    def mark_index_built(self, chunk_count: int) -> None:
+        """Record that the search index is built"""
+        self.index_built = True
+        self.chunk_count = chunk_count
+
+    def mark_model_warmed(self, seconds: float) -> None:
+        """Record that the embedding model has been warmed up"""
+        self.model_warmed = True
+        self.warmup_seconds = seconds
+
+    def mark_llm_checked(self, provider: str, reachable: bool) -> None:
+        """Record the latest LLM provider reachability check"""
+        self.llm_provider = provider
+        self.llm_reachable = reachable
+        self.llm_checked_at = time.time()
+
+    def mark_failed(self, error: str) -> None:
+        """Record a fatal initialization error"""
+        self.initialization_failed = True
+        self.error = error
+
+    @property
+    def is_alive(self) -> bool:
+        """Process is healthy unless initialization failed outright"""
+        return not self.initialization_failed
+
+    @property
+    def is_ready(self) -> bool:
+        """Ready only once every serving dependency is in place"""
+        return all(self.checks().values())
+
+    def checks(self) -> Dict[str, bool]:
+        """Individual readiness checks"""
+        return {
+            "docs_fetched": self.docs_fetched,
+            "index_built": self.index_built and self.chunk_count > 0,
+            "model_warmed": self.model_warmed,
+            "llm_reachable": self.llm_reachable,
+            "slack_connected": self.slack_connected
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full state for the readiness endpoint"""
+        return {
+            "ready": self.is_ready,
+            "checks": self.checks(),
+            "docs_count": self.docs_count,
+            "chunk_count": self.chunk_count,
+            "warmup_seconds": self.warmup_seconds,
+            "llm_provider": self.llm_provider,
+            "llm_checked_at": self.llm_checked_at,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "error": self.error
+        }
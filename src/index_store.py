@@ -0,0 +1,185 @@
+"""
+Shared on-disk index artifacts for GitTalker
+One indexer publishes immutable, versioned generations (embeddings, chunk
+text and metadata); serving replicas memory-map the current generation
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from collections import abc
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+TEXT_FILE = "chunks.bin"
+OFFSETS_FILE = "chunk_offsets.npy"
+METADATA_FILE = "metadata.json"
+
+
+class MappedChunks(abc.Sequence):
+    """Chunk text stored as one UTF-8 blob plus offsets, decoded lazily"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._blob.nbytes)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class IndexStore:
+    """Versioned index generations under a shared directory"""
+
+    def __init__(self, root: str, keep_generations: int = 3):
+        if keep_generations < 1:
+            # The current generation is always kept
+            raise ValueError("keep_generations must be at least 1")
+        self.root = Path(root)
+        self.keep_generations = keep_generations
+
+    def publish(
+        self,
+        chunks: Sequence[str],
+        metadata: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+        manifest: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Write a new generation and atomically make it current"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Zero-padded nanoseconds keep generation names sortable by age
+        generation = f"gen-{time.time_ns():020d}-{uuid.uuid4().hex[:6]}"
+        staging = self.root / f".staging-{generation}"
+        staging.mkdir()
+
+        try:
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            np.save(staging / EMBEDDINGS_FILE, embeddings)
+
+            encoded = [chunk.encode("utf-8") for chunk in chunks]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(chunk) for chunk in encoded])
+            with open(staging / TEXT_FILE, "wb") as f:
+                for chunk in encoded:
+                    f.write(chunk)
+            np.save(staging / OFFSETS_FILE, offsets)
+
+            with open(staging / METADATA_FILE, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False)
+
+            dimensions = embeddings.shape[1] if embeddings.ndim == 2 else 0
+            full_manifest = {
+                **(manifest or {}),
+                "generation": generation,
+                "created_at": time.time(),
+                "chunk_count": len(encoded),
+                "dimensions": int(dimensions),
+                "embedding_bytes": int(embeddings.nbytes),
+                "text_bytes": int(offsets[-1])
+            }
+            with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(full_manifest, f, indent=2)
+
+            # Generation dirs are immutable once renamed into place
+            os.replace(staging, self.root / generation)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._write_current(generation)
+        self.prune()
+        return generation
+
+    def _write_current(self, generation: str) -> None:
+        """Swap the CURRENT pointer so readers never see a partial write"""
+        pointer = self.root / f".{CURRENT_FILE}.{uuid.uuid4().hex[:8]}"
+        with open(pointer, "w", encoding="utf-8") as f:
+            f.write(generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer, self.root / CURRENT_FILE)
+
+    def current_generation(self) -> Optional[str]:
+        """Name of the generation replicas should serve, if any"""
+        try:
+            generation = (self.root / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            return None
+        return generation or None
+
+    def generations(self) -> List[str]:
+        """Published generations, oldest first"""
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name for path in self.root.iterdir()
+            if path.is_dir() and path.name.startswith("gen-")
+        )
+
+    def read_manifest(self, generation: Optional[str] = None) -> Dict:
+        """Manifest of a generation (the current one by default)"""
+        generation = generation or self.current_generation()
+        if generation is None:
+            raise FileNotFoundError(f"No index published under {self.root}")
+        manifest_path = self.root / generation / MANIFEST_FILE
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, generation: Optional[str] = None) -> Dict[str, Any]:
+        """Memory-map a generation's embeddings and chunk text"""
+        generation = generation or self.current_generation()
+        if generation is None:
+            raise FileNotFoundError(f"No index published under {self.root}")
+        path = self.root / generation
+
+        with open(path / METADATA_FILE, encoding="utf-8") as f:
+            metadata = json.load(f)
+        chunks = MappedChunks(
+            _map_bytes(path / TEXT_FILE), np.load(path / OFFSETS_FILE)
+        )
+        return {
+            "generation": generation,
+            "manifest": self.read_manifest(generation),
+            "chunks": chunks,
+            "metadata": metadata,
+            "embeddings": np.load(path / EMBEDDINGS_FILE, mmap_mode="r")
+        }
+
+    def prune(self) -> None:
+        """Delete all but the newest generations (never the current one)"""
+        current = self.current_generation()
+        stale = self.generations()[:-self.keep_generations]
+        for generation in stale:
+            if generation != current:
+                shutil.rmtree(self.root / generation, ignore_errors=True)
+
+
+def _map_bytes(path: Path) -> np.ndarray:
+    """Memory-map a file as bytes (mmap can't map an empty file)"""
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
@@ -0,0 +1,371 @@
+"""
+Offline indexer for GitTalker
+Builds the shared index artifact outside the bot, e.g. in CI or cron:
+
+    python -m src.indexer build [--source NAME] [--workers N]
+    python -m src.indexer stats
+    python -m src.indexer query "how do I deploy?" [--channel C0123ABCD]
+        [--path docs/deploy/] [--ext .md] [--repo org/api] [--since-days 30]
+    python -m src.indexer tune-batch [--sizes 8,16,32,64,128]
+    python -m src.indexer compare-backends [--candidate onnx] [--quantize]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .config import (
+    EMBED_BATCH_SIZE,
+    EMBED_WORKERS,
+    INDEX_DIR,
+    INDEX_KEEP_GENERATIONS
+)
+from .index_store import IndexStore
+from .search_filter import SearchFilter
+from .sources import (
+    DocSource,
+    channel_filters,
+    channel_shards,
+    load_sources
+)
+
+DEFAULT_FIXTURE = Path("benchmarks/fixtures/docs_corpus.json")
+
+
+def _directory_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _print_report(report: Dict[str, Any], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+    for key, value in report.items():
+        if isinstance(value, float):
+            value = f"{value:.3f}"
+        print(f"{key:>22}: {value}")
+
+
+def _print_reports(reports: List[Dict[str, Any]], as_json: bool) -> None:
+    """One report per shard"""
+    if as_json:
+        print(json.dumps({"shards": reports}, indent=2))
+        return
+    for i, report in enumerate(reports):
+        if i:
+            print()
+        _print_report(report, as_json=False)
+
+
+def _shard_store(
+    index_dir: str, source: DocSource, keep: int = INDEX_KEEP_GENERATIONS
+) -> IndexStore:
+    """Each source's generations live in their own subdirectory"""
+    return IndexStore(
+        str(Path(index_dir) / source.name), keep_generations=keep
+    )
+
+
+def _selected_sources(names: List[str]) -> List[DocSource]:
+    sources = load_sources()
+    if not names:
+        return sources
+    known = {source.name: source for source in sources}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise SystemExit(
+            f"Unknown source {', '.join(unknown)} "
+            f"(configured: {', '.join(known)})"
+        )
+    return [known[name] for name in names]
+
+
+def build(args: argparse.Namespace) -> int:
+    """Fetch docs, embed them and publish a new generation per source"""
+    reports = [
+        _build_shard(source, args)
+        for source in _selected_sources(args.source)
+    ]
+    _print_reports(reports, args.json)
+    return 0
+
+
+def _build_shard(source: DocSource, args: argparse.Namespace) -> Dict:
+    from .github_fetcher import GitHubDocsFetcher
+    from .rag_engine import SimpleRAG
+
+    store = _shard_store(args.index_dir, source, keep=args.keep)
+    fetcher = GitHubDocsFetcher(source)
+    rag = SimpleRAG(max_chunks=args.max_chunks)
+
+    start = time.perf_counter()
+    changes = asyncio.run(fetcher.sync())
+    fetch_seconds = time.perf_counter() - start
+
+    stats = rag.index_documents(
+        fetcher.iter_docs(), workers=args.workers, batch_size=args.batch_size
+    )
+
+    start = time.perf_counter()
+    generation = rag.save_index(store)
+    publish_seconds = time.perf_counter() - start
+
+    artifact_bytes = _directory_bytes(store.root / generation)
+    embed_seconds = stats["embed_seconds"]
+    return {
+        "source": source.name,
+        "generation": generation,
+        "documents": stats["documents"],
+        "files_fetched": changes["fetched"],
+        "files_removed": changes["removed"],
+        "chunks": stats["chunks"],
+        "workers": args.workers,
+        "batch_size": args.batch_size,
+        "fetch_seconds": fetch_seconds,
+        "chunk_seconds": stats["chunk_seconds"],
+        "embed_seconds": embed_seconds,
+        "publish_seconds": publish_seconds,
+        "chunks_per_second": (
+            stats["chunks"] / embed_seconds if embed_seconds else 0.0
+        ),
+        "artifact_mb": artifact_bytes / 1e6
+    }
+
+
+def stats(args: argparse.Namespace) -> int:
+    """Describe each source's published generations"""
+    reports = []
+    for source in load_sources():
+        store = _shard_store(args.index_dir, source)
+        generation = store.current_generation()
+        if generation is None:
+            reports.append({"source": source.name, "generation": None})
+            continue
+        reports.append({
+            "source": source.name,
+            **store.read_manifest(generation),
+            "artifact_mb": _directory_bytes(store.root / generation) / 1e6,
+            "generations": len(store.generations())
+        })
+    if all(report["generation"] is None for report in reports):
+        print(f"No index published under {args.index_dir}", file=sys.stderr)
+        return 1
+    _print_reports(reports, args.json)
+    return 0
+
+
+def query(args: argparse.Namespace) -> int:
+    """Search the published shards, timing load and query"""
+    from .rag_engine import ShardedRAG
+
+    sources = load_sources()
+    rag = ShardedRAG(
+        channel_shards=channel_shards(sources),
+        channel_filters=channel_filters(sources)
+    )
+    search_filter = SearchFilter(
+        path_prefixes=args.path,
+        extensions=args.ext,
+        repos=args.repo,
+        updated_since=(
+            time.time() - args.since_days * 86400
+            if args.since_days is not None else None
+        )
+    )
+
+    start = time.perf_counter()
+    for source in sources:
+        store = _shard_store(args.index_dir, source)
+        if store.current_generation() is not None:
+            rag.load_index(source.name, store.load())
+    load_seconds = time.perf_counter() - start
+    if not rag.shards:
+        print(f"No index published under {args.index_dir}", file=sys.stderr)
+        return 1
+
+    rag.warm_up()
+    start = time.perf_counter()
+    results = rag.search(
+        args.text,
+        top_k=args.top_k,
+        channel=args.channel,
+        search_filter=search_filter
+    )
+    search_seconds = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps({
+            "generations": rag.generations(),
+            "load_seconds": load_seconds,
+            "search_seconds": search_seconds,
+            "filters": {
+                name: search_filter.to_dict()
+                for name, search_filter in rag.filters(
+                    args.channel, search_filter
+                ).items()
+            },
+            "results": results
+        }, indent=2, default=str))
+        return 0
+
+    print(f"{len(rag.shards)} shards: loaded in {load_seconds:.3f}s, "
+          f"searched in {search_seconds * 1000:.1f}ms")
+    for result in results:
+        source = result["metadata"]["source_path"]
+        preview = result["content"][:120].replace("\n", " ")
+        print(f"  {result['score']:.3f}  {source}: {preview}")
+    return 0
+
+
+def tune_batch(args: argparse.Namespace) -> int:
+    """Benchmark encode batch sizes on real chunks and pick the fastest"""
+    from .github_fetcher import GitHubDocsFetcher
+    from .rag_engine import SimpleRAG
+
+    rag = SimpleRAG(max_chunks=args.sample)
+    docs = asyncio.run(GitHubDocsFetcher(load_sources()[0]).fetch_docs())
+    chunks, _ = rag.chunk_documents(docs)
+    if not chunks:
+        print("No chunks to benchmark", file=sys.stderr)
+        return 1
+
+    rag.warm_up()
+    results = {}
+    for batch_size in [int(size) for size in args.sizes.split(",")]:
+        start = time.perf_counter()
+        rag.encode_chunks(chunks, workers=args.workers, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        results[batch_size] = len(chunks) / elapsed if elapsed else 0.0
+
+    best = max(results, key=results.get)
+    report: Dict[str, Any] = {
+        "chunks": len(chunks),
+        "workers": args.workers
+    }
+    for batch_size, rate in results.items():
+        report[f"batch_{batch_size}_chunks_per_s"] = rate
+    report["recommended_batch_size"] = best
+    _print_report(report, args.json)
+    if not args.json:
+        print(f"\nSet EMBED_BATCH_SIZE={best}")
+    return 0
+
+
+def compare_backends(args: argparse.Namespace) -> int:
+    """Check a candidate embedding backend's recall@k against fp32"""
+    from . import embeddings
+    from .rag_engine import SimpleRAG
+
+    with open(args.fixture, encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    reference = embeddings.create_embedding_backend(
+        args.model, backend="sentence-transformers"
+    )
+    candidate = embeddings.create_embedding_backend(
+        args.model, backend=args.candidate, quantize=args.quantize
+    )
+    chunks, _ = SimpleRAG(
+        model_name=args.model, embedder=reference
+    ).chunk_documents(fixture["docs"])
+    queries = [item["question"] for item in fixture["questions"]]
+
+    report: Dict[str, Any] = {
+        "candidate": args.candidate + (" int8" if args.quantize else ""),
+        **embeddings.compare_backends(
+            reference, candidate, chunks, queries, k=args.k
+        )
+    }
+    _print_report(report, args.json)
+    recall = report[f"recall_at_{args.k}"]
+    return 0 if recall >= args.min_recall else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.indexer",
+        description="Build and inspect GitTalker index artifacts"
+    )
+    parser.add_argument(
+        "--index-dir", default=INDEX_DIR,
+        help=f"Index directory (default: {INDEX_DIR})"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Machine-readable output"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help=build.__doc__)
+    build_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Embedding processes (default: all CPUs)"
+    )
+    build_parser.add_argument(
+        "--batch-size", type=int, default=EMBED_BATCH_SIZE
+    )
+    build_parser.add_argument(
+        "--source", action="append", default=[],
+        help="Only rebuild this source's shard (repeatable; default: all)"
+    )
+    build_parser.add_argument("--max-chunks", type=int, default=100000)
+    build_parser.add_argument(
+        "--keep", type=int, default=INDEX_KEEP_GENERATIONS,
+        help="Generations to keep on disk"
+    )
+    build_parser.set_defaults(handler=build)
+
+    stats_parser = commands.add_parser("stats", help=stats.__doc__)
+    stats_parser.set_defaults(handler=stats)
+
+    query_parser = commands.add_parser("query", help=query.__doc__)
+    query_parser.add_argument("text")
+    query_parser.add_argument("--top-k", type=int, default=3)
+    query_parser.add_argument(
+        "--channel", help="Route as a question from this Slack channel"
+    )
+    query_parser.add_argument(
+        "--path", action="append", help="Only files under this prefix"
+    )
+    query_parser.add_argument(
+        "--ext", action="append", help="Only files with this extension"
+    )
+    query_parser.add_argument(
+        "--repo", action="append", help="Only files from this repository"
+    )
+    query_parser.add_argument(
+        "--since-days", type=float,
+        help="Only files updated in the last N days"
+    )
+    query_parser.set_defaults(handler=query)
+
+    tune_parser = commands.add_parser("tune-batch", help=tune_batch.__doc__)
+    tune_parser.add_argument("--sizes", default="8,16,32,64,128")
+    tune_parser.add_argument("--sample", type=int, default=2000)
+    tune_parser.add_argument("--workers", type=int, default=EMBED_WORKERS)
+    tune_parser.set_defaults(handler=tune_batch)
+
+    compare_parser = commands.add_parser(
+        "compare-backends", help=compare_backends.__doc__
+    )
+    compare_parser.add_argument("--fixture", default=str(DEFAULT_FIXTURE))
+    compare_parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    compare_parser.add_argument("--candidate", default="onnx")
+    compare_parser.add_argument("--quantize", action="store_true")
+    compare_parser.add_argument("--k", type=int, default=3)
+    compare_parser.add_argument(
+        "--min-recall", type=float, default=0.9,
+        help="Exit non-zero below this recall (default: 0.9)"
+    )
+    compare_parser.set_defaults(handler=compare_backends)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
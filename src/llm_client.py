@@ -3,7 +3,10 @@ LLM Client Utility for GitTalker
 Supports multiple LLM providers: OpenAI, Anthropic, Ollama, vLLM
 """
 
+import asyncio
 import httpx
+import logging
+import time
 from typing import Dict, Any, Optional, List
 from src.config import (
     PRIMARY_LLM_PROVIDER,
@@ -12,23 +15,72 @@ from src.config import (
     FALLBACK_ORDER,
     TEMPERATURE,
     MAX_TOKENS,
-    REQUEST_TIMEOUT
+    REQUEST_TIMEOUT,
+    LLM_PROMPT_CACHING,
+    LLM_ROUTING,
+    LLM_LATENCY_SLO,
+    LLM_ROUTER_MIN_SCORE,
+    LLM_ROUTER_SIMPLE_MAX_WORDS,
+    LLM_ROUTER_MAX_ERROR_RATE,
+    LLM_ROUTER_WINDOW
 )
+from src.metrics import (
+    LLM_LATENCY,
+    LLM_ERRORS,
+    LLM_MODEL_LOADED,
+    LLM_MODEL_LOAD_SECONDS,
+    LLM_ROUTED,
+    PROVIDER_FALLBACKS,
+    record_tokens
+)
+from src.router import ModelRouter
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Self-hosted providers whose model has to be loaded before it can answer
+LOCAL_PROVIDERS = ("ollama", "vllm")
+
+# A cold load of a large local model can take minutes
+PRELOAD_TIMEOUT = 600.0
+
+# A failed preload is retried after this, doubling per failure up to the max
+PRELOAD_RETRY_BASE = 15.0
+PRELOAD_RETRY_MAX = 600.0
 
 
 class LLMClient:
     """Universal LLM client supporting multiple providers"""
 
-    def __init__(self):
+    def __init__(self, ledger=None):
         self.primary_provider = PRIMARY_LLM_PROVIDER
+        self.ledger = ledger  # Optional UsageLedger fed by every call
         self.configs = LLM_CONFIGS
         self.fallback_enabled = ENABLE_LLM_FALLBACK
         self.fallback_order = FALLBACK_ORDER
+        # provider -> loaded, last_used, load_seconds, expires_at, error,
+        # failures, retry_at
+        self.model_state: Dict[str, Dict[str, Any]] = {}
+        self.routing = LLM_ROUTING
+        chain = self._provider_chain()
+        self.router = ModelRouter(
+            [provider for provider in chain if provider in LOCAL_PROVIDERS],
+            [
+                provider for provider in chain
+                if provider not in LOCAL_PROVIDERS
+            ],
+            latency_slo=LLM_LATENCY_SLO,
+            simple_max_words=LLM_ROUTER_SIMPLE_MAX_WORDS,
+            min_score=LLM_ROUTER_MIN_SCORE,
+            max_error_rate=LLM_ROUTER_MAX_ERROR_RATE,
+            window=LLM_ROUTER_WINDOW
+        )
 
     async def generate_response(
         self,
         messages: List[Dict[str, str]],
-        provider: Optional[str] = None
+        provider: Optional[str] = None,
+        tier: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate response from LLM provider with fallback support
@@ -36,10 +88,15 @@ class LLMClient:
         Args:
             messages: List of message dicts with 'role' and 'content'
             provider: Optional specific provider to use
+            tier: Question difficulty from router.classify(); with routing
+                enabled it picks the providers, otherwise it is ignored
 
         Returns:
             Dict with response content and metadata
         """
+        if tier and self.routing and not provider:
+            return await self._generate_routed(messages, tier)
+
         target_provider = provider or self.primary_provider
 
         # Try primary provider first
@@ -53,9 +110,11 @@ class LLMClient:
                 for fallback_provider in self.fallback_order:
                     if fallback_provider != target_provider:
                         try:
-                            return await self._call_provider(
+                            result = await self._call_provider(
                                 fallback_provider, messages
                             )
+                            PROVIDER_FALLBACKS.labels(fallback_provider).inc()
+                            return result
                         except Exception as fallback_e:
                             print(f"Fallback {fallback_provider} failed: "
                                   f"{fallback_e}")
@@ -63,6 +122,48 @@ class LLMClient:
 
             raise Exception("All LLM providers failed")
 
+    async def _generate_routed(
+        self,
+        messages: List[Dict[str, str]],
+        tier: str
+    ) -> Dict[str, Any]:
+        """Try the router's providers for this tier in order"""
+        providers = self.router.order(tier, self._unloaded_models())
+        for i, provider in enumerate(providers):
+            try:
+                result = await self._call_provider(provider, messages)
+            except Exception as e:
+                logger.warning("Provider %s failed: %s", provider, e)
+                continue
+            LLM_ROUTED.labels(tier, provider).inc()
+            if i:
+                PROVIDER_FALLBACKS.labels(provider).inc()
+            return {**result, "tier": tier}
+        raise Exception("All LLM providers failed")
+
+    def _provider_chain(self) -> List[str]:
+        """Enabled providers this client may call, primary first"""
+        chain = [self.primary_provider]
+        if self.fallback_enabled:
+            chain += self.fallback_order
+        providers = []
+        for provider in chain:
+            config = self.configs.get(provider) or {}
+            if config.get("enabled") and provider not in providers:
+                providers.append(provider)
+        return providers
+
+    def _unloaded_models(self) -> List[str]:
+        """Local providers whose last preload or status check failed
+
+        The router tries them last rather than not at all, and keep_warm
+        retries the load in the background.
+        """
+        return [
+            provider for provider, state in self.model_state.items()
+            if state["error"] and not state["loaded"]
+        ]
+
     async def _call_provider(
         self,
         provider: str,
@@ -74,16 +175,43 @@ class LLMClient:
             raise Exception(f"Provider {provider} not configured or disabled")
 
         if provider == "openai":
-            return await self._call_openai(messages, config)
+            call = self._call_openai
         elif provider == "anthropic":
-            return await self._call_anthropic(messages, config)
+            call = self._call_anthropic
         elif provider == "ollama":
-            return await self._call_ollama(messages, config)
+            call = self._call_ollama
         elif provider == "vllm":
-            return await self._call_vllm(messages, config)
+            call = self._call_vllm
         else:
             raise Exception(f"Unknown provider: {provider}")
 
+        with tracer.start_span(
+            "llm.call", provider=provider, model=config.get("model")
+        ) as span:
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = await call(messages, config)
+                ok = True
+            except Exception:
+                LLM_ERRORS.labels(provider).inc()
+                raise
+            finally:
+                seconds = time.perf_counter() - start
+                LLM_LATENCY.labels(provider).observe(seconds)
+                self.router.record(provider, seconds, ok)
+            usage = token_usage(result["usage"])
+            record_tokens(provider, usage)
+            span.set_attributes(**usage)
+            if self.ledger is not None:
+                cost = self.ledger.record(
+                    provider, config.get("model"), usage, seconds
+                )
+                span.set_attribute("cost_usd", cost)
+            if provider in LOCAL_PROVIDERS:
+                self._mark_loaded(provider, True, used=True)
+            return result
+
     async def _call_openai(
         self,
         messages: List[Dict[str, str]],
@@ -134,15 +262,18 @@ class LLMClient:
         }
         
         # Convert messages format for Anthropic
-        system_message = None
+        system_blocks = []
         anthropic_messages = []
         
         for msg in messages:
             if msg["role"] == "system":
-                system_message = msg["content"]
+                system_blocks.append({"type": "text", "text": msg["content"]})
             else:
                 anthropic_messages.append(msg)
         
+        if LLM_PROMPT_CACHING:
+            _add_cache_breakpoints(system_blocks, anthropic_messages)
+        
         payload = {
             "model": config["model"],
             "messages": anthropic_messages,
@@ -150,8 +281,8 @@ class LLMClient:
             "max_tokens": MAX_TOKENS
         }
         
-        if system_message:
-            payload["system"] = system_message
+        if system_blocks:
+            payload["system"] = system_blocks
         
         async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
             response = await client.post(
@@ -179,6 +310,8 @@ class LLMClient:
             "model": config["model"],
             "messages": messages,
             "stream": False,
+            # Without it Ollama unloads the model after its own default
+            "keep_alive": config["keep_alive"],
             "options": {
                 "temperature": TEMPERATURE,
                 "num_predict": MAX_TOKENS
@@ -198,6 +331,7 @@ class LLMClient:
                 "provider": "ollama",
                 "model": config["model"],
                 "usage": {
+                    "prompt_eval_count": result.get("prompt_eval_count", 0),
                     "eval_count": result.get("eval_count", 0),
                     "eval_duration": result.get("eval_duration", 0)
                 }
@@ -239,6 +373,211 @@ class LLMClient:
                 "usage": result.get("usage", {})
             }
     
+    async def check_provider(
+        self,
+        provider: Optional[str] = None,
+        timeout: float = 5.0
+    ) -> bool:
+        """Check that a provider answers a cheap model-listing request"""
+        target_provider = provider or self.primary_provider
+        config = self.configs.get(target_provider)
+        if not config or not config.get("enabled"):
+            return False
+
+        headers = {}
+        if target_provider == "openai":
+            url = f"{config['base_url']}/models"
+            headers["Authorization"] = f"Bearer {config['api_key']}"
+        elif target_provider == "anthropic":
+            url = f"{config['base_url']}/v1/models"
+            headers["x-api-key"] = config["api_key"]
+            headers["anthropic-version"] = config["version"]
+        elif target_provider == "ollama":
+            url = f"{config['base_url']}/api/tags"
+        elif target_provider == "vllm":
+            url = f"{config['base_url']}/v1/models"
+            if config.get("api_key"):
+                headers["Authorization"] = f"Bearer {config['api_key']}"
+        else:
+            return False
+
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.get(url, headers=headers)
+                # Any non-auth, non-server-error answer means it's reachable
+                status = response.status_code
+                return status < 500 and status not in (401, 403)
+        except httpx.HTTPError:
+            return False
+
+    def local_providers(self) -> List[str]:
+        """Enabled local providers this client may call, primary first"""
+        return [
+            provider for provider in self._provider_chain()
+            if provider in LOCAL_PROVIDERS
+        ]
+
+    def preload_providers(self) -> List[str]:
+        """Local providers set up on purpose, not only listed as fallbacks"""
+        return [
+            provider for provider in self.local_providers()
+            if self.configs[provider].get("configured")
+        ]
+
+    async def warm_up(self) -> Dict[str, bool]:
+        """Load the configured local models, all at once"""
+        providers = self.preload_providers()
+        loaded = await asyncio.gather(
+            *(self.preload(provider) for provider in providers)
+        )
+        return dict(zip(providers, loaded))
+
+    async def preload(self, provider: str) -> bool:
+        """Load (or keep loaded) a local provider's model"""
+        config = self.configs[provider]
+        headers = {}
+        if provider == "ollama":
+            # A generate request without a prompt only loads the model
+            url = f"{config['base_url']}/api/generate"
+            payload = {
+                "model": config["model"],
+                "keep_alive": config["keep_alive"]
+            }
+        elif provider == "vllm":
+            # vLLM loads at server start; one token warms its kernels
+            url = f"{config['base_url']}/v1/completions"
+            payload = {"model": config["model"], "prompt": "Hi",
+                       "max_tokens": 1}
+            if config.get("api_key"):
+                headers["Authorization"] = f"Bearer {config['api_key']}"
+        else:
+            return False
+
+        start = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(timeout=PRELOAD_TIMEOUT) as client:
+                response = await client.post(
+                    url, headers=headers, json=payload
+                )
+                response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("Preloading %s model failed: %s", provider, e)
+            self._mark_loaded(provider, False, error=str(e) or repr(e))
+            return False
+
+        seconds = time.perf_counter() - start
+        LLM_MODEL_LOAD_SECONDS.labels(provider).observe(seconds)
+        self._mark_loaded(provider, True, used=True)
+        self.model_state[provider]["load_seconds"] = round(seconds, 3)
+        return True
+
+    async def keep_warm(self, interval: float) -> None:
+        """Ping loaded local models that have sat idle for `interval`, and
+        retry failed loads with backoff"""
+        while True:
+            # Checking twice per interval pings within 1.5x interval of
+            # idling; a pending retry may be due sooner
+            delay = interval / 2
+            retries = [
+                state["retry_at"] for state in self.model_state.values()
+                if state["error"]
+            ]
+            if retries:
+                delay = min(delay, max(1.0, min(retries) - time.time()))
+            await asyncio.sleep(delay)
+            now = time.time()
+            for provider in self.local_providers():
+                state = self.model_state.get(provider)
+                if not state:
+                    continue
+                if state["error"]:
+                    # A server that wasn't up yet (or went away): back off
+                    # so one that never comes up isn't hammered
+                    if now < state["retry_at"]:
+                        continue
+                elif not state["last_used"]:
+                    continue
+                elif now - state["last_used"] < interval:
+                    continue
+                try:
+                    await self.preload(provider)
+                except Exception as e:
+                    logger.error("Keepalive for %s failed: %s", provider, e)
+
+    async def model_status(self) -> Dict[str, Dict[str, Any]]:
+        """Ask each local provider whether its model is loaded right now"""
+        for provider in self.local_providers():
+            config = self.configs[provider]
+            try:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    if provider == "ollama":
+                        response = await client.get(
+                            f"{config['base_url']}/api/ps"
+                        )
+                        response.raise_for_status()
+                        running = {
+                            model.get("name"): model
+                            for model in response.json().get("models", [])
+                        }
+                        model = running.get(config["model"])
+                        loaded = model is not None
+                        expires_at = model.get("expires_at") if model else None
+                    else:
+                        headers = {}
+                        if config.get("api_key"):
+                            headers["Authorization"] = (
+                                f"Bearer {config['api_key']}"
+                            )
+                        response = await client.get(
+                            f"{config['base_url']}/v1/models",
+                            headers=headers
+                        )
+                        response.raise_for_status()
+                        served = [
+                            model.get("id")
+                            for model in response.json().get("data", [])
+                        ]
+                        loaded = config["model"] in served
+                        expires_at = None
+            except httpx.HTTPError as e:
+                self._mark_loaded(provider, False, error=str(e) or repr(e))
+                continue
+            self._mark_loaded(provider, loaded)
+            self.model_state[provider]["expires_at"] = expires_at
+        return self.model_state
+
+    def _mark_loaded(
+        self,
+        provider: str,
+        loaded: bool,
+        error: Optional[str] = None,
+        used: bool = False
+    ) -> None:
+        state = self.model_state.setdefault(provider, {
+            "model": self.configs[provider].get("model"),
+            "loaded": False,
+            "last_used": 0.0,
+            "load_seconds": None,
+            "expires_at": None,
+            "error": None,
+            "failures": 0,
+            "retry_at": None
+        })
+        state["loaded"] = loaded
+        state["error"] = error
+        if error:
+            state["failures"] += 1
+            state["retry_at"] = time.time() + min(
+                PRELOAD_RETRY_BASE * 2 ** (state["failures"] - 1),
+                PRELOAD_RETRY_MAX
+            )
+        else:
+            state["failures"] = 0
+            state["retry_at"] = None
+        if used:
+            state["last_used"] = time.time()
+        LLM_MODEL_LOADED.labels(provider).set(1 if loaded else 0)
+
     def get_available_providers(self) -> List[str]:
         """Get list of available/configured providers"""
         return [
@@ -257,6 +596,59 @@ class LLMClient:
         }
 
 
+def _add_cache_breakpoints(
+    system_blocks: List[Dict[str, Any]],
+    messages: List[Dict[str, Any]]
+) -> None:
+    """Mark the stable prompt prefix as cacheable (Anthropic cache_control)"""
+    # The first system block is the static persona, identical every call
+    if system_blocks:
+        system_blocks[0]["cache_control"] = {"type": "ephemeral"}
+    # Earlier turns of a thread only ever grow, so cache up to the last one
+    if len(messages) > 1:
+        previous = messages[-2]
+        messages[-2] = {
+            "role": previous["role"],
+            "content": [{
+                "type": "text",
+                "text": previous["content"],
+                "cache_control": {"type": "ephemeral"}
+            }]
+        }
+
+
+def token_usage(usage: Dict[str, Any]) -> Dict[str, int]:
+    """Normalize provider usage payloads into prompt/cached/completion"""
+    # OpenAI/vLLM, Anthropic and Ollama each name these differently
+    usage = usage or {}
+    details = usage.get("prompt_tokens_details") or {}
+    cache_read = usage.get("cache_read_input_tokens") or 0
+    cached_tokens = details.get("cached_tokens") or cache_read
+    prompt_tokens = (
+        usage.get("prompt_tokens")
+        or usage.get("prompt_eval_count")
+        or 0
+    )
+    if "input_tokens" in usage:
+        # Anthropic's input_tokens excludes cache reads and writes
+        prompt_tokens = (
+            usage["input_tokens"]
+            + cache_read
+            + (usage.get("cache_creation_input_tokens") or 0)
+        )
+    completion_tokens = (
+        usage.get("completion_tokens")
+        or usage.get("output_tokens")
+        or usage.get("eval_count")
+        or 0
+    )
+    return {
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "completion_tokens": completion_tokens
+    }
+
+
 # Example usage
 async def example_usage():
     """Example of how to use the LLM client"""
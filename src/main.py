@@ -1,15 +1,89 @@
 from fastapi import FastAPI
-from slack_sdk import WebClient
-from slack_sdk.socket_mode import SocketModeClient
+from fastapi.responses import JSONResponse, Response
+from slack_sdk.socket_mode.aiohttp import SocketModeClient
 from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.socket_mode.response import SocketModeResponse
 import uvicorn
+import asyncio
+import contextvars
+import functools
 import logging
 import re
-from .config import SLACK_BOT_TOKEN, SLACK_APP_TOKEN
-from .github_fetcher import GitHubDocsFetcher
-from .rag_engine import SimpleRAG
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from .config import (
+    SLACK_BOT_TOKEN,
+    SLACK_APP_TOKEN,
+    SLACK_API_URL,
+    LLM_HEALTH_CHECK_TTL,
+    LLM_PRELOAD,
+    LLM_KEEPALIVE_INTERVAL,
+    RETRIEVAL_MIN_SCORE,
+    SEARCH_TOP_K,
+    SEARCH_FETCH_K,
+    SEARCH_MMR_LAMBDA,
+    SEARCH_MIN_RELATIVE_SCORE,
+    LLM_PRICES,
+    USAGE_DAILY_BUDGET,
+    USAGE_CHANNEL_DAILY_BUDGET,
+    USAGE_BUDGET_WINDOW,
+    USAGE_BUDGET_SOFT_LIMIT,
+    USAGE_DEGRADED_TOP_K,
+    FAQ_FILE,
+    FAQ_MIN_SIMILARITY,
+    FAQ_MAX_ENTRIES,
+    FAQ_MIN_ASKS,
+    FAQ_REFRESH_INTERVAL,
+    SLACK_WORKER_CONCURRENCY,
+    SLACK_QUEUE_MAX_DEPTH,
+    SLACK_QUEUE_MAX_PER_CHANNEL,
+    SLACK_EVENT_DEDUPE_WINDOW,
+    SLACK_BUSY_REPLY_INTERVAL,
+    CONVERSATION_MAX_THREADS,
+    CONVERSATION_TOKEN_BUDGET,
+    CONVERSATION_TTL,
+    SLACK_MAX_CONNECTIONS,
+    SLACK_CHANNEL_POST_INTERVAL,
+    MAX_RETRIES,
+    INDEX_MODE,
+    INDEX_DIR,
+    INDEX_KEEP_GENERATIONS,
+    INDEX_RELOAD_INTERVAL
+)
+from .github_fetcher import DEFAULT_DOCS_STORE, GitHubDocsFetcher
+from .docs_store import DocsStore
+from .rag_engine import ShardedRAG
+from .index_store import IndexStore
+from .sources import (
+    DocSource,
+    channel_filters,
+    channel_shards,
+    load_sources
+)
 from .agent import GitTalkerAgent
+from .llm_client import LLMClient
+from .health import ReadinessState
+from .dispatcher import EventDispatcher
+from .dedupe import RecentKeys, SingleFlight, normalize_query
+from .conversation import ConversationStore, rewrite_query
+from .faq import FaqIndex
+from .router import SIMPLE
+from .usage import (
+    EXHAUSTED,
+    OK,
+    TIGHT,
+    UsageLedger,
+    load_prices,
+    set_requester
+)
+from .slack_poster import SlackPoster
+from .metrics import (
+    COALESCED_QUERIES,
+    DUPLICATE_EVENTS,
+    STAGE_LATENCY,
+    render_metrics
+)
+from .tracing import current_request_id, current_span, tracer
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -21,41 +95,157 @@ app = FastAPI(
 )
 
 # Global instances
-github_fetcher = GitHubDocsFetcher()
-rag_engine = SimpleRAG()
-gittalker_agent = GitTalkerAgent()
-slack_client = WebClient(token=SLACK_BOT_TOKEN)
+doc_sources = load_sources()
+docs_store = DocsStore(DEFAULT_DOCS_STORE)
+github_fetchers = {
+    source.name: GitHubDocsFetcher(source, store=docs_store)
+    for source in doc_sources
+}
+rag_engine = ShardedRAG(
+    channel_shards=channel_shards(doc_sources),
+    channel_filters=channel_filters(doc_sources)
+)
+index_stores = {
+    source.name: IndexStore(
+        str(Path(INDEX_DIR) / source.name),
+        keep_generations=INDEX_KEEP_GENERATIONS
+    )
+    for source in doc_sources
+}
+faq_index = FaqIndex(
+    rag_engine.embedder,
+    min_similarity=FAQ_MIN_SIMILARITY,
+    max_entries=FAQ_MAX_ENTRIES,
+    min_asks=FAQ_MIN_ASKS
+)
+if FAQ_FILE:
+    faq_index.load_curated(FAQ_FILE)
+# Prompt chunks: diverse, and none far weaker than the best match
+DIVERSITY = {
+    "mmr_lambda": SEARCH_MMR_LAMBDA,
+    "fetch_k": SEARCH_FETCH_K,
+    "min_relative_score": SEARCH_MIN_RELATIVE_SCORE
+}
+usage_ledger = UsageLedger(
+    load_prices(LLM_PRICES),
+    daily_budget=USAGE_DAILY_BUDGET,
+    channel_daily_budget=USAGE_CHANNEL_DAILY_BUDGET,
+    window=USAGE_BUDGET_WINDOW,
+    soft_limit=USAGE_BUDGET_SOFT_LIMIT
+)
+llm_client = LLMClient(ledger=usage_ledger)
+gittalker_agent = GitTalkerAgent(llm_client)
+readiness = ReadinessState()
+dispatcher = EventDispatcher(
+    concurrency=SLACK_WORKER_CONCURRENCY,
+    max_queue_depth=SLACK_QUEUE_MAX_DEPTH,
+    max_per_channel=SLACK_QUEUE_MAX_PER_CHANNEL
+)
+slack_poster = SlackPoster(
+    token=SLACK_BOT_TOKEN,
+    base_url=SLACK_API_URL,
+    max_connections=SLACK_MAX_CONNECTIONS,
+    channel_interval=SLACK_CHANNEL_POST_INTERVAL,
+    max_retries=MAX_RETRIES
+)
+
+
+PROCESSING_ERROR_RESPONSE = (
+    "Sorry, I had trouble processing your question. "
+    "Try rephrasing it or ask Mike! 💭"
+)
+UNEXPECTED_ERROR_RESPONSE = (
+    "Something went wrong on my end. "
+    "Better hit up Mike for this one! 🔧"
+)
 
 
 class SlackBot:
     def __init__(self):
-        self.socket_client = SocketModeClient(
-            app_token=SLACK_APP_TOKEN,
-            web_client=slack_client
+        self.socket_client = None
+        self.recent_events = RecentKeys(
+            window_seconds=SLACK_EVENT_DEDUPE_WINDOW
         )
-        self.socket_client.socket_mode_request_listeners.append(
-            self.handle_events
+        self.inflight_queries = SingleFlight()
+        # Channels told we're busy recently; one reply stands for a burst
+        self.busy_notified = RecentKeys(
+            window_seconds=SLACK_BUSY_REPLY_INTERVAL
+        )
+        self._busy_replies: Set[asyncio.Task] = set()
+        self.conversations = ConversationStore(
+            max_threads=CONVERSATION_MAX_THREADS,
+            token_budget=CONVERSATION_TOKEN_BUDGET,
+            ttl_seconds=CONVERSATION_TTL
         )
         
     async def handle_events(
         self, client: SocketModeClient, req: SocketModeRequest
     ):
-        """Handle incoming Slack events."""
-        if req.type == "events_api":
-            event = req.payload["event"]
+        """Acknowledge Slack events immediately and queue the work."""
+        # Ack before doing anything slow so Slack doesn't retry the envelope
+        response = SocketModeResponse(envelope_id=req.envelope_id)
+        await client.send_socket_mode_response(response)
+        
+        if req.type != "events_api":
+            return
             
-            # Handle app mentions
-            if event["type"] == "app_mention":
-                await self.handle_mention(event)
-                
-            # Handle direct messages
-            elif event["type"] == "message" and "subtype" not in event:
-                if event.get("channel_type") == "im":
-                    await self.handle_dm(event)
+        # Slack redelivers on retries and reconnects with the same event_id
+        event_key = req.payload.get("event_id") or req.envelope_id
+        if self.recent_events.seen(event_key):
+            DUPLICATE_EVENTS.inc()
+            logger.info("Ignoring duplicate Slack event %s", event_key)
+            return
+            
+        event = req.payload["event"]
+        handler = self._route_event(event)
+        if handler is None:
+            return
+            
+        request_id = tracer.new_request_id()
         
-        # Acknowledge the event
-        response = SocketModeResponse(envelope_id=req.envelope_id)
-        client.send_socket_mode_response(response)
+        async def job():
+            with tracer.start_span(
+                "slack.handle_event",
+                request_id=request_id,
+                event_type=event.get("type"),
+                channel=event.get("channel"),
+                envelope_id=req.envelope_id
+            ):
+                await handler(event)
+        
+        if not dispatcher.submit(event.get("channel", ""), job):
+            logger.warning(
+                "Dispatcher saturated, shedding event [%s]", request_id
+            )
+            if not self.busy_notified.seen(event.get("channel", "")):
+                # Not awaited: the ack path must stay fast under overload
+                task = asyncio.create_task(self.post_busy(event))
+                self._busy_replies.add(task)
+                task.add_done_callback(self._busy_replies.discard)
+    
+    def _route_event(self, event):
+        """Pick the handler for an event, or None to ignore it."""
+        # Handle app mentions
+        if event["type"] == "app_mention":
+            return self.handle_mention
+            
+        # Handle direct messages
+        if event["type"] == "message" and "subtype" not in event:
+            if event.get("channel_type") == "im":
+                return self.handle_dm
+                
+        return None
+    
+    async def post_busy(self, event):
+        """Tell the user we're saturated instead of silently dropping."""
+        try:
+            await self.post_message(
+                channel=event["channel"],
+                text=gittalker_agent.busy_response(),
+                thread_ts=event.get("ts")
+            )
+        except Exception as e:
+            logger.error("Failed to post busy response: %s", e)
     
     async def handle_mention(self, event):
         """Handle @bot mentions in channels."""
@@ -66,12 +256,13 @@ class SlackBot:
         clean_text = self.clean_mention_text(text)
         
         if gittalker_agent.is_valid_query(clean_text):
-            response = await self.process_query(clean_text)
+            response = await self.answer(event, clean_text)
             
-            await slack_client.chat_postMessage(
+            await self.post_message(
                 channel=channel,
                 text=response,
-                thread_ts=event.get("ts")  # Reply in thread if possible
+                # Reply in the thread (started by this mention if needed)
+                thread_ts=event.get("thread_ts") or event.get("ts")
             )
     
     async def handle_dm(self, event):
@@ -80,33 +271,160 @@ class SlackBot:
         text = event["text"]
         
         if gittalker_agent.is_valid_query(text):
-            response = await self.process_query(text)
+            response = await self.answer(event, text)
             
-            await slack_client.chat_postMessage(
+            await self.post_message(
                 channel=channel,
-                text=response
+                text=response,
+                # Keep a threaded follow-up in its thread
+                thread_ts=event.get("thread_ts")
+            )
+    
+    async def answer(self, event, query: str) -> str:
+        """Answer a query unless the asking user is over their limit."""
+        allowed = await gittalker_agent.check_rate_limit(
+            event.get("user", "unknown"), event["channel"]
+        )
+        if not allowed:
+            return gittalker_agent.rate_limited_response()
+        # LLM usage in this job is billed to the asker (a coalesced
+        # question to whoever asked it first)
+        set_requester(event.get("user"), event["channel"])
+            
+        # Follow-ups in a thread are answered with the thread's history
+        key = self.thread_key(event)
+        thread = self.conversations.get(key)
+        history = thread.messages() if thread is not None else []
+        search_query, topic = rewrite_query(
+            query, thread.topic if thread is not None else None
+        )
+        response = await self.process_query(
+            query, search_query, history, channel=event["channel"]
+        )
+        # Canned replies carry nothing worth feeding back into the prompt
+        if not self.is_canned_response(response):
+            self.conversations.add_turn(key, query, response, topic=topic)
+        return response
+    
+    def is_canned_response(self, response: str) -> bool:
+        """Whether a reply is a fallback, rate-limit or error message."""
+        return (
+            gittalker_agent.is_fallback_response(response)
+            or response in (
+                gittalker_agent.rate_limited_response(),
+                PROCESSING_ERROR_RESPONSE,
+                UNEXPECTED_ERROR_RESPONSE
             )
+        )
+    
+    def thread_key(self, event) -> str:
+        """Conversation key: the Slack thread the message is in or starts.
+        
+        A top-level DM starts its own thread like a mention does, so only
+        replies in a thread carry history.
+        """
+        channel = event["channel"]
+        return f"{channel}:{event.get('thread_ts') or event['ts']}"
+    
+    async def post_message(self, channel: str, text: str, **kwargs):
+        """Post a message to Slack, timing queueing plus the round-trip."""
+        with tracer.start_span("slack.post", channel=channel):
+            with STAGE_LATENCY.labels("slack_post").time():
+                await slack_poster.post_message(channel, text, **kwargs)
     
-    async def process_query(self, query: str) -> str:
+    async def process_query(
+        self,
+        query: str,
+        search_query: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        channel: Optional[str] = None
+    ) -> str:
         """Process user query and generate response."""
+        search_query = search_query or query
+        with tracer.start_span(
+            "process_query",
+            query_length=len(query),
+            history_messages=len(history or [])
+        ) as span:
+            if history:
+                # Answers depend on the thread, so they can't be shared
+                return await self._process_query(
+                    query, search_query, history, channel
+                )
+                
+            # Identical questions in flight share one pipeline execution
+            # (per set of shards and filters, as channels may search
+            # different repos or subsystems)
+            scope = rag_engine.scope_key(channel)
+            key = f"{scope}|{normalize_query(query)}"
+            faq_index.record(query, scope, channel)
+            if self.inflight_queries.is_inflight(key):
+                COALESCED_QUERIES.inc()
+                span.set_attribute("coalesced", True)
+            return await self.inflight_queries.do(
+                key,
+                lambda: self._process_query(
+                    query, search_query, channel=channel
+                )
+            )
+    
+    async def _process_query(
+        self,
+        query: str,
+        search_query: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        channel: Optional[str] = None
+    ) -> str:
+        """Retrieve context and generate an answer, handling errors."""
         try:
-            # Search documentation
-            search_results = rag_engine.search(query, top_k=3)
+            # Near the budget: a shorter prompt on the cheapest route
+            budget = usage_ledger.budget_level(channel)
+            top_k = USAGE_DEGRADED_TOP_K if budget != OK else SEARCH_TOP_K
+            span = current_span()
+            if span is not None and budget != OK:
+                span.set_attribute("budget", budget)
+            
+            # Search documentation off the event loop so workers overlap
+            loop = asyncio.get_running_loop()
+            faq_answer, search_results = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    contextvars.copy_context().run,
+                    retrieve, search_query, channel, not history, top_k
+                )
+            )
+            if faq_answer is not None:
+                return faq_answer
+            # Over the budget: precomputed answers only
+            if budget == EXHAUSTED:
+                return gittalker_agent.budget_response()
+            
+            # Nothing in the docs is close enough to be worth a generation
+            if not is_confident(search_results):
+                return gittalker_agent.no_docs_response()
             context = rag_engine.format_context(search_results)
             
             # Generate response
-            response = await gittalker_agent.generate_response(query, context)
+            with STAGE_LATENCY.labels("generate_response").time():
+                response = await gittalker_agent.generate_response(
+                    query, context, history=history,
+                    retrieval_score=search_results[0]["score"],
+                    tier=SIMPLE if budget == TIGHT else None
+                )
             
             return response
             
         except (ValueError, KeyError) as e:
-            logger.error("Query processing error: %s", e)
-            return ("Sorry, I had trouble processing your question. "
-                    "Try rephrasing it or ask Mike! 💭")
+            logger.error(
+                "Query processing error [%s]: %s", current_request_id(), e
+            )
+            return PROCESSING_ERROR_RESPONSE
         except Exception as e:
-            logger.error("Unexpected error in query processing: %s", e)
-            return ("Something went wrong on my end. "
-                    "Better hit up Mike for this one! 🔧")
+            logger.error(
+                "Unexpected error in query processing [%s]: %s",
+                current_request_id(), e
+            )
+            return UNEXPECTED_ERROR_RESPONSE
     
     def clean_mention_text(self, text: str) -> str:
         """Remove bot mention from message text."""
@@ -114,44 +432,375 @@ class SlackBot:
         clean_text = re.sub(r'<@[A-Z0-9]+>', '', text).strip()
         return clean_text
     
-    def start(self):
+    async def start(self):
         """Start the Slack bot."""
-        self.socket_client.connect()
+        await slack_poster.start()
+        self.socket_client = SocketModeClient(
+            app_token=SLACK_APP_TOKEN,
+            web_client=slack_poster.client
+        )
+        self.socket_client.socket_mode_request_listeners.append(
+            self.handle_events
+        )
+        await self.socket_client.connect()
+    
+    async def stop(self):
+        """Disconnect from Slack and flush outbound messages."""
+        if self.socket_client is not None:
+            await self.socket_client.close()
+        await slack_poster.close()
+
+
+def retrieve(
+    query: str,
+    channel: Optional[str] = None,
+    use_faq: bool = True,
+    top_k: int = SEARCH_TOP_K
+) -> Tuple[Optional[str], List[Dict]]:
+    """A precomputed answer, or else search results, embedding once."""
+    query_embedding = rag_engine.embed(query)
+    if use_faq:
+        scope = rag_engine.scope_key(channel)
+        entry = faq_index.match(query_embedding, scope)
+        if entry is not None:
+            span = current_span()
+            if span is not None:
+                span.set_attribute("faq_hit", True)
+            return entry.answer, []
+    results = rag_engine.search(
+        query, top_k, channel, query_embedding=query_embedding,
+        **DIVERSITY
+    )
+    return None, results
+
+
+def is_confident(search_results: List[Dict]) -> bool:
+    """Whether the best chunk scores high enough to answer from."""
+    return bool(search_results) and (
+        search_results[0]["score"] >= RETRIEVAL_MIN_SCORE
+    )
+
+
+async def precompute_answer(
+    question: str, channel: Optional[str] = None
+) -> Optional[str]:
+    """Answer a frequent question for the FAQ index (None if unsure)."""
+    loop = asyncio.get_running_loop()
+    search_results = await loop.run_in_executor(
+        None,
+        functools.partial(
+            rag_engine.search, question, SEARCH_TOP_K, channel, **DIVERSITY
+        )
+    )
+    if not is_confident(search_results):
+        return None
+    # No retrieval score: answers served many times go to a hosted model
+    response = await gittalker_agent.generate_response(
+        question, rag_engine.format_context(search_results)
+    )
+    if gittalker_agent.is_fallback_response(response):
+        return None
+    return response
+
+
+async def refresh_faq_answers():
+    """Keep precomputed answers in step with the questions and the docs."""
+    while True:
+        # Answers are precomputed ahead of demand: only with budget to spare
+        if usage_ledger.budget_level() != OK:
+            logger.info("Skipping FAQ refresh: LLM budget is nearly spent")
+            await asyncio.sleep(FAQ_REFRESH_INTERVAL)
+            continue
+        try:
+            generated = await faq_index.refresh(
+                precompute_answer, rag_engine.version
+            )
+            if generated:
+                logger.info(
+                    "Generated %d FAQ answers (%d served)",
+                    generated, len(faq_index)
+                )
+        except Exception as e:
+            logger.error("FAQ refresh failed: %s", e)
+        await asyncio.sleep(FAQ_REFRESH_INTERVAL)
 
 
 # Initialize bot
 slack_bot = SlackBot()
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize documentation on startup."""
+async def initialize_service():
+    """Fetch docs, build and warm the index, then connect to Slack."""
     try:
-        logger.info("Fetching documentation from GitHub...")
-        docs = await github_fetcher.fetch_docs()
+        if INDEX_MODE == "replica":
+            await load_published_index(wait=True)
+            app.state.index_watcher = asyncio.create_task(
+                watch_index_generations()
+            )
+        else:
+            await build_index()
         
-        logger.info("Indexing %d documents...", len(docs))
-        rag_engine.index_documents(docs)
+        logger.info("Warming up embedding model...")
+        # In the executor too: a cold model load takes seconds
+        loop = asyncio.get_running_loop()
+        readiness.mark_model_warmed(
+            await loop.run_in_executor(None, rag_engine.warm_up)
+        )
+        
+        await refresh_llm_health()
+        app.state.llm_health_checker = asyncio.create_task(
+            watch_llm_health()
+        )
         
         logger.info("Starting Slack bot...")
-        slack_bot.start()
+        dispatcher.start()
+        await slack_bot.start()
+        readiness.slack_connected = True
+        
+        # A cold local model load can take minutes; serve meanwhile
+        app.state.llm_warmer = asyncio.create_task(warm_local_models())
+        
+        if FAQ_REFRESH_INTERVAL > 0:
+            app.state.faq_refresher = asyncio.create_task(
+                refresh_faq_answers()
+            )
         
         logger.info("GitTalker is ready!")
         
     except (ValueError, ConnectionError) as e:
         logger.error("Startup configuration error: %s", e)
-        raise
+        readiness.mark_failed(str(e))
     except Exception as e:
         logger.error("Unexpected startup error: %s", e)
-        raise
+        readiness.mark_failed(str(e))
+
+
+async def build_index():
+    """Fetch docs and embed every source's shard, publishing if configured."""
+    docs_count = 0
+    failures = []
+    for source in doc_sources:
+        try:
+            docs_count += await build_shard(source)
+        except Exception as e:
+            # One broken repository shouldn't keep the others offline
+            logger.error("Indexing source %s failed: %s", source.name, e)
+            failures.append(e)
+    if len(failures) == len(doc_sources):
+        raise failures[0]
+    readiness.mark_docs_fetched(docs_count)
+    readiness.mark_index_built(rag_engine.chunk_count)
+
+
+async def build_shard(source: DocSource) -> int:
+    """Fetch one source's docs and (re)build its shard."""
+    logger.info("Fetching documentation for %s...", source.name)
+    fetcher = github_fetchers[source.name]
+    changes = await fetcher.sync()
+    logger.info(
+        "%s: %d files fetched, %d removed, %d unchanged",
+        source.name, changes["fetched"], changes["removed"],
+        changes["unchanged"]
+    )
+    
+    logger.info("Indexing %s...", source.name)
+    # Off the event loop so the probes can answer during the build (and
+    # embedding may be a network call to a server)
+    loop = asyncio.get_running_loop()
+    stats = await loop.run_in_executor(
+        None, rag_engine.index_documents, source.name, fetcher.iter_docs()
+    )
+    
+    if INDEX_MODE == "publish":
+        generation = rag_engine.shards[source.name].save_index(
+            index_stores[source.name]
+        )
+        logger.info(
+            "Published %s index generation %s", source.name, generation
+        )
+    return stats["documents"]
+
+
+async def load_published_index(wait: bool = False):
+    """Memory-map each shard's current published generation."""
+    reloaded = await reload_shards()
+    while not rag_engine.shards and wait:
+        logger.info("Waiting for an index to be published in %s", INDEX_DIR)
+        await asyncio.sleep(INDEX_RELOAD_INTERVAL)
+        reloaded = await reload_shards()
+    if not rag_engine.shards:
+        raise FileNotFoundError(f"No index published under {INDEX_DIR}")
+    if not reloaded:
+        return
+    
+    sources = sum(
+        len({item["source_path"] for item in shard.metadata})
+        for shard in rag_engine.shards.values()
+    )
+    readiness.mark_docs_fetched(sources)
+    readiness.mark_index_built(rag_engine.chunk_count)
+
+
+async def reload_shards() -> int:
+    """Load shards whose published generation changed, one at a time."""
+    loop = asyncio.get_running_loop()
+    served = rag_engine.generations()
+    reloaded = 0
+    for source in doc_sources:
+        store = index_stores[source.name]
+        generation = store.current_generation()
+        if generation is None or generation == served.get(source.name):
+            continue
+        try:
+            # Off the event loop, like the build: /livez and /readyz keep
+            # answering while a large generation is mapped and indexed
+            snapshot = await loop.run_in_executor(
+                None, store.load, generation
+            )
+            await loop.run_in_executor(
+                None, rag_engine.load_index, source.name, snapshot
+            )
+        except Exception as e:
+            logger.error("Loading %s index failed: %s", source.name, e)
+            continue
+        reloaded += 1
+        logger.info(
+            "Serving %s index generation %s (%d chunks)",
+            source.name, generation, len(snapshot["chunks"])
+        )
+    return reloaded
+
+
+async def watch_index_generations():
+    """Hot-reload shards as the indexer publishes new generations."""
+    while True:
+        await asyncio.sleep(INDEX_RELOAD_INTERVAL)
+        try:
+            await load_published_index()
+        except Exception as e:
+            logger.error("Index reload failed: %s", e)
+
+
+async def refresh_llm_health():
+    """Re-check that the primary LLM provider is reachable."""
+    provider = llm_client.primary_provider
+    reachable = await llm_client.check_provider(provider)
+    readiness.mark_llm_checked(provider, reachable)
+    if not reachable:
+        logger.warning("LLM provider %s is not reachable", provider)
+
+
+async def watch_llm_health():
+    """Re-check the primary LLM every LLM_HEALTH_CHECK_TTL seconds."""
+    while True:
+        await asyncio.sleep(LLM_HEALTH_CHECK_TTL)
+        try:
+            await refresh_llm_health()
+        except Exception as e:
+            logger.error("LLM health check failed: %s", e)
+
+
+async def warm_local_models():
+    """Load local LLMs up front and keep them loaded while idle."""
+    providers = llm_client.preload_providers()
+    if not providers:
+        return
+    if LLM_PRELOAD:
+        logger.info("Preloading local models: %s", ", ".join(providers))
+        for provider, loaded in (await llm_client.warm_up()).items():
+            if loaded:
+                logger.info(
+                    "%s model loaded in %.1fs", provider,
+                    llm_client.model_state[provider]["load_seconds"]
+                )
+    if LLM_KEEPALIVE_INTERVAL > 0:
+        app.state.llm_keepalive = asyncio.create_task(
+            llm_client.keep_warm(LLM_KEEPALIVE_INTERVAL)
+        )
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start initialization in the background so probes can answer."""
+    app.state.init_task = asyncio.create_task(initialize_service())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs and workers, then close Slack connections."""
+    # Jobs first, so none of them starts work on a closing connection
+    tasks = [
+        task for task in (
+            getattr(app.state, name, None)
+            for name in (
+                "init_task", "index_watcher", "faq_refresher",
+                "llm_health_checker", "llm_warmer", "llm_keepalive"
+            )
+        )
+        if task is not None and not task.done()
+    ]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await dispatcher.stop()
+    await slack_bot.stop()
 
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (kept for compatibility, see /livez)."""
     return {"status": "healthy", "service": "GitTalker"}
 
 
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe - fails only if the process cannot recover."""
+    if not readiness.is_alive:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed", "error": readiness.error}
+        )
+    return {"status": "alive", "service": "GitTalker"}
+
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe - only ready once the bot can answer quickly."""
+    # Reads cached state only: the LLM check runs on its own timer, so
+    # concurrent probes never wait on (or pile up) provider calls
+    status_code = 200 if readiness.is_ready else 503
+    return JSONResponse(
+        status_code=status_code,
+        content=readiness.snapshot()
+    )
+
+
+@app.get("/models")
+async def model_status():
+    """Local model load state and each provider's routing stats."""
+    return {
+        "providers": await llm_client.model_status(),
+        "routing": {
+            "enabled": llm_client.routing,
+            "latency_slo": llm_client.router.latency_slo,
+            "stats": llm_client.router.snapshot()
+        }
+    }
+
+
+@app.get("/usage")
+async def usage():
+    """LLM tokens, latency and estimated cost, and budget state."""
+    return usage_ledger.snapshot()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "src.main:app",
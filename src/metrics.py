@@ -0,0 +1,167 @@
+"""
+Prometheus metrics for GitTalker
+Per-stage latency histograms, cache/fallback counters and index gauges
+"""
+
+from typing import Dict, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest
+)
+
+# Buckets cover sub-millisecond vector search up to slow LLM generations
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0
+)
+
+# Pipeline stages: fetch_docs, index_build, queue_wait, query_embed,
+# vector_search, context_build, generate_response, slack_post
+STAGE_LATENCY = Histogram(
+    "gittalker_stage_duration_seconds",
+    "Time spent in each query pipeline stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_LATENCY = Histogram(
+    "gittalker_llm_request_duration_seconds",
+    "Time spent waiting on an LLM provider",
+    ["provider"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_ERRORS = Counter(
+    "gittalker_llm_errors_total",
+    "Failed LLM provider calls",
+    ["provider"]
+)
+
+# kind: prompt, cached_prompt (served from the provider's prefix cache),
+# completion; cached_prompt / prompt is the prefix cache hit ratio
+LLM_TOKENS = Counter(
+    "gittalker_llm_tokens_total",
+    "Tokens reported by LLM providers",
+    ["provider", "kind"]
+)
+
+LLM_COST = Counter(
+    "gittalker_llm_cost_usd_total",
+    "Estimated LLM spend in USD from token counts and model prices",
+    ["provider", "model"]
+)
+
+LLM_MODEL_LOADED = Gauge(
+    "gittalker_llm_model_loaded",
+    "Whether a local provider's model was loaded at the last check",
+    ["provider"]
+)
+
+LLM_MODEL_LOAD_SECONDS = Histogram(
+    "gittalker_llm_model_load_seconds",
+    "Time taken by local model preloads and keepalive pings",
+    ["provider"],
+    buckets=LATENCY_BUCKETS
+)
+
+CACHE_REQUESTS = Counter(
+    "gittalker_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"]
+)
+
+FALLBACK_RESPONSES = Counter(
+    "gittalker_fallback_responses_total",
+    "Canned fallback responses returned instead of an answer",
+    ["reason"]
+)
+
+PROVIDER_FALLBACKS = Counter(
+    "gittalker_llm_provider_fallbacks_total",
+    "Requests served by a fallback LLM provider",
+    ["provider"]
+)
+
+LLM_ROUTED = Counter(
+    "gittalker_llm_routed_total",
+    "Routed LLM requests by question tier and the provider that answered",
+    ["tier", "provider"]
+)
+
+EMBEDDING_REMOTE_FAILURES = Counter(
+    "gittalker_embedding_remote_failures_total",
+    "Failed requests to the remote embedding server",
+    ["provider"]
+)
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "gittalker_rate_limit_rejections_total",
+    "Queries rejected by the rate limiter"
+)
+
+DISPATCH_QUEUE_DEPTH = Gauge(
+    "gittalker_dispatch_queue_depth",
+    "Slack events waiting for a worker"
+)
+
+DISPATCH_SHED = Counter(
+    "gittalker_dispatch_shed_total",
+    "Slack events rejected because the dispatcher was saturated"
+)
+
+DUPLICATE_EVENTS = Counter(
+    "gittalker_duplicate_events_total",
+    "Redelivered Slack events dropped by the dedupe window"
+)
+
+COALESCED_QUERIES = Counter(
+    "gittalker_coalesced_queries_total",
+    "Questions answered by sharing an identical in-flight request"
+)
+
+SLACK_RATE_LIMITED = Counter(
+    "gittalker_slack_rate_limited_total",
+    "Slack Web API calls that returned 429 and were retried",
+    ["method"]
+)
+
+INDEX_CHUNKS = Gauge(
+    "gittalker_index_chunks",
+    "Number of documentation chunks in the search index"
+)
+
+INDEX_MEMORY_BYTES = Gauge(
+    "gittalker_index_memory_bytes",
+    "Approximate memory held by index embeddings and chunk text"
+)
+
+CONVERSATION_THREADS = Gauge(
+    "gittalker_conversation_threads",
+    "Slack threads with conversation history held in memory"
+)
+
+# Process RSS/CPU are exported by prometheus_client's default
+# process collector as process_resident_memory_bytes etc.
+
+
+def record_tokens(provider: str, usage: Dict[str, int]) -> None:
+    """Count prompt, cached prompt and completion tokens for a call"""
+    LLM_TOKENS.labels(provider, "prompt").inc(usage["prompt_tokens"])
+    LLM_TOKENS.labels(provider, "cached_prompt").inc(usage["cached_tokens"])
+    LLM_TOKENS.labels(provider, "completion").inc(
+        usage["completion_tokens"]
+    )
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache hit or miss"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Serialize all metrics in the Prometheus text format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
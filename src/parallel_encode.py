@@ -0,0 +1,113 @@
+"""
+Parallel chunk embedding for GitTalker
+Length-bucketed batches fanned out to worker processes that write their
+embeddings straight into one shared-memory output array
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Loaded once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, backend: str, threads: int) -> None:
+    """Load the model in a worker, capping its intra-op threads"""
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from .embeddings import create_embedding_backend
+    _worker_model = create_embedding_backend(
+        model_name, backend=backend, threads=threads
+    )
+
+
+def _encode_into(
+    shm_name: str,
+    shape: Tuple[int, int],
+    positions: np.ndarray,
+    texts: List[str],
+    batch_size: int
+) -> int:
+    """Encode one task's texts and write rows into the shared output"""
+    embeddings = _worker_model.encode(texts, batch_size=batch_size)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        output = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        output[positions] = embeddings
+        del output  # Release the buffer before closing the mapping
+    finally:
+        shm.close()
+    return len(positions)
+
+
+def length_sorted_tasks(
+    chunks: Sequence[str],
+    batch_size: int,
+    batches_per_task: int = 8
+) -> List[np.ndarray]:
+    """Group chunk indices so each task holds chunks of similar length
+
+    Similar lengths mean each batch pads to roughly the same size, and the
+    longest tasks come first so workers finish at about the same time.
+    """
+    order = np.argsort([len(chunk) for chunk in chunks], kind="stable")
+    task_size = batch_size * batches_per_task
+    tasks = [
+        order[start:start + task_size]
+        for start in range(0, len(order), task_size)
+    ]
+    return tasks[::-1]
+
+
+def parallel_encode(
+    model_name: str,
+    chunks: Sequence[str],
+    dimensions: int,
+    workers: int,
+    batch_size: int = 32,
+    backend: str = "sentence-transformers"
+) -> np.ndarray:
+    """Embed chunks across worker processes, preserving input order"""
+    shape = (len(chunks), dimensions)
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, shape[0] * shape[1] * 4)
+    )
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, backend, threads)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _encode_into,
+                    shm.name,
+                    shape,
+                    positions,
+                    [chunks[i] for i in positions],
+                    batch_size
+                )
+                for positions in length_sorted_tasks(chunks, batch_size)
+            ]
+            for future in futures:
+                future.result()
+
+        output = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        result = output.copy()
+        del output
+        return result
+    finally:
+        shm.close()
+        shm.unlink()
@@ -1,10 +1,18 @@
+import heapq
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Tuple, Optional
+from typing import Iterable, List, Dict, Tuple, Optional
 from sklearn.metrics.pairwise import cosine_similarity
 import json
+import threading
 import time
 from pathlib import Path
+from .metrics import STAGE_LATENCY, INDEX_CHUNKS, INDEX_MEMORY_BYTES
+from .tracing import tracer
+from .index_store import IndexStore
+from .search_filter import MetadataIndex, SearchFilter
+from .parallel_encode import parallel_encode
+from .config import EMBED_BATCH_SIZE, EMBED_WORKERS, SEARCH_MAX_SHARDS
+from .embeddings import create_embedding_backend
 
 
 class SimpleRAG:
@@ -12,10 +20,12 @@ class SimpleRAG:
         self,
         model_name: str = "all-MiniLM-L6-v2",
         max_chunks: int = 1000,  # Limit memory usage
-        cache_embeddings: bool = True
+        cache_embeddings: bool = True,
+        embedder=None
     ):
         """Initialize RAG with performance optimizations."""
-        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        self.embedder = embedder or create_embedding_backend(model_name)
         self.chunks: List[str] = []
         self.embeddings: Optional[np.ndarray] = None
         self.metadata: List[Dict] = []
@@ -23,77 +33,600 @@ class SimpleRAG:
         self.cache_embeddings = cache_embeddings
         self.cache_file = Path("docs/.embeddings_cache.npz")
         self.metadata_file = Path("docs/.metadata_cache.json")
+        self.generation: Optional[str] = None  # Set when loaded from a store
+        self.centroid: Optional[np.ndarray] = None  # For shard routing
+        self.metadata_index = MetadataIndex([])  # For filtered search
+        self._swap_lock = threading.Lock()
         
     def _ensure_cache_dir(self):
         """Ensure cache directory exists."""
         self.cache_file.parent.mkdir(exist_ok=True)
         
-    def index_documents(self, docs: List[Dict[str, str]]) -> None:
+    def index_documents(
+        self,
+        docs: Iterable[Dict[str, str]],
+        workers: int = EMBED_WORKERS,
+        batch_size: int = EMBED_BATCH_SIZE
+    ) -> Dict[str, float]:
         """Create embeddings for documentation chunks with optimization."""
         self._ensure_cache_dir()
         
-        self.chunks = []
-        self.metadata = []
+        # Docs may be streamed from the docs store, so count as they pass
+        documents = 0
+        
+        def counted(docs):
+            nonlocal documents
+            for doc in docs:
+                documents += 1
+                yield doc
+        
+        start = time.perf_counter()
+        chunks, metadata = self.chunk_documents(counted(docs))
+        chunk_seconds = time.perf_counter() - start
+        
+        # Generate or load embeddings
+        start = time.perf_counter()
+        embeddings = None
+        if chunks:
+            with STAGE_LATENCY.labels("index_build").time():
+                embeddings = self.encode_chunks(chunks, workers, batch_size)
+        embed_seconds = time.perf_counter() - start
+        
+        self._swap_index(chunks, embeddings, metadata, generation=None)
+        
+        return {
+            "documents": documents,
+            "chunks": len(chunks),
+            "chunk_seconds": chunk_seconds,
+            "embed_seconds": embed_seconds
+        }
+        
+    def chunk_documents(
+        self, docs: Iterable[Dict[str, str]]
+    ) -> Tuple[List[str], List[Dict]]:
+        """Split documents into paragraph chunks with source metadata."""
+        chunks: List[str] = []
+        metadata: List[Dict] = []
         
         # Process documents into chunks
         for doc in docs:
+            # Limit chunks to prevent memory issues (docs are still read,
+            # so streamed sources are fully counted)
+            if len(chunks) >= self.max_chunks:
+                continue
             # Improved chunking by paragraphs
             paragraphs = doc["content"].split("\n\n")
             for i, paragraph in enumerate(paragraphs):
                 if len(paragraph.strip()) > 50:  # Skip very short chunks
-                    self.chunks.append(paragraph.strip())
-                    self.metadata.append({
+                    chunks.append(paragraph.strip())
+                    metadata.append({
                         "source_path": doc["path"],
                         "source_url": doc["url"],
-                        "chunk_index": i
+                        "chunk_index": i,
+                        "repo": doc.get("repo"),
+                        "updated_at": doc.get("fetched_at")
                     })
         
-        # Limit chunks to prevent memory issues
-        if len(self.chunks) > self.max_chunks:
-            self.chunks = self.chunks[:self.max_chunks]
-            self.metadata = self.metadata[:self.max_chunks]
+        if len(chunks) > self.max_chunks:
+            chunks = chunks[:self.max_chunks]
+            metadata = metadata[:self.max_chunks]
+            
+        return chunks, metadata
         
-        # Generate or load embeddings
-        if self.chunks:
-            self.embeddings = self.model.encode(
-                self.chunks,
-                batch_size=32,  # Process in batches for efficiency
-                show_progress_bar=False
+    def encode_chunks(
+        self,
+        chunks: List[str],
+        workers: int = 1,
+        batch_size: int = EMBED_BATCH_SIZE
+    ) -> np.ndarray:
+        """Embed chunks, fanning out to worker processes when asked."""
+        # A remote backend already sends batches concurrently
+        remote = self.embedder.name == "remote"
+        if remote or workers <= 1 or len(chunks) < workers * batch_size:
+            # encode() already length-sorts within the call
+            return self.embedder.encode(
+                chunks,
+                batch_size=batch_size  # Process in batches for efficiency
             )
             
-    def search(self, query: str, top_k: int = 3) -> List[Dict]:
-        """Search for most relevant documentation chunks."""
-        if not self.chunks or self.embeddings is None:
+        return parallel_encode(
+            self.model_name,
+            chunks,
+            self.embedder.dimensions,
+            backend=self.embedder.name,
+            workers=workers,
+            batch_size=batch_size
+        )
+        
+    def _swap_index(self, chunks, embeddings, metadata, generation) -> None:
+        """Replace the served index in one step so searches never mix."""
+        centroid = _centroid(embeddings)
+        metadata_index = MetadataIndex(metadata)
+        with self._swap_lock:
+            self.chunks = chunks
+            self.embeddings = embeddings
+            self.metadata = metadata
+            self.generation = generation
+            self.centroid = centroid
+            self.metadata_index = metadata_index
+        self._update_index_gauges()
+        
+    def save_index(self, store: IndexStore) -> str:
+        """Publish the current index as a new immutable generation."""
+        with self._swap_lock:
+            chunks, embeddings, metadata = (
+                self.chunks, self.embeddings, self.metadata
+            )
+        if embeddings is None:
+            dimensions = self.embedder.dimensions
+            embeddings = np.zeros((0, dimensions), dtype=np.float32)
+        return store.publish(
+            chunks,
+            metadata,
+            embeddings,
+            manifest={
+                "model_name": self.model_name,
+                "embedding_backend": self.embedder.name,
+                # The remote backend's model, else the local one
+                "embedding_model": self.embedder.model_name
+            }
+        )
+        
+    def check_compatible(self, snapshot: Dict) -> None:
+        """Refuse a generation whose vectors our queries can't match."""
+        manifest = snapshot["manifest"]
+        built = (
+            manifest.get("embedding_backend"),
+            manifest.get("embedding_model") or manifest.get("model_name")
+        )
+        serving = (self.embedder.name, self.embedder.model_name)
+        backend_differs = built[0] and (
+            _backend_family(built[0]) != _backend_family(serving[0])
+        )
+        if backend_differs or built[1] and built[1] != serving[1]:
+            raise ValueError(
+                f"Index {snapshot['generation']} was built with "
+                f"{built[1]} ({built[0]}), but this process embeds "
+                f"queries with {serving[1]} ({serving[0]})"
+            )
+        model_name = manifest.get("model_name")
+        if model_name and model_name != self.model_name:
+            raise ValueError(
+                f"Index {snapshot['generation']} was built with {model_name}, "
+                f"but this process embeds queries with {self.model_name}"
+            )
+        dimensions = manifest.get("dimensions")
+        if len(snapshot["embeddings"]) and (
+            dimensions != self.embedder.dimensions
+        ):
+            raise ValueError(
+                f"Index {snapshot['generation']} has {dimensions}-dimensional "
+                f"embeddings, but {serving[1]} produces "
+                f"{self.embedder.dimensions}"
+            )
+        
+    def load_index(self, snapshot: Dict) -> None:
+        """Serve a memory-mapped generation loaded by IndexStore.load."""
+        self.check_compatible(snapshot)
+        embeddings = snapshot["embeddings"]
+        self._swap_index(
+            snapshot["chunks"],
+            embeddings if len(embeddings) else None,
+            snapshot["metadata"],
+            generation=snapshot["generation"]
+        )
+        
+    def _update_index_gauges(self) -> None:
+        """Publish index size and memory footprint metrics."""
+        INDEX_CHUNKS.set(len(self.chunks))
+        embedding_bytes = (
+            self.embeddings.nbytes if self.embeddings is not None else 0
+        )
+        text_bytes = getattr(self.chunks, "nbytes", None)
+        if text_bytes is None:
+            text_bytes = sum(len(chunk) for chunk in self.chunks)
+        INDEX_MEMORY_BYTES.set(embedding_bytes + text_bytes)
+            
+    def warm_up(self, query: str = "How do I get started?") -> float:
+        """Run one encode and one search so the first real query is fast."""
+        start = time.perf_counter()
+        self.embedder.encode([query])
+        self.search(query, top_k=1)
+        return time.perf_counter() - start
+            
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        search_filter: Optional[SearchFilter] = None,
+        mmr_lambda: Optional[float] = None,
+        fetch_k: Optional[int] = None,
+        min_relative_score: float = 0.0
+    ) -> List[Dict]:
+        """Search for most relevant documentation chunks.
+        
+        With mmr_lambda set, the top_k are picked from the fetch_k best by
+        maximal marginal relevance; chunks scoring below
+        min_relative_score times the best one are never returned.
+        """
+        if not len(self.chunks) or self.embeddings is None:
             return []
             
-        # Encode query
-        query_embedding = self.model.encode([query])
+        with tracer.start_span("rag.search", top_k=top_k) as span:
+            # Encode query
+            with STAGE_LATENCY.labels("query_embed").time():
+                query_embedding = self.embedder.encode([query])
+            
+            with STAGE_LATENCY.labels("vector_search").time():
+                results = self.search_embedding(
+                    query_embedding, top_k, search_filter,
+                    mmr_lambda, fetch_k, min_relative_score
+                )
+                
+            if search_filter:
+                span.set_attribute("filter", search_filter.key)
+            span.set_attributes(
+                index_chunks=len(self.chunks),
+                chunks_retrieved=len(results),
+                scores=[round(r["score"], 4) for r in results],
+                sources=[r["metadata"]["source_path"] for r in results]
+            )
+            
+        return results
+    
+    def search_embedding(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        search_filter: Optional[SearchFilter] = None,
+        mmr_lambda: Optional[float] = None,
+        fetch_k: Optional[int] = None,
+        min_relative_score: float = 0.0
+    ) -> List[Dict]:
+        """Top-k chunks for an already encoded query."""
+        if mmr_lambda is None and not min_relative_score:
+            results, _ = self.candidates(query_embedding, top_k, search_filter)
+            return results
+        results, vectors = self.candidates(
+            query_embedding, max(top_k, fetch_k or top_k), search_filter
+        )
+        return select(
+            results, vectors, top_k, mmr_lambda, min_relative_score
+        )
         
+    def candidates(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        search_filter: Optional[SearchFilter] = None
+    ) -> Tuple[List[Dict], np.ndarray]:
+        """Top-k chunks by score and their embeddings, for re-ranking."""
+        with self._swap_lock:
+            chunks, embeddings, metadata, metadata_index = (
+                self.chunks, self.embeddings, self.metadata,
+                self.metadata_index
+            )
+        if not len(chunks) or embeddings is None:
+            return [], _NO_VECTORS
+            
+        # Only the rows matching the filter are scored
+        rows = metadata_index.rows(search_filter)
+        if rows is not None:
+            if not len(rows):
+                return [], _NO_VECTORS
+            embeddings = embeddings[rows]
+            
         # Calculate similarity scores
-        similarities = cosine_similarity(query_embedding, self.embeddings)[0]
+        similarities = cosine_similarity(query_embedding, embeddings)[0]
         
         # Get top-k results
         top_indices = np.argsort(similarities)[-top_k:][::-1]
         
         results = []
         for idx in top_indices:
+            row = idx if rows is None else rows[idx]
             results.append({
-                "content": self.chunks[idx],
+                "content": chunks[row],
                 "score": float(similarities[idx]),
-                "metadata": self.metadata[idx]
+                "metadata": metadata[row]
             })
-            
-        return results
+        return results, np.asarray(embeddings[top_indices])
     
-    def format_context(self, search_results: List[Dict]) -> str:
+    @staticmethod
+    def format_context(search_results: List[Dict]) -> str:
         """Format search results into context for the LLM."""
         if not search_results:
             return "No relevant documentation found."
             
-        context_parts = []
-        for result in search_results:
-            source = result["metadata"]["source_path"]
-            content = result["content"]
-            context_parts.append(f"From {source}:\n{content}")
+        with STAGE_LATENCY.labels("context_build").time():
+            context_parts = []
+            for result in search_results:
+                source = result["metadata"]["source_path"]
+                content = result["content"]
+                context_parts.append(f"From {source}:\n{content}")
+                
+            return "\n\n---\n\n".join(context_parts)
+
+
+class ShardedRAG:
+    """One SimpleRAG shard per documentation source behind a query router.
+
+    Each shard is built, published and reloaded on its own. A query is
+    embedded once and searched only in the shards mapped to its Slack
+    channel, or else in the SEARCH_MAX_SHARDS shards whose centroid is
+    closest, so per-query cost stays flat as sources are added. A channel
+    mapped to a subsystem also carries a SearchFilter per shard.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        max_chunks: int = 1000,  # Per shard
+        embedder=None,
+        channel_shards: Optional[Dict[str, List[str]]] = None,
+        max_shards: int = SEARCH_MAX_SHARDS,
+        channel_filters: Optional[
+            Dict[str, Dict[str, SearchFilter]]
+        ] = None
+    ):
+        self.model_name = model_name
+        self.embedder = embedder or create_embedding_backend(model_name)
+        self.max_chunks = max_chunks
+        self.channel_shards = channel_shards or {}
+        self.channel_filters = channel_filters or {}  # channel -> shard
+        self.max_shards = max_shards
+        self.shards: Dict[str, SimpleRAG] = {}
+        self.version = 0  # Bumped whenever any shard's content changes
+        
+    def _add_shard(self, name: str, shard: SimpleRAG) -> None:
+        # Copy on write: searches in executor threads iterate the old dict
+        self.shards = {**self.shards, name: shard}
+        self.version += 1
+        self._update_index_gauges()
+        
+    def _new_shard(self) -> SimpleRAG:
+        # Shards share one embedder so their scores are comparable
+        return SimpleRAG(
+            model_name=self.model_name,
+            max_chunks=self.max_chunks,
+            embedder=self.embedder
+        )
+        
+    @property
+    def chunk_count(self) -> int:
+        return sum(len(shard.chunks) for shard in self.shards.values())
+        
+    def generations(self) -> Dict[str, Optional[str]]:
+        """Generation served by each shard."""
+        return {name: shard.generation for name, shard in self.shards.items()}
+        
+    def index_documents(
+        self, name: str, docs: Iterable[Dict[str, str]]
+    ) -> Dict:
+        """Build (or rebuild) one shard in-process."""
+        shard = self.shards.get(name) or self._new_shard()
+        stats = shard.index_documents(docs)
+        self._add_shard(name, shard)
+        return stats
+        
+    def load_index(self, name: str, snapshot: Dict) -> None:
+        """Serve a published generation in one shard."""
+        shard = self.shards.get(name) or self._new_shard()
+        shard.load_index(snapshot)
+        self._add_shard(name, shard)
+        
+    def scope(self, channel: Optional[str] = None) -> List[str]:
+        """Shards a channel is mapped to (empty: route by content)."""
+        if not channel:
+            return []
+        return [
+            name for name in self.channel_shards.get(channel, [])
+            if name in self.shards
+        ]
+        
+    def filters(
+        self,
+        channel: Optional[str] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> Dict[str, SearchFilter]:
+        """Filter per shard: the explicit one, else the channel's."""
+        if search_filter:
+            return {name: search_filter for name in self.shards}
+        if not channel:
+            return {}
+        return self.channel_filters.get(channel, {})
+        
+    def scope_key(
+        self,
+        channel: Optional[str] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> str:
+        """What a query's results depend on besides its text."""
+        filters = self.filters(channel, search_filter)
+        names = self.scope(channel) or sorted(filters)
+        return ",".join(
+            f"{name}[{filters[name].key}]" if name in filters else name
+            for name in names
+        )
+        
+    def route(
+        self,
+        query_embedding: np.ndarray,
+        channel: Optional[str] = None
+    ) -> List[str]:
+        """Pick the shards worth searching for a query."""
+        scoped = self.scope(channel)
+        if scoped:
+            return scoped
+        candidates = [
+            (name, shard.centroid) for name, shard in self.shards.items()
+            if shard.centroid is not None
+        ]
+        if not self.max_shards or len(candidates) <= self.max_shards:
+            return [name for name, _ in candidates]
+        
+        centroids = np.vstack([centroid for _, centroid in candidates])
+        scores = cosine_similarity(query_embedding, centroids)[0]
+        best = np.argsort(scores)[-self.max_shards:][::-1]
+        return [candidates[i][0] for i in best]
+        
+    def warm_up(self, query: str = "How do I get started?") -> float:
+        """Run one encode and one routed search ahead of real queries."""
+        start = time.perf_counter()
+        self.search(query, top_k=1)
+        return time.perf_counter() - start
+        
+    def embed(self, query: str) -> np.ndarray:
+        """Encode a query once for the FAQ lookup and the search."""
+        with STAGE_LATENCY.labels("query_embed").time():
+            return self.embedder.encode([query])
+        
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        channel: Optional[str] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        search_filter: Optional[SearchFilter] = None,
+        mmr_lambda: Optional[float] = None,
+        fetch_k: Optional[int] = None,
+        min_relative_score: float = 0.0
+    ) -> List[Dict]:
+        """Search the routed shards and merge their top-k by score.
+        
+        search_filter overrides the channel's subsystem filters. The
+        diversity options (see SimpleRAG.search) apply across shards.
+        """
+        if not self.chunk_count:
+            return []
+            
+        with tracer.start_span("rag.search", top_k=top_k) as span:
+            if query_embedding is None:
+                query_embedding = self.embed(query)
+            
+            with STAGE_LATENCY.labels("vector_search").time():
+                shards = self.route(query_embedding, channel)
+                filters = self.filters(channel, search_filter)
+                pool_size = max(top_k, fetch_k or top_k)
+                candidates = []
+                vectors = []
+                for name in shards:
+                    shard_results, shard_vectors = (
+                        self.shards[name].candidates(
+                            query_embedding, pool_size, filters.get(name)
+                        )
+                    )
+                    candidates.extend(shard_results)
+                    vectors.extend(shard_vectors)
+                if mmr_lambda is None and not min_relative_score:
+                    results = heapq.nlargest(
+                        top_k, candidates, key=lambda r: r["score"]
+                    )
+                else:
+                    best = heapq.nlargest(
+                        pool_size, range(len(candidates)),
+                        key=lambda i: candidates[i]["score"]
+                    )
+                    results = select(
+                        [candidates[i] for i in best],
+                        np.asarray([vectors[i] for i in best]),
+                        top_k, mmr_lambda, min_relative_score
+                    )
+                
+            if filters:
+                span.set_attribute("filter", self.scope_key(
+                    channel, search_filter
+                ))
+            span.set_attributes(
+                candidates=len(candidates),
+                shards_total=len(self.shards),
+                shards_searched=shards,
+                index_chunks=self.chunk_count,
+                chunks_retrieved=len(results),
+                scores=[round(r["score"], 4) for r in results],
+                sources=[r["metadata"]["source_path"] for r in results]
+            )
             
-        return "\n\n---\n\n".join(context_parts)
+        return results
+        
+    format_context = staticmethod(SimpleRAG.format_context)
+        
+    def _update_index_gauges(self) -> None:
+        """Index size and memory metrics summed over every shard."""
+        embedding_bytes = 0
+        text_bytes = 0
+        for shard in self.shards.values():
+            if shard.embeddings is not None:
+                embedding_bytes += shard.embeddings.nbytes
+            shard_text = getattr(shard.chunks, "nbytes", None)
+            if shard_text is None:
+                shard_text = sum(len(chunk) for chunk in shard.chunks)
+            text_bytes += shard_text
+        INDEX_CHUNKS.set(self.chunk_count)
+        INDEX_MEMORY_BYTES.set(embedding_bytes + text_bytes)
+
+
+def select(
+    results: List[Dict],
+    vectors: np.ndarray,
+    top_k: int,
+    mmr_lambda: Optional[float] = None,
+    min_relative_score: float = 0.0
+) -> List[Dict]:
+    """Pick up to top_k results, diverse and scoring close to the best.
+    
+    Results scoring below min_relative_score times the best are dropped
+    (adaptive k). With mmr_lambda, each pick maximises
+    lambda * score - (1 - lambda) * max similarity to earlier picks.
+    """
+    if not results:
+        return []
+    scores = np.array([result["score"] for result in results])
+    order = np.argsort(-scores, kind="stable")
+    keep = len(order)
+    if min_relative_score and scores[order[0]] > 0:
+        cutoff = scores[order[0]] * min_relative_score
+        keep = max(1, int(np.count_nonzero(scores >= cutoff)))
+    order = order[:keep]
+    if mmr_lambda is None or len(order) <= 1:
+        return [results[i] for i in order[:top_k]]
+    
+    scores = scores[order]
+    vectors = np.asarray(vectors, dtype=np.float32)[order]
+    vectors = vectors / np.maximum(
+        np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12
+    )
+    similarity = vectors @ vectors.T  # Candidate x candidate, once
+    # Highest similarity to any picked chunk (none yet, so scores rule)
+    redundancy = np.zeros(len(order))
+    available = np.ones(len(order), dtype=bool)
+    picked: List[int] = []
+    for _ in range(min(top_k, len(order))):
+        marginal = mmr_lambda * scores - (1 - mmr_lambda) * redundancy
+        marginal[~available] = -np.inf
+        best = int(np.argmax(marginal))
+        picked.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return [results[order[i]] for i in picked]
+
+
+_NO_VECTORS = np.zeros((0, 0), dtype=np.float32)
+
+
+# Exports of the same weights: their vectors are interchangeable
+_LOCAL_BACKENDS = ("sentence-transformers", "onnx")
+
+
+def _backend_family(backend: str) -> str:
+    return "local" if backend in _LOCAL_BACKENDS else backend
+
+
+def _centroid(embeddings: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Mean direction of a shard's (normalised) embeddings."""
+    if embeddings is None or not len(embeddings):
+        return None
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    centroid = (vectors / np.maximum(norms, 1e-12)).mean(axis=0)
+    return centroid / max(float(np.linalg.norm(centroid)), 1e-12)
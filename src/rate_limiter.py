@@ -0,0 +1,131 @@
+"""
+Rate limiting for GitTalker
+GCRA (generic cell rate algorithm) limiter: one timestamp per key, with an
+in-process LRU backend or a Redis backend shared by every replica
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .config import (
+    MAX_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_KEYS,
+    REDIS_URL
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryGCRABackend:
+    """Theoretical arrival times per key in a bounded LRU"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+
+    async def acquire(self, key: str, interval: float, tau: float) -> bool:
+        now = time.monotonic()
+        tat = max(self._tat.get(key, now), now)
+        if tat - now > tau:
+            return False
+
+        self._tat[key] = tat + interval
+        self._tat.move_to_end(key)
+        self._evict(now)
+        return True
+
+    def _evict(self, now: float) -> None:
+        """Drop idle keys (already back to a full bucket) and cap size"""
+        while self._tat:
+            oldest_key, oldest_tat = next(iter(self._tat.items()))
+            if oldest_tat > now and len(self._tat) <= self.max_keys:
+                break
+            del self._tat[oldest_key]
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+# Atomic GCRA step; uses the Redis clock so replicas agree on "now"
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tau = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+if tat - now > tau then return 0 end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil((new_tat - now) * 1000))
+return 1
+"""
+
+
+class RedisGCRABackend:
+    """GCRA state in Redis so all replicas enforce one limit"""
+
+    def __init__(self, url: str, prefix: str = "gittalker:ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+            ) from e
+        self.prefix = prefix
+        self.client = redis.from_url(url)
+        self._script = self.client.register_script(_GCRA_SCRIPT)
+
+    async def acquire(self, key: str, interval: float, tau: float) -> bool:
+        try:
+            allowed = await self._script(
+                keys=[self.prefix + key], args=[interval, tau]
+            )
+        except Exception as e:
+            # Fail open: a Redis outage shouldn't take the bot down
+            logger.warning("Rate limit backend unavailable: %s", e)
+            return True
+        return bool(allowed)
+
+
+class RateLimiter:
+    """Allow `per_minute` requests per key with bursts up to `burst`
+    (per_minute 0 disables the limit)"""
+
+    def __init__(
+        self,
+        per_minute: int = 60,
+        burst: Optional[int] = None,
+        backend=None
+    ):
+        if per_minute < 0:
+            raise ValueError("per_minute must be 0 (unlimited) or more")
+        self.enabled = per_minute > 0
+        self.interval = 60.0 / per_minute if self.enabled else 0.0
+        burst = burst or per_minute
+        self.tau = self.interval * (burst - 1) if self.enabled else 0.0
+        if backend is None:
+            backend = MemoryGCRABackend()
+        self.backend = backend
+
+    async def allow(self, key: str) -> bool:
+        """Consume one request for key; False if over the limit"""
+        if not self.enabled:
+            return True
+        return await self.backend.acquire(key, self.interval, self.tau)
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the limiter described by the environment configuration"""
+    if RATE_LIMIT_BACKEND == "redis":
+        backend = RedisGCRABackend(REDIS_URL)
+    else:
+        backend = MemoryGCRABackend(max_keys=RATE_LIMIT_MAX_KEYS)
+    return RateLimiter(
+        per_minute=MAX_REQUESTS_PER_MINUTE,
+        burst=RATE_LIMIT_BURST,
+        backend=backend
+    )
@@ -0,0 +1,151 @@
+"""
+LLM provider routing for GitTalker
+Short questions with a confident retrieval go to the fastest local provider
+(Ollama/vLLM); anything harder goes to a hosted one. Within each tier,
+providers are ordered by their recent median latency, and ones that miss
+the latency SLO or keep failing are tried last.
+"""
+
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SIMPLE = "simple"
+COMPLEX = "complex"
+
+# Wording that asks for reasoning rather than a lookup
+_COMPLEX_HINTS = re.compile(
+    r"\b(why|compare|comparison|difference|differences|versus|vs\.?|"
+    r"trade-?offs?|design|architecture|debug|troubleshoot|explain|"
+    r"step[- ]by[- ]step|migrate|migration)\b|```",
+    re.IGNORECASE
+)
+
+
+class ProviderStats:
+    """Rolling latency and error rate of one provider's recent calls"""
+
+    def __init__(self, window: int = 50, max_age: float = 600.0):
+        self.max_age = max_age
+        # (finished at, seconds, succeeded)
+        self.calls: Deque[Tuple[float, float, bool]] = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.calls.append((time.time(), seconds, ok))
+
+    def _recent(self) -> List[Tuple[float, float, bool]]:
+        cutoff = time.time() - self.max_age
+        return [call for call in self.calls if call[0] >= cutoff]
+
+    def summary(self) -> Dict[str, Any]:
+        calls = self._recent()
+        latencies = np.array([seconds for _, seconds, ok in calls if ok])
+        errors = sum(1 for _, _, ok in calls if not ok)
+        return {
+            "calls": len(calls),
+            "error_rate": errors / len(calls) if calls else 0.0,
+            "p50": float(np.percentile(latencies, 50))
+            if len(latencies) else None,
+            "p95": float(np.percentile(latencies, 95))
+            if len(latencies) else None
+        }
+
+
+class ModelRouter:
+    """Orders providers for a request by difficulty and live stats"""
+
+    def __init__(
+        self,
+        local_providers: List[str],
+        hosted_providers: List[str],
+        latency_slo: float = 10.0,
+        simple_max_words: int = 25,
+        min_score: float = 0.5,
+        max_error_rate: float = 0.3,
+        window: int = 50,
+        min_calls: int = 5
+    ):
+        self.local_providers = list(local_providers)
+        self.hosted_providers = list(hosted_providers)
+        self.latency_slo = latency_slo
+        self.simple_max_words = simple_max_words
+        self.min_score = min_score
+        self.max_error_rate = max_error_rate
+        self.min_calls = min_calls  # Below this, stats aren't trusted
+        self.stats: Dict[str, ProviderStats] = {
+            provider: ProviderStats(window)
+            for provider in self.local_providers + self.hosted_providers
+        }
+
+    def record(self, provider: str, seconds: float, ok: bool) -> None:
+        """Feed one finished call into the provider's rolling stats"""
+        stats = self.stats.get(provider)
+        if stats is not None:
+            stats.record(seconds, ok)
+
+    def classify(
+        self,
+        query: str,
+        retrieval_score: Optional[float] = None,
+        history_turns: int = 0
+    ) -> str:
+        """SIMPLE for short lookups the docs clearly cover, else COMPLEX"""
+        if retrieval_score is None or retrieval_score < self.min_score:
+            return COMPLEX
+        if history_turns or len(query.split()) > self.simple_max_words:
+            return COMPLEX
+        if query.count("?") > 1 or _COMPLEX_HINTS.search(query):
+            return COMPLEX
+        return SIMPLE
+
+    def order(
+        self, tier: str, unavailable: Optional[List[str]] = None
+    ) -> List[str]:
+        """Providers to try in turn: the tier's own, then the others
+
+        Unavailable ones (e.g. a local model that failed to load) are
+        still tried, but last: they may be back, and may be all there is.
+        """
+        unavailable = set(unavailable or [])
+        if tier == SIMPLE:
+            preferred, others = self.local_providers, self.hosted_providers
+        else:
+            preferred, others = self.hosted_providers, self.local_providers
+        ranked = preferred + others
+        return sorted(ranked, key=lambda provider: self._rank(
+            provider, provider in preferred, provider in unavailable,
+            ranked.index(provider)
+        ))
+
+    def _rank(
+        self, provider: str, preferred: bool, unavailable: bool,
+        position: int
+    ) -> Tuple[int, int, int, float, int]:
+        summary = self.stats[provider].summary()
+        trusted = summary["calls"] >= self.min_calls
+        # Failing or too slow: only once everything else has been tried
+        degraded = trusted and (
+            summary["error_rate"] > self.max_error_rate
+            or (summary["p95"] or 0.0) > self.latency_slo
+        )
+        # Unmeasured providers rank as if exactly at the SLO
+        p50 = summary["p50"]
+        if p50 is None:
+            p50 = self.latency_slo
+        return (
+            int(unavailable), int(degraded), int(not preferred), p50,
+            position
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Rolling stats per provider, for /models"""
+        return {
+            provider: {
+                **stats.summary(),
+                "local": provider in self.local_providers
+            }
+            for provider, stats in self.stats.items()
+        }
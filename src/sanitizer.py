@@ -0,0 +1,84 @@
+"""
+Input sanitising for GitTalker
+Precompiled patterns find injection attempts and out-of-scope keywords,
+returning one verdict that validation, sanitising and the scope check all
+share
+"""
+
+import html
+import re
+from functools import lru_cache
+from typing import Optional
+
+MAX_QUERY_CHARS = 2000
+MAX_CONTEXT_CHARS = 2000
+MIN_QUERY_CHARS = 3
+
+OUT_OF_SCOPE_KEYWORDS = (
+    "personal", "weather", "news", "politics", "general programming",
+    "unrelated", "off-topic", "what is", "who is", "when did",
+    "wikipedia", "google", "search", "find me", "tell me about life"
+)
+
+_DANGEROUS = r"<script.*?</script>|<script|javascript:|eval\s*\(|exec\s*\("
+
+# Separate scans: in one alternation a keyword could consume the start of
+# an injection ("googleval(") and hide it
+_DANGER = re.compile(_DANGEROUS, re.IGNORECASE | re.DOTALL)
+_SCOPE = re.compile(
+    "|".join(re.escape(k) for k in OUT_OF_SCOPE_KEYWORDS), re.IGNORECASE
+)
+
+
+class QueryVerdict:
+    """Result of scanning one user query"""
+
+    __slots__ = ("text", "is_valid", "dangerous", "out_of_scope_keyword")
+
+    def __init__(
+        self,
+        text: str,
+        is_valid: bool,
+        dangerous: bool,
+        out_of_scope_keyword: Optional[str]
+    ):
+        self.text = text  # Escaped, injection-free and length-limited
+        self.is_valid = is_valid
+        self.dangerous = dangerous
+        self.out_of_scope_keyword = out_of_scope_keyword
+
+
+_EMPTY = QueryVerdict("", False, False, None)
+
+
+def inspect_query(text: str) -> QueryVerdict:
+    """Validate, classify and sanitise a user query in one pass"""
+    if not text or not isinstance(text, str):
+        return _EMPTY
+    return _inspect(text)
+
+
+@lru_cache(maxsize=1024)
+def _inspect(text: str) -> QueryVerdict:
+    # The same query is checked on arrival and again before generation
+    kept = []
+    position = 0
+    dangerous = False
+    for match in _DANGER.finditer(text):
+        dangerous = True
+        kept.append(text[position:match.start()])
+        position = match.end()
+    kept.append(text[position:])
+    scope = _SCOPE.search(text)
+    keyword = scope.group().lower() if scope else None
+
+    sanitized = html.escape("".join(kept))[:MAX_QUERY_CHARS].strip()
+    is_valid = not dangerous and len(text.strip()) >= MIN_QUERY_CHARS
+    return QueryVerdict(sanitized, is_valid, dangerous, keyword)
+
+
+def clean_context(context: str) -> str:
+    """Bound retrieved documentation (trusted, so it isn't escaped)"""
+    if not context or not isinstance(context, str):
+        return ""
+    return context[:MAX_CONTEXT_CHARS].strip()
@@ -0,0 +1,143 @@
+"""
+Metadata filters for GitTalker search
+A SearchFilter narrows a search to a path prefix, file extensions, a repo
+or recently updated files. Each index keeps a MetadataIndex built once per
+swap (sorted path order for prefix row ranges, boolean masks per extension
+and repo, update times) so a filtered query only scores matching rows.
+"""
+
+import bisect
+from pathlib import PurePosixPath
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class SearchFilter:
+    """Which chunks a search may return (empty fields match everything)"""
+
+    def __init__(
+        self,
+        path_prefixes: Optional[List[str]] = None,
+        extensions: Optional[List[str]] = None,
+        repos: Optional[List[str]] = None,
+        updated_since: Optional[float] = None
+    ):
+        self.path_prefixes = list(path_prefixes or [])
+        self.extensions = [_extension(ext) for ext in extensions or []]
+        self.repos = list(repos or [])
+        self.updated_since = updated_since  # Unix time
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "SearchFilter":
+        """Parse {"paths": [...], "extensions": [...], "repos": [...],
+        "updated_since": ts} as used in DOC_SOURCES_FILE"""
+        data = data or {}
+        return cls(
+            path_prefixes=_as_list(data.get("paths")),
+            extensions=_as_list(data.get("extensions")),
+            repos=_as_list(data.get("repos")),
+            updated_since=data.get("updated_since")
+        )
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.path_prefixes or self.extensions or self.repos
+            or self.updated_since is not None
+        )
+
+    @property
+    def key(self) -> str:
+        """Stable description, used in cache and single-flight keys"""
+        parts = [
+            f"path={'+'.join(sorted(self.path_prefixes))}",
+            f"ext={'+'.join(sorted(self.extensions))}",
+            f"repo={'+'.join(sorted(self.repos))}",
+        ]
+        if self.updated_since is not None:
+            parts.append(f"since={int(self.updated_since)}")
+        return ";".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "paths": self.path_prefixes,
+            "extensions": self.extensions,
+            "repos": self.repos,
+            "updated_since": self.updated_since
+        }
+
+
+class MetadataIndex:
+    """Precomputed row lookups over one index's chunk metadata"""
+
+    def __init__(self, metadata: List[Dict]):
+        self.size = len(metadata)
+        paths = [item.get("source_path", "") for item in metadata]
+        # Rows in path order: a prefix is one contiguous slice of them
+        self._order = np.argsort(
+            np.asarray(paths, dtype=object), kind="stable"
+        )
+        self._sorted_paths = [paths[i] for i in self._order]
+        self._extensions = _masks(
+            [_extension(PurePosixPath(path).suffix) for path in paths]
+        )
+        self._repos = _masks([item.get("repo") or "" for item in metadata])
+        self._updated_at = np.asarray(
+            [item.get("updated_at") or 0.0 for item in metadata],
+            dtype=np.float64
+        )
+
+    def rows(self, search_filter: SearchFilter) -> Optional[np.ndarray]:
+        """Sorted matching row numbers, or None when nothing is filtered"""
+        if not search_filter:
+            return None
+        mask = np.ones(self.size, dtype=bool)
+        if search_filter.path_prefixes:
+            mask &= self._prefix_mask(search_filter.path_prefixes)
+        if search_filter.extensions:
+            mask &= self._any(self._extensions, search_filter.extensions)
+        if search_filter.repos:
+            mask &= self._any(self._repos, search_filter.repos)
+        if search_filter.updated_since is not None:
+            mask &= self._updated_at >= search_filter.updated_since
+        return np.flatnonzero(mask)
+
+    def _prefix_mask(self, prefixes: List[str]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        for prefix in prefixes:
+            start = bisect.bisect_left(self._sorted_paths, prefix)
+            # Every path with the prefix sorts before prefix + U+10FFFF
+            end = bisect.bisect_left(
+                self._sorted_paths, prefix + "\U0010ffff"
+            )
+            mask[self._order[start:end]] = True
+        return mask
+
+    def _any(
+        self, masks: Dict[str, np.ndarray], values: List[str]
+    ) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        for value in values:
+            if value in masks:
+                mask |= masks[value]
+        return mask
+
+
+def _masks(values: List[str]) -> Dict[str, np.ndarray]:
+    """value -> boolean row mask, one per distinct value"""
+    if not values:
+        return {}
+    labels, codes = np.unique(np.asarray(values, dtype=object),
+                              return_inverse=True)
+    return {label: codes == i for i, label in enumerate(labels)}
+
+
+def _extension(ext: str) -> str:
+    ext = ext.lower()
+    return ext if not ext or ext.startswith(".") else f".{ext}"
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
@@ -0,0 +1,189 @@
+"""
+Outbound Slack messaging for GitTalker
+Async Web API client on a shared connection pool, with per-channel queues
+paced to Slack's rate limits and Retry-After handling
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+import aiohttp
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from .metrics import SLACK_RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+
+class _Outgoing:
+    """One queued Web API call and the future its caller awaits"""
+
+    def __init__(self, method: str, kwargs: Dict[str, Any]):
+        self.method = method
+        self.kwargs = kwargs
+        self.future: "asyncio.Future" = (
+            asyncio.get_running_loop().create_future()
+        )
+
+
+class _Outbox:
+    """Pending calls for one channel, drained by a single task"""
+
+    def __init__(self):
+        self.pending: Deque[_Outgoing] = deque()
+        self.task: Optional[asyncio.Task] = None
+
+
+class SlackPoster:
+    """Rate-limit-aware poster shared by every Slack handler"""
+
+    def __init__(
+        self,
+        token: Optional[str],
+        base_url: str = "https://slack.com/api/",
+        max_connections: int = 20,
+        channel_interval: float = 1.0,
+        max_retries: int = 3
+    ):
+        self.token = token
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.channel_interval = channel_interval
+        self.max_retries = max_retries
+        self.client: Optional[AsyncWebClient] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._outboxes: Dict[str, _Outbox] = {}
+        # Last send per channel, oldest first; outlives the channel's outbox
+        # so posts arriving one by one are spaced too
+        self._last_sent: "OrderedDict[str, float]" = OrderedDict()
+        self._blocked_until: Dict[str, float] = {}  # Per-method 429 backoff
+
+    async def start(self) -> None:
+        """Open the pooled HTTP session (needs a running loop)"""
+        if self.client is not None:
+            return
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        self._session = aiohttp.ClientSession(connector=connector)
+        self.client = AsyncWebClient(
+            token=self.token, base_url=self.base_url, session=self._session
+        )
+
+    async def close(self) -> None:
+        """Wait for queued messages, then release the connection pool"""
+        tasks = [
+            outbox.task for outbox in self._outboxes.values() if outbox.task
+        ]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self.client = None
+
+    async def post_message(self, channel: str, text: str, **kwargs) -> Any:
+        """Queue chat.postMessage for a channel and wait for the result"""
+        return await self._enqueue(
+            channel,
+            _Outgoing("chat_postMessage", {
+                "channel": channel, "text": text, **kwargs
+            })
+        )
+
+    async def _enqueue(self, channel: str, outgoing: _Outgoing) -> Any:
+        if self.client is None:
+            await self.start()
+        outbox = self._outboxes.get(channel)
+        if outbox is None:
+            outbox = self._outboxes[channel] = _Outbox()
+        outbox.pending.append(outgoing)
+        if outbox.task is None:
+            outbox.task = asyncio.create_task(self._drain(channel, outbox))
+        return await asyncio.shield(outgoing.future)
+
+    async def _drain(self, channel: str, outbox: _Outbox) -> None:
+        """Send a channel's calls in order, spaced by channel_interval"""
+        outgoing = None
+        try:
+            while outbox.pending:
+                outgoing = outbox.pending.popleft()
+                wait = (
+                    self._last_sent.get(channel, 0.0)
+                    + self.channel_interval - time.monotonic()
+                )
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                try:
+                    result = await self._call(
+                        outgoing.method, outgoing.kwargs
+                    )
+                except Exception as e:
+                    outgoing.future.set_exception(e)
+                    outgoing.future.exception()  # Caller may have gone away
+                else:
+                    outgoing.future.set_result(result)
+                outgoing = None
+                self._mark_sent(channel)
+        except asyncio.CancelledError:
+            # Shutting down: fail whatever is still queued so no caller
+            # waits forever
+            unsent = [outgoing] if outgoing is not None else []
+            unsent += outbox.pending
+            outbox.pending.clear()
+            for item in unsent:
+                if not item.future.done():
+                    item.future.cancel()
+            raise
+        finally:
+            # Idle channels don't keep a task or queue around
+            outbox.task = None
+            if self._outboxes.get(channel) is outbox:
+                del self._outboxes[channel]
+
+    def _mark_sent(self, channel: str) -> None:
+        now = time.monotonic()
+        self._last_sent[channel] = now
+        self._last_sent.move_to_end(channel)
+        # Sends older than the interval no longer delay anything
+        while self._last_sent:
+            oldest = next(iter(self._last_sent.values()))
+            if now - oldest < self.channel_interval:
+                break
+            self._last_sent.popitem(last=False)
+
+    async def _call(self, method: str, kwargs: Dict[str, Any]) -> Any:
+        """Call a Web API method, honouring Retry-After on 429s"""
+        attempt = 0
+        while True:
+            blocked = self._blocked_until.get(method, 0) - time.monotonic()
+            if blocked > 0:
+                await asyncio.sleep(blocked)
+            try:
+                return await getattr(self.client, method)(**kwargs)
+            except SlackApiError as e:
+                if (e.response.status_code != 429
+                        or attempt >= self.max_retries):
+                    raise
+                retry_after = _retry_after(e.response.headers)
+                SLACK_RATE_LIMITED.labels(method).inc()
+                logger.warning(
+                    "Slack rate limited %s, retrying in %.1fs",
+                    method, retry_after
+                )
+                # Rate limits are per method, so pause every channel
+                self._blocked_until[method] = time.monotonic() + retry_after
+                attempt += 1
+
+
+def _retry_after(headers: Any) -> float:
+    """Read Retry-After (seconds) from response headers, default 1s"""
+    for key, value in (headers or {}).items():
+        if key.lower() == "retry-after":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                break
+    return 1.0
@@ -0,0 +1,126 @@
+"""
+Documentation source registry for GitTalker
+Each source (a repository, a ref and the path prefixes holding its docs) is
+fetched into its own index shard. Sources come from DOC_SOURCES_FILE, or a
+single source built from GITHUB_REPO, GITHUB_DOCS_REF and GITHUB_DOCS_PATH.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from .search_filter import SearchFilter
+from .config import (
+    DOC_SOURCES_FILE,
+    GITHUB_DOCS_PATH,
+    GITHUB_DOCS_REF,
+    GITHUB_REPO
+)
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class DocSource:
+    """One repository's documentation, indexed as one shard"""
+
+    def __init__(
+        self,
+        repo: Optional[str],
+        ref: str = "main",
+        paths: Optional[List[str]] = None,
+        name: Optional[str] = None,
+        channels: Optional[List[str]] = None,
+        subsystems: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        self.repo = repo
+        self.ref = ref
+        self.paths = list(paths or [""])  # "" means the whole repo
+        # The shard name doubles as its index directory
+        default_name = repo.split("/")[-1] if repo else "default"
+        self.name = _UNSAFE_NAME.sub("-", name or default_name)
+        self.channels = list(channels or [])  # Slack channels it serves
+        # Slack channel -> SearchFilter narrowing this shard for it
+        self.subsystems = {
+            channel: SearchFilter.from_dict(spec)
+            for channel, spec in (subsystems or {}).items()
+        }
+        for channel in self.subsystems:
+            if channel not in self.channels:
+                self.channels.append(channel)
+
+    def matches(self, path: str) -> bool:
+        """Whether a repository path is under one of the docs prefixes"""
+        return any(path.startswith(prefix) for prefix in self.paths)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "repo": self.repo,
+            "ref": self.ref,
+            "paths": self.paths,
+            "channels": self.channels,
+            "subsystems": {
+                channel: search_filter.to_dict()
+                for channel, search_filter in self.subsystems.items()
+            }
+        }
+
+
+def load_sources(path: Optional[str] = DOC_SOURCES_FILE) -> List[DocSource]:
+    """The configured sources, validated for unique shard names
+
+    DOC_SOURCES_FILE is a JSON list such as
+    [{"repo": "org/api", "ref": "main", "paths": ["docs/"],
+      "channels": ["C0123ABCD"],
+      "subsystems": {"C0456EFGH": {"paths": ["docs/deploy/"],
+                                   "extensions": [".md"]}}}]
+    """
+    if not path:
+        return [DocSource(GITHUB_REPO, GITHUB_DOCS_REF, [GITHUB_DOCS_PATH])]
+
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must contain a non-empty list of sources")
+
+    sources = []
+    for entry in entries:
+        if not entry.get("repo"):
+            raise ValueError(f"Source without a repo in {path}: {entry}")
+        sources.append(DocSource(
+            entry["repo"],
+            ref=entry.get("ref", "main"),
+            paths=entry.get("paths"),
+            name=entry.get("name"),
+            channels=entry.get("channels"),
+            subsystems=entry.get("subsystems")
+        ))
+
+    names = [source.name for source in sources]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(
+            f"Duplicate source names in {path}: {', '.join(duplicates)}; "
+            "set a unique \"name\" for each"
+        )
+    return sources
+
+
+def channel_shards(sources: List[DocSource]) -> Dict[str, List[str]]:
+    """Slack channel -> names of the shards that channel asks about"""
+    mapping: Dict[str, List[str]] = {}
+    for source in sources:
+        for channel in source.channels:
+            mapping.setdefault(channel, []).append(source.name)
+    return mapping
+
+
+def channel_filters(
+    sources: List[DocSource]
+) -> Dict[str, Dict[str, SearchFilter]]:
+    """Slack channel -> shard name -> filter for subsystem channels"""
+    mapping: Dict[str, Dict[str, SearchFilter]] = {}
+    for source in sources:
+        for channel, search_filter in source.subsystems.items():
+            mapping.setdefault(channel, {})[source.name] = search_filter
+    return mapping
@@ -0,0 +1,270 @@
+"""
+Per-request tracing for GitTalker
+Lightweight spans propagated with contextvars and exported as JSON lines
+or OTLP/HTTP JSON to a collector
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from .config import (
+    TRACE_EXPORTER,
+    TRACE_FILE,
+    TRACE_FILE_MAX_BYTES,
+    TRACE_OTLP_ENDPOINT
+)
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar(
+    "gittalker_current_span", default=None
+)
+
+
+class Span:
+    """A single timed stage of a request"""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.status = "ok"
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span"""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Attach several attributes to the span"""
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        """Stop the span clock"""
+        self.end_time = time.time()
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat representation used by the JSONL exporter"""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class JsonlSpanExporter:
+    """Append finished spans to a local JSON lines file from a background
+    thread"""
+
+    def __init__(self, path: str, max_bytes: int, batch_size: int = 256):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._worker = threading.Thread(
+            target=self._run, name="jsonl-exporter", daemon=True
+        )
+        self._worker.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass  # Drop spans rather than block the event loop
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = "".join(
+                json.dumps(span.to_dict(), default=str) + "\n"
+                for span in batch
+            )
+            try:
+                self._rotate_if_needed()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+            except OSError as e:
+                # Tracing must never break request handling
+                logger.debug("Trace export failed: %s", e)
+
+    def _rotate_if_needed(self) -> None:
+        """Keep one previous file so traces can't fill the disk"""
+        if self.path.exists() and self.path.stat().st_size > self.max_bytes:
+            os.replace(self.path, self.path.with_suffix(".jsonl.1"))
+
+
+class OtlpSpanExporter:
+    """Ship spans to an OTLP/HTTP JSON collector from a background thread"""
+
+    def __init__(self, endpoint: str, batch_size: int = 64):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._worker = threading.Thread(
+            target=self._run, name="otlp-exporter", daemon=True
+        )
+        self._worker.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass  # Drop spans rather than block the event loop
+
+    def _run(self) -> None:
+        with httpx.Client(timeout=5.0) as client:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    client.post(self.endpoint, json=self._encode(batch))
+                except httpx.HTTPError as e:
+                    logger.debug("Trace export failed: %s", e)
+
+    def _encode(self, spans: List[Span]) -> Dict[str, Any]:
+        """Encode spans in the OTLP JSON wire format"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    _otlp_attribute("service.name", "gittalker")
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "gittalker"},
+                    "spans": [_otlp_span(span) for span in spans]
+                }]
+            }]
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return {"key": key, "value": {"stringValue": value}}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(int(span.start_time * 1e9)),
+        "endTimeUnixNano": str(int((span.end_time or span.start_time) * 1e9)),
+        "attributes": [
+            _otlp_attribute(key, value)
+            for key, value in span.attributes.items()
+        ],
+        "status": {"code": 2 if span.status == "error" else 1}
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the configured exporter"""
+
+    def __init__(self, exporter: Optional[Any] = None):
+        self.exporter = exporter
+
+    @staticmethod
+    def new_request_id() -> str:
+        """Generate a request id, also used as the trace id"""
+        return uuid.uuid4().hex
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        request_id: Optional[str] = None,
+        **attributes: Any
+    ) -> Iterator[Span]:
+        """Open a child of the current span (or a new trace root)"""
+        parent = _current_span.get()
+        if request_id is None:
+            request_id = parent.trace_id if parent else self.new_request_id()
+        same_trace = parent is not None and parent.trace_id == request_id
+        span = Span(
+            name,
+            trace_id=request_id,
+            parent_id=parent.span_id if same_trace else None,
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error", repr(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            if self.exporter is not None:
+                self.exporter.export(span)
+
+
+def current_span() -> Optional[Span]:
+    """The active span in this context, if any"""
+    return _current_span.get()
+
+
+def current_request_id() -> Optional[str]:
+    """The request id of the active trace, if any"""
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def _create_exporter() -> Optional[Any]:
+    if TRACE_EXPORTER == "jsonl":
+        return JsonlSpanExporter(TRACE_FILE, TRACE_FILE_MAX_BYTES)
+    if TRACE_EXPORTER == "otlp":
+        return OtlpSpanExporter(TRACE_OTLP_ENDPOINT)
+    return None
+
+
+tracer = Tracer(_create_exporter())
@@ -0,0 +1,210 @@
+"""
+LLM usage and cost accounting for GitTalker
+Every provider call is recorded with its tokens, latency and estimated cost,
+per provider, model, Slack user and channel. Rolling budgets (a global one
+and one per channel) tell the query path when to degrade: first to a
+shorter prompt on a cheaper model, then to precomputed answers only.
+"""
+
+import contextvars
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import LLM_COST
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+TIGHT = "tight"  # Near the budget: shorter context, cheaper model
+EXHAUSTED = "exhausted"  # Over it: precomputed answers only
+
+# USD per million (prompt, cached prompt, completion) tokens; local models
+# are free. LLM_PRICES adds or overrides entries.
+DEFAULT_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "claude-3-5-sonnet-20241022": (3.00, 0.30, 15.00),
+    "claude-3-5-haiku-20241022": (0.80, 0.08, 4.00),
+}
+
+# (user, channel) the current query is answered for
+_requester = contextvars.ContextVar(
+    "gittalker_requester", default=("-", "-")
+)
+
+
+def set_requester(user: Optional[str], channel: Optional[str]) -> None:
+    """Attribute LLM calls in this context to a Slack user and channel"""
+    _requester.set((user or "-", channel or "-"))
+
+
+def load_prices(overrides: Optional[str] = None) -> Dict[str, Tuple]:
+    """DEFAULT_PRICES plus a JSON {"model": [prompt, cached, completion]}"""
+    prices = dict(DEFAULT_PRICES)
+    if overrides:
+        for model, price in json.loads(overrides).items():
+            prices[model] = tuple(float(value) for value in price)
+    return prices
+
+
+class UsageLedger:
+    """Token, latency and cost totals plus rolling per-channel budgets"""
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, Tuple]] = None,
+        daily_budget: float = 0.0,
+        channel_daily_budget: float = 0.0,
+        window: float = 86400.0,
+        soft_limit: float = 0.8,
+        local_providers: Tuple[str, ...] = ("ollama", "vllm")
+    ):
+        self.prices = prices if prices is not None else dict(DEFAULT_PRICES)
+        self.daily_budget = daily_budget  # USD per window, 0: unlimited
+        self.channel_daily_budget = channel_daily_budget
+        self.window = window
+        self.soft_limit = soft_limit
+        self.local_providers = local_providers
+        self.started_at = time.time()
+        # dimension -> key -> totals since start
+        self.totals: Dict[str, Dict[str, Dict[str, float]]] = {
+            dimension: defaultdict(_empty_totals)
+            for dimension in ("provider", "model", "user", "channel")
+        }
+        # Cost per hour bucket, for the rolling budgets
+        self._spend: Dict[int, float] = defaultdict(float)
+        self._channel_spend: Dict[str, Dict[int, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._last_bucket = self._bucket()
+        self._unpriced = set()
+
+    def cost(self, provider: str, model: str, usage: Dict[str, int]) -> float:
+        """Estimated USD cost of one call"""
+        if provider in self.local_providers:
+            return 0.0
+        price = self.prices.get(model)
+        if price is None:
+            if model not in self._unpriced:
+                self._unpriced.add(model)
+                logger.warning("No price for %s; add it to LLM_PRICES", model)
+            return 0.0
+        prompt_price, cached_price, completion_price = price
+        uncached = usage["prompt_tokens"] - usage["cached_tokens"]
+        return (
+            uncached * prompt_price
+            + usage["cached_tokens"] * cached_price
+            + usage["completion_tokens"] * completion_price
+        ) / 1_000_000
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        usage: Dict[str, int],
+        seconds: float
+    ) -> float:
+        """Add one finished call (token_usage() counts) to the ledger"""
+        user, channel = _requester.get()
+        cost = self.cost(provider, model, usage)
+        for dimension, key in (
+            ("provider", provider), ("model", model),
+            ("user", user), ("channel", channel)
+        ):
+            totals = self.totals[dimension][key]
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["cost_usd"] += cost
+            for kind in ("prompt_tokens", "cached_tokens",
+                         "completion_tokens"):
+                totals[kind] += usage[kind]
+        LLM_COST.labels(provider, model).inc(cost)
+
+        bucket = self._bucket()
+        if bucket != self._last_bucket:
+            self._prune(bucket)
+        self._spend[bucket] += cost
+        self._channel_spend[channel][bucket] += cost
+        return cost
+
+    def spent(self, channel: Optional[str] = None) -> float:
+        """USD spent in the rolling window (by one channel if given)"""
+        spend = (
+            self._spend if channel is None
+            else self._channel_spend.get(channel, {})
+        )
+        oldest = self._bucket() - self._window_buckets() + 1
+        return sum(
+            cost for bucket, cost in spend.items() if bucket >= oldest
+        )
+
+    def budget_level(self, channel: Optional[str] = None) -> str:
+        """OK, TIGHT or EXHAUSTED for a query from this channel"""
+        ratios = []
+        if self.daily_budget > 0:
+            ratios.append(self.spent() / self.daily_budget)
+        if channel and self.channel_daily_budget > 0:
+            ratios.append(self.spent(channel) / self.channel_daily_budget)
+        ratio = max(ratios, default=0.0)
+        if ratio >= 1.0:
+            return EXHAUSTED
+        if ratio >= self.soft_limit:
+            return TIGHT
+        return OK
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        """Totals and budget state, for /usage"""
+        report: Dict[str, Any] = {
+            "since": self.started_at,
+            "window_seconds": self.window,
+            "budget": {
+                "limit_usd": self.daily_budget or None,
+                "spent_usd": round(self.spent(), 6),
+                "level": self.budget_level()
+            },
+            "channel_budget_usd": self.channel_daily_budget or None
+        }
+        for dimension, totals in self.totals.items():
+            ranked = sorted(
+                totals.items(), key=lambda item: -item[1]["cost_usd"]
+            )[:top]
+            report[dimension] = {key: _rounded(item) for key, item in ranked}
+        for channel, totals in report["channel"].items():
+            totals["window_spent_usd"] = round(self.spent(channel), 6)
+            totals["budget_level"] = self.budget_level(channel)
+        return report
+
+    def _bucket(self) -> int:
+        return int(time.time() // 3600)
+
+    def _window_buckets(self) -> int:
+        return max(1, int(round(self.window / 3600)))
+
+    def _prune(self, bucket: int) -> None:
+        """Drop hour buckets that have left the window (once an hour)"""
+        self._last_bucket = bucket
+        oldest = bucket - self._window_buckets() + 1
+        for spend in (self._spend, *self._channel_spend.values()):
+            for old in [b for b in spend if b < oldest]:
+                del spend[old]
+        for channel in [c for c, s in self._channel_spend.items() if not s]:
+            del self._channel_spend[channel]
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {
+        "calls": 0, "prompt_tokens": 0, "cached_tokens": 0,
+        "completion_tokens": 0, "seconds": 0.0, "cost_usd": 0.0
+    }
+
+
+def _rounded(totals: Dict[str, float]) -> Dict[str, float]:
+    return {
+        **totals,
+        "seconds": round(totals["seconds"], 3),
+        "cost_usd": round(totals["cost_usd"], 6)
+    }
@@ -0,0 +1,106 @@
+"""
+Tests for GitTalker conversation memory
+"""
+import pytest
+
+from src import conversation
+from src.conversation import (
+    ConversationStore, estimate_tokens, is_follow_up, rewrite_query
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(conversation.time, "monotonic", lambda: now[0])
+    return now
+
+
+ANSWER = "It is in the docs. See the setup guide for every detail needed."
+
+
+def test_turns_are_kept_verbatim_under_budget(clock):
+    store = ConversationStore(token_budget=1000)
+    store.add_turn("t", "How do I build?", "Run make.")
+    assert store.history("t") == [
+        {"role": "user", "content": "How do I build?"},
+        {"role": "assistant", "content": "Run make."},
+    ]
+    assert store.history("unknown") == []
+
+
+def test_old_turns_fold_into_a_summary_in_the_first_user_turn(clock):
+    turn_tokens = estimate_tokens("Question 0?") + estimate_tokens(ANSWER)
+    store = ConversationStore(token_budget=2 * turn_tokens)
+    for i in range(4):
+        store.add_turn("t", f"Question {i}?", ANSWER)
+
+    history = store.history("t")
+    assert [m["role"] for m in history] == [
+        "user", "assistant", "user", "assistant"
+    ]
+    # The summary is capped at the budget in characters, so only the
+    # latest folded turn survives here
+    assert history[0]["content"] == (
+        "Earlier in this thread:\n"
+        "Q: Question 1? A: It is in the docs.\n\n"
+        "Question 2?"
+    )
+    assert history[2]["content"] == "Question 3?"
+    # Only the persona may be a system message
+    assert all(m["role"] != "system" for m in history)
+
+
+def test_latest_turn_is_kept_even_over_budget(clock):
+    store = ConversationStore(token_budget=5)
+    store.add_turn("t", "A long question about the build?", ANSWER)
+    store.add_turn("t", "Another long question?", ANSWER)
+    history = store.history("t")
+    assert len(history) == 2
+    assert history[0]["content"].endswith("Another long question?")
+
+
+def test_summary_is_capped_dropping_the_oldest_notes(clock):
+    store = ConversationStore(token_budget=60)
+    for i in range(20):
+        store.add_turn("t", f"Question {i}?", ANSWER)
+    summary = store.get("t").summary
+    assert len(summary) <= 60
+    assert "Question 0?" not in summary
+    # Turns 17-19 fit the budget verbatim; 16 is the latest folded
+    assert "Question 16?" in summary
+
+
+def test_least_recent_thread_is_evicted(clock):
+    store = ConversationStore(max_threads=2)
+    store.add_turn("a", "Question?", ANSWER)
+    store.add_turn("b", "Question?", ANSWER)
+    store.add_turn("a", "Follow-up?", ANSWER)  # a is now the newest
+    store.add_turn("c", "Question?", ANSWER)
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert len(store) == 2
+
+
+def test_idle_threads_expire(clock):
+    store = ConversationStore(ttl_seconds=60)
+    store.add_turn("a", "Question?", ANSWER)
+    clock[0] += 30
+    store.add_turn("b", "Question?", ANSWER)
+    clock[0] += 31
+    assert store.get("a") is None
+    assert store.get("b") is not None
+
+
+def test_follow_ups_are_rewritten_with_the_topic():
+    assert is_follow_up("and for Docker?")
+    assert not is_follow_up(
+        "How do I configure the deployment pipeline for staging servers?"
+    )
+    assert rewrite_query("and for Docker?", "How do I deploy?") == (
+        "How do I deploy? and for Docker?", "How do I deploy?"
+    )
+    question = "How do I configure logging for production deployments?"
+    assert rewrite_query(question, "How do I deploy?") == (
+        question, question
+    )
@@ -0,0 +1,107 @@
+"""
+Tests for GitTalker duplicate suppression
+"""
+import asyncio
+
+import pytest
+
+from src import dedupe
+from src.dedupe import RecentKeys, SingleFlight, normalize_query
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(dedupe.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_normalize_query_ignores_case_punctuation_and_spacing():
+    assert normalize_query("  How do I   BUILD it?! ") == "how do i build it"
+
+
+def test_recent_keys_remembers_within_window(clock):
+    recent = RecentKeys(window_seconds=60)
+    assert not recent.seen("event-1")
+    assert recent.seen("event-1")
+    clock[0] += 59
+    assert recent.seen("event-1")
+
+
+def test_recent_keys_forgets_after_window(clock):
+    recent = RecentKeys(window_seconds=60)
+    recent.seen("event-1")
+    clock[0] += 60
+    assert not recent.seen("event-1")
+    assert len(recent) == 1
+
+
+def test_recent_keys_caps_entries(clock):
+    recent = RecentKeys(window_seconds=60, max_keys=2)
+    for key in ("a", "b", "c"):
+        recent.seen(key)
+    assert len(recent) == 2
+    assert not recent.seen("a")  # Oldest was evicted
+
+
+def test_single_flight_shares_one_call():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            *(flight.do("question", work) for _ in range(5))
+        )
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert not flight.is_inflight("question")
+
+
+def test_single_flight_shares_errors_and_then_retries():
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("q", fail), flight.do("q", fail),
+            return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(calls) == 1
+        # Nothing is cached: the next call runs again
+        with pytest.raises(RuntimeError):
+            await flight.do("q", fail)
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_single_flight_waiter_cancel_leaves_others_running():
+    async def work():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def main():
+        flight = SingleFlight()
+        first = asyncio.create_task(flight.do("q", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("q", work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        assert await first == "answer"
+        assert waiter.cancelled()
+
+    asyncio.run(main())
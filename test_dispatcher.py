@@ -0,0 +1,105 @@
+"""
+Tests for GitTalker's bounded event dispatcher
+"""
+import asyncio
+
+from src.dispatcher import EventDispatcher
+
+
+def recorder(log, name, started=None, release=None):
+    async def job():
+        if started is not None:
+            started.set()
+        if release is not None:
+            await release.wait()
+        log.append(name)
+    return job
+
+
+def test_channels_take_turns():
+    async def main():
+        log = []
+        dispatcher = EventDispatcher(concurrency=1)
+        # Queued before the worker starts, so the order is the policy's
+        for i in range(3):
+            dispatcher.submit("busy", recorder(log, f"busy-{i}"))
+        dispatcher.submit("quiet", recorder(log, "quiet-0"))
+        dispatcher.submit("other", recorder(log, "other-0"))
+        dispatcher.start()
+        while len(log) < 5:
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+        return log
+
+    assert asyncio.run(main()) == [
+        "busy-0", "quiet-0", "other-0", "busy-1", "busy-2"
+    ]
+
+
+def test_sheds_at_channel_and_total_capacity():
+    async def main():
+        dispatcher = EventDispatcher(
+            concurrency=1, max_queue_depth=3, max_per_channel=2
+        )
+        log = []
+        accepted = [
+            dispatcher.submit("a", recorder(log, "a")) for _ in range(3)
+        ]
+        assert accepted == [True, True, False]
+        assert dispatcher.submit("b", recorder(log, "b"))
+        assert not dispatcher.submit("c", recorder(log, "c"))
+        assert dispatcher.queue_depth == 3
+
+        dispatcher.start()
+        while dispatcher.queue_depth:
+            await asyncio.sleep(0.01)
+        # Capacity frees up as jobs are taken
+        assert dispatcher.submit("c", recorder(log, "c"))
+        await dispatcher.stop()
+
+    asyncio.run(main())
+
+
+def test_failed_job_does_not_stop_the_worker():
+    async def main():
+        log = []
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        dispatcher = EventDispatcher(concurrency=1)
+        dispatcher.start()
+        dispatcher.submit("a", fail)
+        dispatcher.submit("a", recorder(log, "after"))
+        while not log:
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+        return log
+
+    assert asyncio.run(main()) == ["after"]
+
+
+def test_stop_cancels_running_workers():
+    async def main():
+        log = []
+        started = asyncio.Event()
+        never = asyncio.Event()
+        dispatcher = EventDispatcher(concurrency=2)
+        dispatcher.start()
+        workers = list(dispatcher._workers)
+        dispatcher.submit("a", recorder(log, "slow", started, never))
+        await started.wait()
+        await dispatcher.stop()
+        assert all(worker.done() for worker in workers)
+        assert dispatcher._workers == []
+        assert log == []
+
+        # A stopped dispatcher can be started again
+        dispatcher.start()
+        dispatcher.submit("a", recorder(log, "again"))
+        while not log:
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+        return log
+
+    assert asyncio.run(main()) == ["again"]
@@ -0,0 +1,175 @@
+"""
+Tests for GitTalker's SQLite docs cache and conditional GitHub syncs
+"""
+import asyncio
+import base64
+import sqlite3
+
+import httpx
+import pytest
+
+from src import github_fetcher
+from src.docs_store import DocsStore
+from src.github_fetcher import GitHubDocsFetcher
+from src.sources import DocSource
+
+
+def doc(path, content="text"):
+    return {"path": path, "url": f"https://x/{path}", "repo": "org/app",
+            "content": content}
+
+
+def test_docs_round_trip(tmp_path):
+    store = DocsStore(str(tmp_path / "docs.sqlite3"))
+    store.upsert("app", doc("b.md", "bee ü"), sha="2")
+    store.upsert("app", doc("a.md"), sha="1")
+    store.upsert("other", doc("c.md"))
+
+    docs = list(store.iter_docs("app"))
+    assert [d["path"] for d in docs] == ["a.md", "b.md"]
+    assert docs[1]["content"] == "bee ü"
+    assert docs[1]["url"] == "https://x/b.md"
+    assert docs[1]["repo"] == "org/app"
+    assert docs[1]["fetched_at"] > 0
+    assert store.shas("app") == {"a.md": "1", "b.md": "2"}
+
+    store.upsert("app", doc("a.md", "new"), sha="3")
+    assert store.count("app") == 2
+    assert store.delete("app", ["b.md"]) == 1
+    assert [d["content"] for d in store.iter_docs("app")] == ["new"]
+    assert store.count("other") == 1
+
+    assert store.synced_at("app") is None
+    store.mark_synced("app")
+    assert store.synced_at("app") > 0
+
+
+def test_etags_are_stored_per_source(tmp_path):
+    store = DocsStore(str(tmp_path / "docs.sqlite3"))
+    assert store.etag("app") is None
+    store.set_etag("app", '"abc"')
+    assert store.etag("app") == '"abc"'
+    assert store.etag("other") is None
+    store.set_etag("app", None)
+    assert store.etag("app") is None
+
+
+def test_reads_while_another_connection_writes(tmp_path):
+    path = tmp_path / "docs.sqlite3"
+    store = DocsStore(str(path))
+    store.upsert("app", doc("a.md", "committed"))
+
+    writer = sqlite3.connect(path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute(
+        "UPDATE docs SET content = 'pending' WHERE path = 'a.md'"
+    )
+    writer.execute(
+        "INSERT INTO docs (source, path, url, content, fetched_at) "
+        "VALUES ('app', 'b.md', 'u', 'pending', 0)"
+    )
+    try:
+        # WAL: readers neither block nor see the open transaction
+        assert [d["content"] for d in store.iter_docs("app")] == [
+            "committed"
+        ]
+        assert store.count("app") == 1
+    finally:
+        writer.commit()
+        writer.close()
+    assert store.count("app") == 2
+
+
+class FakeGitHub:
+    """Tree and contents endpoints with ETag support"""
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+
+    @property
+    def etag(self):
+        return f'"{hash(tuple(sorted(self.files.items())))}"'
+
+    def __call__(self, request):
+        self.requests.append(request)
+        path = request.url.path
+        if "/git/trees/" in path:
+            if request.headers.get("If-None-Match") == self.etag:
+                return httpx.Response(304)
+            tree = [
+                {"path": name, "type": "blob", "sha": str(hash(text))}
+                for name, text in self.files.items()
+            ]
+            return httpx.Response(
+                200, json={"tree": tree}, headers={"ETag": self.etag}
+            )
+        name = path.split("/contents/", 1)[1]
+        if self.files[name] is None:
+            return httpx.Response(500)
+        return httpx.Response(200, json={
+            "content": base64.b64encode(self.files[name].encode()).decode(),
+            "html_url": f"https://github.com/org/app/blob/main/{name}"
+        })
+
+
+@pytest.fixture
+def github(monkeypatch):
+    fake = FakeGitHub({"docs/a.md": "alpha", "docs/b.md": "beta"})
+    client = httpx.AsyncClient
+
+    def mock_client(**kwargs):
+        return client(transport=httpx.MockTransport(fake), **kwargs)
+
+    monkeypatch.setattr(github_fetcher.httpx, "AsyncClient", mock_client)
+    return fake
+
+
+def fetcher(tmp_path):
+    fetcher = GitHubDocsFetcher(
+        DocSource("org/app", paths=["docs/"]),
+        cache_ttl=0,
+        store=DocsStore(str(tmp_path / "docs.sqlite3"))
+    )
+    fetcher.token = "t"
+    fetcher.base_url = "https://api.github.test"
+    return fetcher
+
+
+def test_unchanged_tree_is_revalidated_with_if_none_match(tmp_path, github):
+    docs = fetcher(tmp_path)
+    first = asyncio.run(docs.sync())
+    assert first == {"fetched": 2, "removed": 0, "unchanged": 0}
+    assert "If-None-Match" not in github.requests[0].headers
+
+    github.requests.clear()
+    second = asyncio.run(docs.sync())
+    assert second == {"fetched": 0, "removed": 0, "unchanged": 2}
+    assert len(github.requests) == 1  # Just the 304 for the tree
+    assert github.requests[0].headers["If-None-Match"] == github.etag
+
+
+def test_changed_tree_fetches_only_changed_files(tmp_path, github):
+    docs = fetcher(tmp_path)
+    asyncio.run(docs.sync())
+    github.files = {"docs/a.md": "alpha 2", "docs/c.md": "gamma"}
+
+    github.requests.clear()
+    stats = asyncio.run(docs.sync())
+    assert stats == {"fetched": 2, "removed": 1, "unchanged": 0}
+    assert {d["path"]: d["content"] for d in docs.iter_docs()} == {
+        "docs/a.md": "alpha 2", "docs/c.md": "gamma"
+    }
+    assert docs.store.etag("app") == github.etag
+
+
+def test_partial_sync_is_not_revalidated(tmp_path, github):
+    docs = fetcher(tmp_path)
+    github.files["docs/broken.md"] = None  # Contents request fails
+    asyncio.run(docs.sync())
+    assert docs.store.etag("app") is None
+
+    del github.files["docs/broken.md"]
+    github.requests.clear()
+    asyncio.run(docs.sync())
+    assert "If-None-Match" not in github.requests[0].headers
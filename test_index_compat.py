@@ -0,0 +1,64 @@
+"""
+Tests for GitTalker's check that an index matches the query embedder
+"""
+import pytest
+
+from src.embeddings import HashingEmbeddingBackend
+from src.index_store import IndexStore
+from src.rag_engine import SimpleRAG
+
+DOCS = [{
+    "path": "docs/a.md",
+    "url": "https://github.com/org/app/blob/main/docs/a.md",
+    "content": "Install the app with pip, then run app init to create a "
+               "config file in your home directory. " * 3
+}]
+
+
+class FakeRemote(HashingEmbeddingBackend):
+    """Remote backend stand-in serving a chosen model and width"""
+
+    name = "remote"
+
+
+def build(tmp_path, embedder):
+    rag = SimpleRAG(
+        model_name="local-model", cache_embeddings=False, embedder=embedder
+    )
+    rag.index_documents(DOCS, workers=1)
+    store = IndexStore(str(tmp_path))
+    rag.save_index(store)
+    return store.load()
+
+
+def test_manifest_records_backend_model_and_dimensions(tmp_path):
+    snapshot = build(tmp_path, FakeRemote("text-embed-3", dimensions=16))
+    manifest = snapshot["manifest"]
+    assert manifest["embedding_backend"] == "remote"
+    assert manifest["embedding_model"] == "text-embed-3"
+    assert manifest["model_name"] == "local-model"
+    assert manifest["dimensions"] == 16
+    assert manifest["chunk_count"] > 0
+
+
+def test_matching_index_loads(tmp_path):
+    snapshot = build(tmp_path, FakeRemote("text-embed-3", dimensions=16))
+    rag = SimpleRAG(
+        model_name="local-model",
+        embedder=FakeRemote("text-embed-3", dimensions=16)
+    )
+    rag.load_index(snapshot)
+    assert rag.generation == snapshot["generation"]
+
+
+@pytest.mark.parametrize("embedder", [
+    FakeRemote("other-model", dimensions=16),
+    FakeRemote("text-embed-3", dimensions=8),
+    HashingEmbeddingBackend("text-embed-3", dimensions=16),
+])
+def test_mismatched_index_is_refused(tmp_path, embedder):
+    snapshot = build(tmp_path, FakeRemote("text-embed-3", dimensions=16))
+    rag = SimpleRAG(model_name="local-model", embedder=embedder)
+    with pytest.raises(ValueError):
+        rag.load_index(snapshot)
+    assert rag.generation is None
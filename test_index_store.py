@@ -0,0 +1,121 @@
+"""
+Tests for GitTalker's shared index store
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from src.index_store import CURRENT_FILE, IndexStore
+
+
+def publish(store, chunks, manifest=None):
+    embeddings = np.arange(len(chunks) * 4, dtype=np.float32).reshape(-1, 4)
+    metadata = [{"source_path": f"doc{i}.md"} for i in range(len(chunks))]
+    return store.publish(chunks, metadata, embeddings, manifest)
+
+
+def test_publish_then_load_round_trips(tmp_path):
+    store = IndexStore(str(tmp_path))
+    chunks = ["first chunk", "zweiter Abschnitt ü", ""]
+    generation = publish(store, chunks, {"model_name": "m"})
+
+    assert store.current_generation() == generation
+    snapshot = store.load()
+    assert snapshot["generation"] == generation
+    assert list(snapshot["chunks"]) == chunks
+    assert snapshot["chunks"][-2] == "zweiter Abschnitt ü"
+    assert snapshot["metadata"][1] == {"source_path": "doc1.md"}
+    assert snapshot["manifest"]["model_name"] == "m"
+    assert snapshot["manifest"]["chunk_count"] == 3
+    assert snapshot["manifest"]["dimensions"] == 4
+    # Embeddings are memory-mapped, not read into memory
+    assert isinstance(snapshot["embeddings"], np.memmap)
+    assert snapshot["embeddings"].shape == (3, 4)
+
+
+def test_empty_store_and_empty_index(tmp_path):
+    store = IndexStore(str(tmp_path / "missing"))
+    assert store.current_generation() is None
+    assert store.generations() == []
+    with pytest.raises(FileNotFoundError):
+        store.load()
+
+    store = IndexStore(str(tmp_path))
+    store.publish([], [], np.zeros((0, 4), dtype=np.float32))
+    assert len(store.load()["chunks"]) == 0
+
+
+def test_current_points_at_the_newest_generation(tmp_path):
+    store = IndexStore(str(tmp_path))
+    first = publish(store, ["a"])
+    second = publish(store, ["b"])
+    assert first < second
+    assert (tmp_path / CURRENT_FILE).read_text() == second
+    assert list(store.load()["chunks"]) == ["b"]
+    # Older generations stay loadable by name
+    assert list(store.load(first)["chunks"]) == ["a"]
+    # No staging or pointer temp files are left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [CURRENT_FILE, first, second]
+    )
+
+
+def test_prune_keeps_the_newest_generations(tmp_path):
+    store = IndexStore(str(tmp_path), keep_generations=2)
+    generations = [publish(store, [str(i)]) for i in range(4)]
+    assert store.generations() == generations[-2:]
+
+
+def test_prune_never_deletes_the_current_generation(tmp_path):
+    store = IndexStore(str(tmp_path), keep_generations=2)
+    first = publish(store, ["a"])
+    second = publish(store, ["b"])
+    # Roll CURRENT back to the older generation, then keep only one
+    store._write_current(first)
+    store.keep_generations = 1
+    store.prune()
+    assert store.generations() == [first, second]
+
+
+def test_keep_generations_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        IndexStore(str(tmp_path), keep_generations=0)
+
+
+def test_readers_see_whole_generations_while_publishing(tmp_path):
+    store = IndexStore(str(tmp_path), keep_generations=3)
+    publish(store, ["chunk"])
+    errors = []
+    done = threading.Event()
+
+    def publisher():
+        try:
+            for i in range(2, 30):
+                publish(store, ["chunk"] * i)
+        finally:
+            done.set()
+
+    def reader():
+        while not done.is_set():
+            try:
+                snapshot = store.load()
+            except FileNotFoundError:
+                # Pruned between reading CURRENT and opening it; a
+                # replica retries on the next poll
+                continue
+            count = snapshot["manifest"]["chunk_count"]
+            if (len(snapshot["chunks"]) != count
+                    or snapshot["embeddings"].shape[0] != count
+                    or len(snapshot["metadata"]) != count):
+                errors.append(snapshot["generation"])
+
+    threads = [threading.Thread(target=publisher)] + [
+        threading.Thread(target=reader) for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert store.load()["manifest"]["chunk_count"] == 29
@@ -0,0 +1,77 @@
+"""
+Tests for GitTalker's GCRA rate limiter
+"""
+import asyncio
+
+import pytest
+
+from src import rate_limiter
+from src.rate_limiter import MemoryGCRABackend, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def allow(limiter, key="user"):
+    return asyncio.run(limiter.allow(key))
+
+
+def test_burst_then_deny(clock):
+    limiter = RateLimiter(per_minute=60, burst=3)
+    assert [allow(limiter) for _ in range(4)] == [True, True, True, False]
+
+
+def test_refills_one_request_per_interval(clock):
+    limiter = RateLimiter(per_minute=60, burst=2)
+    assert allow(limiter) and allow(limiter)
+    assert not allow(limiter)
+    clock.now += 0.5
+    assert not allow(limiter)
+    clock.now += 0.5  # One interval (1s) after the burst
+    assert allow(limiter)
+    assert not allow(limiter)
+
+
+def test_keys_are_limited_independently(clock):
+    limiter = RateLimiter(per_minute=60, burst=1)
+    assert allow(limiter, "a")
+    assert not allow(limiter, "a")
+    assert allow(limiter, "b")
+
+
+def test_burst_defaults_to_per_minute(clock):
+    limiter = RateLimiter(per_minute=5)
+    assert sum(allow(limiter) for _ in range(10)) == 5
+
+
+def test_zero_per_minute_disables_the_limit(clock):
+    limiter = RateLimiter(per_minute=0)
+    assert all(allow(limiter) for _ in range(100))
+
+
+def test_negative_per_minute_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(per_minute=-1)
+
+
+def test_memory_backend_drops_idle_keys_and_caps_size(clock):
+    backend = MemoryGCRABackend(max_keys=2)
+    limiter = RateLimiter(per_minute=60, burst=5, backend=backend)
+    for key in ("a", "b", "c"):
+        allow(limiter, key)
+    assert len(backend) == 2
+    clock.now += 10  # Every bucket is full again
+    allow(limiter, "d")
+    assert len(backend) == 1
@@ -0,0 +1,51 @@
+"""
+Tests for GitTalker query sanitising and scope classification
+"""
+from src.sanitizer import MAX_QUERY_CHARS, inspect_query
+
+
+def test_plain_question_is_valid():
+    verdict = inspect_query("How do I run the build?")
+    assert verdict.is_valid
+    assert not verdict.dangerous
+    assert verdict.out_of_scope_keyword is None
+    assert verdict.text == "How do I run the build?"
+
+
+def test_too_short_or_empty_is_invalid():
+    assert not inspect_query("hi").is_valid
+    assert not inspect_query("").is_valid
+    assert not inspect_query(None).is_valid
+
+
+def test_injection_is_rejected_and_stripped():
+    verdict = inspect_query("run <script>alert(1)</script> now")
+    assert verdict.dangerous
+    assert not verdict.is_valid
+    assert "script" not in verdict.text
+
+    verdict = inspect_query("try EVAL (x) and exec(y)")
+    assert verdict.dangerous
+    assert "eval" not in verdict.text.lower()
+    assert "exec" not in verdict.text.lower()
+
+
+def test_keyword_overlapping_injection_is_still_rejected():
+    # "google" must not consume the "e" of "eval("
+    verdict = inspect_query("googleval(1)")
+    assert verdict.dangerous
+    assert not verdict.is_valid
+    assert "eval(" not in verdict.text
+    assert verdict.out_of_scope_keyword == "google"
+
+
+def test_out_of_scope_keyword_is_reported():
+    verdict = inspect_query("What is the WEATHER like?")
+    assert verdict.is_valid
+    assert verdict.out_of_scope_keyword == "what is"
+
+
+def test_text_is_escaped_and_bounded():
+    verdict = inspect_query("a < b & c")
+    assert verdict.text == "a &lt; b &amp; c"
+    assert len(inspect_query("x" * 5000).text) == MAX_QUERY_CHARS
@@ -0,0 +1,63 @@
+"""
+Tests for GitTalker metadata-filtered search
+"""
+from src.search_filter import MetadataIndex, SearchFilter
+
+METADATA = [
+    {"source_path": "docs/setup.md", "repo": "org/app", "updated_at": 100},
+    {"source_path": "src/main.py", "repo": "org/app", "updated_at": 300},
+    {"source_path": "docs/api/auth.MD", "repo": "org/lib",
+     "updated_at": 200},
+    {"source_path": "docsite/index.rst", "repo": "org/app",
+     "updated_at": 400},
+    {"source_path": "README", "repo": None},
+]
+
+
+def rows(**fields):
+    return MetadataIndex(METADATA).rows(SearchFilter(**fields)).tolist()
+
+
+def test_empty_filter_matches_everything():
+    assert not SearchFilter()
+    assert MetadataIndex(METADATA).rows(SearchFilter()) is None
+
+
+def test_path_prefix():
+    assert rows(path_prefixes=["docs/"]) == [0, 2]
+    # A bare prefix also matches longer directory names
+    assert rows(path_prefixes=["docs"]) == [0, 2, 3]
+    assert rows(path_prefixes=["src/", "README"]) == [1, 4]
+    assert rows(path_prefixes=["nothing/"]) == []
+
+
+def test_extensions_are_case_insensitive_and_dot_optional():
+    assert rows(extensions=["md"]) == [0, 2]
+    assert rows(extensions=[".PY", "rst"]) == [1, 3]
+    assert rows(extensions=[".go"]) == []
+
+
+def test_repo_and_recency():
+    assert rows(repos=["org/lib"]) == [2]
+    assert rows(updated_since=250) == [1, 3]
+
+
+def test_fields_combine_with_and():
+    assert rows(path_prefixes=["docs"], repos=["org/app"]) == [0, 3]
+    assert rows(extensions=["md"], updated_since=150) == [2]
+
+
+def test_from_dict_and_key():
+    search_filter = SearchFilter.from_dict(
+        {"paths": "docs/", "extensions": ["md", ".RST"], "repos": ["b", "a"]}
+    )
+    assert search_filter.path_prefixes == ["docs/"]
+    assert search_filter.extensions == [".md", ".rst"]
+    assert search_filter.key == "path=docs/;ext=.md+.rst;repo=a+b"
+    assert SearchFilter.from_dict(search_filter.to_dict()).key == (
+        search_filter.key
+    )
+
+
+def test_empty_index():
+    assert MetadataIndex([]).rows(SearchFilter(repos=["x"])).tolist() == []
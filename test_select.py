@@ -0,0 +1,58 @@
+"""
+Tests for GitTalker's MMR selection and adaptive result cutoff
+"""
+import numpy as np
+
+from src.rag_engine import select
+
+
+def results(*scores):
+    return [{"id": i, "score": score} for i, score in enumerate(scores)]
+
+
+def ids(picked):
+    return [result["id"] for result in picked]
+
+
+# Chunks 0 and 1 are near-duplicates; 2 points elsewhere
+VECTORS = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]])
+
+
+def test_without_mmr_returns_top_k_by_score():
+    picked = select(results(0.5, 0.9, 0.7), VECTORS, top_k=2)
+    assert ids(picked) == [1, 2]
+
+
+def test_mmr_skips_near_duplicates():
+    candidates = results(0.9, 0.88, 0.8)
+    assert ids(select(candidates, VECTORS, top_k=2)) == [0, 1]
+    assert ids(select(candidates, VECTORS, top_k=2, mmr_lambda=0.5)) == [
+        0, 2
+    ]
+
+
+def test_mmr_lambda_one_is_pure_relevance():
+    picked = select(results(0.9, 0.88, 0.8), VECTORS, top_k=3, mmr_lambda=1)
+    assert ids(picked) == [0, 1, 2]
+
+
+def test_relative_cutoff_drops_weak_results():
+    candidates = results(0.9, 0.6, 0.85)
+    picked = select(candidates, VECTORS, top_k=3, min_relative_score=0.9)
+    assert ids(picked) == [0, 2]
+
+
+def test_relative_cutoff_always_keeps_the_best():
+    picked = select(results(0.9), VECTORS[:1], top_k=3,
+                    mmr_lambda=0.7, min_relative_score=0.99)
+    assert ids(picked) == [0]
+
+
+def test_cutoff_is_skipped_when_best_score_is_not_positive():
+    picked = select(results(-0.1, -0.2), VECTORS[:2], top_k=2,
+                    min_relative_score=0.9)
+    assert ids(picked) == [0, 1]
+
+
+def test_no_results():
+    assert select([], np.zeros((0, 2)), top_k=3, mmr_lambda=0.7) == []
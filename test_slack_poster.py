@@ -0,0 +1,66 @@
+"""
+Tests for GitTalker's paced Slack poster
+"""
+import asyncio
+import time
+
+from src.slack_poster import SlackPoster
+
+
+class RecordingClient:
+    def __init__(self):
+        self.sent = []
+
+    async def chat_postMessage(self, **kwargs):
+        self.sent.append((kwargs["channel"], time.monotonic()))
+        return {"ok": True}
+
+
+def poster(interval):
+    slack = SlackPoster("xoxb-test", channel_interval=interval)
+    slack.client = RecordingClient()
+    return slack
+
+
+def gaps(sent, channel):
+    times = [at for name, at in sent if name == channel]
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+def test_posts_arriving_one_by_one_are_spaced():
+    async def main():
+        slack = poster(0.2)
+        for _ in range(3):
+            # Each waits for the last, so the channel's queue empties
+            await slack.post_message("C1", "hi")
+        return slack.client.sent
+
+    assert all(gap >= 0.19 for gap in gaps(asyncio.run(main()), "C1"))
+
+
+def test_channels_are_paced_independently():
+    async def main():
+        slack = poster(0.5)
+        start = time.monotonic()
+        await asyncio.gather(
+            slack.post_message("C1", "hi"), slack.post_message("C2", "hi")
+        )
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 0.4
+
+
+def test_cancelled_drain_fails_queued_posts():
+    async def main():
+        slack = poster(10)
+        first = asyncio.create_task(slack.post_message("C1", "one"))
+        second = asyncio.create_task(slack.post_message("C1", "two"))
+        assert await first == {"ok": True}
+        slack._outboxes["C1"].task.cancel()
+        try:
+            await second
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(main())
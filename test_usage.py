@@ -0,0 +1,105 @@
+"""
+Tests for GitTalker's LLM usage ledger and budgets
+"""
+import contextvars
+
+import pytest
+
+from src import usage
+from src.usage import (
+    EXHAUSTED, OK, TIGHT, UsageLedger, load_prices, set_requester
+)
+
+PRICES = {"hosted": (1.0, 0.5, 2.0)}  # USD per million tokens
+
+
+def tokens(prompt=0, cached=0, completion=0):
+    return {
+        "prompt_tokens": prompt, "cached_tokens": cached,
+        "completion_tokens": completion
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [10 * 3600.0]
+    monkeypatch.setattr(usage.time, "time", lambda: now[0])
+    return now
+
+
+def record(ledger, user, channel, cost_usd):
+    """Record a hosted call costing cost_usd for user in channel"""
+    def run():
+        set_requester(user, channel)
+        ledger.record(
+            "openai", "hosted", tokens(prompt=int(cost_usd * 1e6)), 1.0
+        )
+    contextvars.copy_context().run(run)
+
+
+def test_cost_uses_cached_and_completion_prices():
+    ledger = UsageLedger(prices=PRICES)
+    cost = ledger.cost(
+        "openai", "hosted", tokens(prompt=1000, cached=400, completion=500)
+    )
+    assert cost == pytest.approx((600 * 1.0 + 400 * 0.5 + 500 * 2.0) / 1e6)
+
+
+def test_local_and_unpriced_models_are_free():
+    ledger = UsageLedger(prices=PRICES)
+    assert ledger.cost("ollama", "hosted", tokens(prompt=1000)) == 0.0
+    assert ledger.cost("openai", "unknown", tokens(prompt=1000)) == 0.0
+
+
+def test_load_prices_overrides():
+    prices = load_prices('{"hosted": [1, 0.5, 2]}')
+    assert prices["hosted"] == (1.0, 0.5, 2.0)
+    assert "gpt-4o-mini" in prices
+
+
+def test_totals_are_attributed_to_user_and_channel(clock):
+    ledger = UsageLedger(prices=PRICES)
+    record(ledger, "U1", "C1", 0.25)
+    record(ledger, "U2", "C1", 0.5)
+    report = ledger.snapshot()
+    assert report["channel"]["C1"]["cost_usd"] == pytest.approx(0.75)
+    assert report["user"]["U2"]["calls"] == 1
+    assert report["provider"]["openai"]["calls"] == 2
+
+
+def test_unlimited_budget_is_always_ok(clock):
+    ledger = UsageLedger(prices=PRICES)
+    record(ledger, "U1", "C1", 100.0)
+    assert ledger.budget_level() == OK
+    assert ledger.budget_level("C1") == OK
+
+
+def test_global_budget_levels(clock):
+    ledger = UsageLedger(prices=PRICES, daily_budget=1.0, soft_limit=0.8)
+    record(ledger, "U1", "C1", 0.5)
+    assert ledger.budget_level("C1") == OK
+    record(ledger, "U1", "C2", 0.3)
+    assert ledger.budget_level("C1") == TIGHT
+    record(ledger, "U1", "C2", 0.2)
+    assert ledger.budget_level() == EXHAUSTED
+
+
+def test_channel_budget_only_limits_that_channel(clock):
+    ledger = UsageLedger(prices=PRICES, channel_daily_budget=1.0)
+    record(ledger, "U1", "C1", 1.0)
+    assert ledger.budget_level("C1") == EXHAUSTED
+    assert ledger.budget_level("C2") == OK
+    assert ledger.budget_level() == OK
+
+
+def test_spend_leaves_the_rolling_window(clock):
+    ledger = UsageLedger(prices=PRICES, daily_budget=1.0, window=3 * 3600)
+    record(ledger, "U1", "C1", 1.0)
+    assert ledger.budget_level() == EXHAUSTED
+    clock[0] += 2 * 3600
+    assert ledger.budget_level() == EXHAUSTED
+    clock[0] += 3600
+    assert ledger.spent() == 0.0
+    assert ledger.budget_level("C1") == OK
+    # Totals since start are kept
+    assert ledger.snapshot()["channel"]["C1"]["cost_usd"] == 1.0